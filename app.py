@@ -1,13 +1,15 @@
+import asyncio
 import json
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse, RedirectResponse, Response
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
-from settings import APP_SECRET, HAS_KEY, OpenAI, ONBOARDING
+from settings import APP_SECRET, HAS_KEY, OpenAI, ONBOARDING, REALTIME_SDP_MODE, ICE_GATHER_TIMEOUT_MS, RTC_WARMUP
 from auth import is_logged_in, require_login, check_credentials, is_admin
 from pages import (
     build_login_html,
@@ -21,13 +23,41 @@ from pages import (
     build_onboarding_html,
 )
 from prompts import build_customer_instructions, scenarios_for_level
-from evaluation import coach_tips, grade_exam, evaluate_checklist
-from openai_realtime import webrtc_answer_sdp
-from storage import save_attempt, list_attempts, get_attempt
+from evaluation import (
+    coach_tips,
+    COACH_TIP_CACHE,
+    COACH_TIER_STATS,
+    EVAL_CACHE_STATS,
+)
+import openai_realtime
+from openai_realtime import webrtc_answer_sdp, create_client_secret, record_setup_timings, setup_stats
+from local_checklist import score_checklist
+from limiter import OPENAI_LIMITER, SESSION, LimiterFull
+from storage import init_db, save_attempt, list_attempts, get_attempt, eval_cache_stats
+from coach_session import open_session, get_session, find_session, COACH_CONTEXT_LINES, SESSIONS
+import call_log
+import jobs
+import progressive
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Evaluation workers live as long as the server; unfinished jobs resume on the next start
+    # Schema + migrations once, before any request or worker touches the database
+    init_db()
+    await jobs.start_workers()
+    await call_log.start_flusher()
+    try:
+        yield
+    finally:
+        await jobs.stop_workers()
+        await call_log.stop_flusher()
+        await openai_realtime.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(SessionMiddleware, secret_key=APP_SECRET, same_site="lax", https_only=False)
 
 # -------------------------
@@ -72,6 +102,11 @@ def _me(request: Request) -> str:
     return (request.session.get("user") or "").strip().lower()
 
 
+def _realtime_token_url() -> str:
+    """Token endpoint the live pages use in direct SDP mode ("" = proxy through /session)."""
+    return "/session/token" if REALTIME_SDP_MODE == "direct" else ""
+
+
 def _role(request: Request) -> str:
     return (request.session.get("role") or "trainee").strip().lower()
 
@@ -97,6 +132,74 @@ def _ensure_attempt_id(maybe_id):
     return None
 
 
+def _as_int(x, default: int = 0) -> int:
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return default
+
+
+def _delta_lines(data: dict) -> list:
+    lines = data.get("lines")
+    if not isinstance(lines, list):
+        return []
+    return [str(x) for x in lines[:200]]
+
+
+async def _log_call(call_id: str, user_email: str, mode: str) -> bool:
+    """
+    True if call_id is this user's call. Its turn log is opened on first use, for calls
+    /session or /session/token issued (the coach session still knows level + scenario).
+    """
+    owner = await call_log.owner(call_id)
+    if owner:
+        return owner == user_email
+    call = find_session(call_id, user_email)
+    if call is None:
+        return False
+    await call_log.open_call(call_id, user_email, mode=mode, level=call.level, scenario_id=call.scenario_id)
+    return True
+
+
+async def _resolve_transcript(data: dict, user_email: str, mode: str):
+    """
+    Post-call transcript: an uploaded `transcript` wins (legacy clients).
+    Otherwise the browser has forwarded each turn to the call's turn log as it happened;
+    the final delta {call_id, seq, lines} adds the tail it had not sent yet, and the server
+    copy is used if it covers all `total` lines the browser has. With "recover": true the
+    server copy is used as it is (call whose tab was closed before it was submitted).
+    Returns None when the client must re-send the full transcript.
+    """
+    transcript = (data.get("transcript") or "").strip()
+    call_id = str(data.get("call_id") or "").strip()[:64]
+    if transcript or not call_id:
+        return transcript
+
+    if not await _log_call(call_id, user_email, mode):
+        return None
+    await call_log.append(call_id, _as_int(data.get("seq")), _delta_lines(data))
+    transcript, n = await call_log.transcript(call_id)
+    if data.get("recover"):
+        return transcript
+    if n == 0 or n != _as_int(data.get("total")):
+        return None
+    return transcript
+
+
+async def _finish_call(data: dict, user_email: str, attempt_id) -> None:
+    """The call behind this attempt is done: stop offering it for recovery."""
+    call_id = str(data.get("call_id") or "").strip()[:64]
+    if call_id and await call_log.owner(call_id) == user_email:
+        await call_log.finish(call_id, attempt_id)
+
+
+def _need_transcript_response():
+    return JSONResponse(
+        {"detail": "Server transcript incomplete; re-send the full transcript.", "need_transcript": True},
+        status_code=409,
+    )
+
+
 def _onboarding_done(request: Request) -> bool:
     return bool(request.session.get("onboarding_done"))
 
@@ -187,7 +290,7 @@ def logout(request: Request):
 # Dashboard
 # -------------------------
 @app.get("/app", response_class=HTMLResponse)
-def app_dashboard(request: Request):
+async def app_dashboard(request: Request):
     redirect = require_login(request)
     if redirect:
         return redirect
@@ -197,7 +300,12 @@ def app_dashboard(request: Request):
 
     user = _me(request)
     training_enabled = _onboarding_done(request)
-    return HTMLResponse(build_dashboard_html(user, show_admin=False, training_enabled=training_enabled))
+    return HTMLResponse(build_dashboard_html(
+        user,
+        show_admin=False,
+        training_enabled=training_enabled,
+        unfinished_calls=await call_log.unfinished(user),
+    ))
 
 
 # -------------------------
@@ -264,7 +372,11 @@ def training_live(request: Request):
     if gate:
         return gate
 
-    return HTMLResponse(build_training_live_html())
+    return HTMLResponse(build_training_live_html(
+        token_url=_realtime_token_url(),
+        ice_timeout_ms=ICE_GATHER_TIMEOUT_MS,
+        warmup=RTC_WARMUP,
+    ))
 
 
 @app.get("/training/report/{attempt_id}", response_class=HTMLResponse)
@@ -294,7 +406,7 @@ def exam_page(request: Request):
         return redirect
     if _role(request) == "recruiter":
         return RedirectResponse(url="/admin", status_code=302)
-    return HTMLResponse(build_exam_html())
+    return HTMLResponse(build_exam_html(token_url=_realtime_token_url(), ice_timeout_ms=ICE_GATHER_TIMEOUT_MS))
 
 
 @app.get("/exam/report/{attempt_id}", response_class=HTMLResponse)
@@ -338,12 +450,101 @@ async def session_endpoint(request: Request):
     instructions = build_customer_instructions(level, scenario_id=scenario_id)
 
     try:
-        answer_sdp = webrtc_answer_sdp(offer_sdp, instructions)
-        return PlainTextResponse(answer_sdp, media_type="application/sdp")
+        async with OPENAI_LIMITER.slot(SESSION):
+            answer_sdp = await webrtc_answer_sdp(offer_sdp, instructions)
+        # Per-call id for the live coach (/coach looks its state up by this)
+        call = open_session(_me(request), level=level, scenario_id=scenario_id)
+        return PlainTextResponse(answer_sdp, media_type="application/sdp", headers={"X-Call-Id": call.call_id})
+    except LimiterFull as e:
+        return JSONResponse({"detail": str(e)}, status_code=503, headers={"Retry-After": "5"})
     except Exception as e:
         return JSONResponse({"detail": str(e)}, status_code=500)
 
 
+@app.post("/session/token")
+async def session_token_endpoint(request: Request):
+    """
+    Direct mode: mint a short-lived client secret for this call's session config; the browser
+    then posts its SDP offer to the provider itself (REALTIME_SDP_MODE=direct).
+    """
+    redirect = require_login(request)
+    if redirect:
+        return JSONResponse({"detail": "Not logged in"}, status_code=401)
+
+    if not HAS_KEY:
+        return JSONResponse({"detail": "Missing OPENAI_API_KEY. See /setup"}, status_code=500)
+
+    level = (request.query_params.get("level") or "easy").strip().lower()
+    scenario_id = (request.query_params.get("scenario_id") or "").strip()
+    instructions = build_customer_instructions(level, scenario_id=scenario_id)
+
+    try:
+        async with OPENAI_LIMITER.slot(SESSION):
+            secret = await create_client_secret(instructions)
+    except LimiterFull as e:
+        return JSONResponse({"detail": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    except Exception as e:
+        return JSONResponse({"detail": str(e)}, status_code=502)
+
+    call = open_session(_me(request), level=level, scenario_id=scenario_id)
+    return JSONResponse(
+        {
+            "client_secret": secret["value"],
+            "expires_at": secret["expires_at"],
+            "calls_url": openai_realtime.REALTIME_CALLS_URL,
+            "call_id": call.call_id,
+        },
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.post("/session/timings")
+async def session_timings_endpoint(request: Request):
+    """Browser-measured call setup phases (ms) for one call; aggregated for /admin/api/realtime/setup."""
+    if not _me(request):
+        return JSONResponse({"detail": "Not logged in"}, status_code=401)
+    try:
+        data = await request.json()
+    except Exception:
+        return JSONResponse({"detail": "Invalid JSON"}, status_code=400)
+    if not isinstance(data, dict):
+        return JSONResponse({"detail": "Invalid JSON"}, status_code=400)
+    kept = record_setup_timings(data)
+    call_id = str(data.get("call_id") or "")[:64]
+    print(f"[session] setup {call_id}: " + " ".join(f"{k}={v}" for k, v in kept.items()))
+    return Response(status_code=204)
+
+
+# -------------------------
+# Server-side turn log (training + exam)
+# -------------------------
+@app.post("/call/turns")
+async def call_turns_endpoint(request: Request):
+    """
+    Browser -> server as each turn finishes: {call_id, mode, seq, lines} (same delta protocol
+    as /coach). Appended to the call's turn log, so post-call endpoints read the server copy
+    and a call survives a closed tab. Returns {"next_seq"}, plus "resync" on a gap.
+    """
+    user_email = _me(request)
+    if not user_email:
+        return JSONResponse({"detail": "Not logged in"}, status_code=401)
+    try:
+        data = await request.json()
+    except Exception:
+        return JSONResponse({"detail": "Invalid JSON"}, status_code=400)
+    if not isinstance(data, dict):
+        return JSONResponse({"detail": "Invalid JSON"}, status_code=400)
+
+    call_id = str(data.get("call_id") or "").strip()[:64]
+    if not call_id or not await _log_call(call_id, user_email, str(data.get("mode") or "training")):
+        return JSONResponse({"detail": "Unknown call"}, status_code=404)
+    next_seq, ok = await call_log.append(call_id, _as_int(data.get("seq")), _delta_lines(data))
+    out = {"next_seq": next_seq}
+    if not ok:
+        out["resync"] = True
+    return JSONResponse(out)
+
+
 # -------------------------
 # Live coach (Training only)
 # -------------------------
@@ -370,23 +571,134 @@ async def coach_endpoint(request: Request):
             status_code=200,
         )
 
-    transcript = (data.get("transcript") or "").strip()
+    call = get_session(str(data.get("call_id") or ""), _me(request))
+    return JSONResponse(await _coach_step(call, data, request=request))
+
+
+async def _cancel_on_disconnect(request: Request, task: asyncio.Task, poll_sec: float = 0.1):
+    while not task.done():
+        if await request.is_disconnected():
+            task.cancel()
+            return
+        await asyncio.sleep(poll_sec)
+
+
+async def _coach_step(call, data: dict, request: Request = None, on_tip_delta=None) -> dict:
+    """
+    Shared by POST /coach and /coach/ws: apply the transcript delta, then ask the coach.
+    A newer delta for the same call cancels the older coach task (nobody will see that tip),
+    and so does an HTTP client that went away. Never raises; failures come back as
+    should_intervene=false.
+    """
+    # Delta protocol: {seq, lines} = new transcript lines starting at sequence number seq.
+    # The server rebuilds the transcript, so each poll costs O(new lines), not O(call).
+    resync = False
+    if "lines" in data:
+        resync = not call.append_lines(_as_int(data.get("seq")), _delta_lines(data))
+        progressive.observe(call)
+        transcript = call.transcript(last_n=COACH_CONTEXT_LINES)
+    else:
+        transcript = (data.get("transcript") or "").strip()
 
     meta = {
-        "silence_ms": int(data.get("silence_ms") or 0),
+        "silence_ms": _as_int(data.get("silence_ms")),
         "agent_last_utterance": (data.get("agent_last_utterance") or "").strip(),
     }
 
+    task = asyncio.create_task(coach_tips(transcript, meta=meta, session=call, on_tip_delta=on_tip_delta))
+    prev, call.inflight = call.inflight, task
+    if prev is not None and not prev.done():
+        prev.cancel()
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, task)) if request is not None else None
+
     try:
-        return JSONResponse(coach_tips(transcript, meta=meta))
+        out = await task
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            raise  # we ourselves are being cancelled, not just the coach task
+        out = {"should_intervene": False, "tip": "", "reason_tag": "superseded", "urgency": "low"}
     except Exception as e:
         import traceback
         print("[/coach] crashed:", e)
         print(traceback.format_exc())
-        return JSONResponse(
-            {"should_intervene": False, "tip": "", "reason_tag": "server_error", "urgency": "low"},
-            status_code=200,
-        )
+        out = {"should_intervene": False, "tip": "", "reason_tag": "server_error", "urgency": "low"}
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if call.inflight is task:
+            call.inflight = None
+
+    out["next_seq"] = call.next_seq
+    if resync:
+        out["resync"] = True
+    return out
+
+
+@app.websocket("/coach/ws")
+async def coach_ws(websocket: WebSocket):
+    """
+    Push channel for live tips (training only).
+    Browser -> server: {"type": "turns", "seq": n, "lines": [...]} (same delta protocol as POST /coach)
+    Server -> browser: {"type": "ready"|"resync", "next_seq": n} and {"type": "tip", ...} only when there is a tip.
+    LLM tips are streamed first as {"type": "tip_delta", "reason_tag", "text"}; if the final
+    answer then has no tip (repeat/deadline/superseded) we send {"type": "tip_abort"}.
+    """
+    user = (websocket.session.get("user") or "").strip().lower()
+    if not user:
+        await websocket.close(code=1008)
+        return
+    if not HAS_KEY or OpenAI is None:
+        await websocket.close(code=1011)
+        return
+
+    await websocket.accept()
+    call = get_session(websocket.query_params.get("call_id") or "", user)
+    await websocket.send_json({"type": "ready", "next_seq": call.next_seq})
+
+    async def answer(data: dict):
+        streamed = False
+
+        async def tip_delta(tag: str, text: str):
+            nonlocal streamed
+            streamed = True
+            await websocket.send_json({"type": "tip_delta", "reason_tag": tag, "text": text})
+
+        try:
+            out = await _coach_step(call, data, on_tip_delta=tip_delta)
+            if out.get("resync"):
+                await websocket.send_json({"type": "resync", "next_seq": out["next_seq"]})
+            if out.get("should_intervene") and out.get("tip"):
+                await websocket.send_json({"type": "tip", **out})
+            elif streamed:
+                await websocket.send_json({"type": "tip_abort"})
+        except Exception:
+            pass  # socket already gone
+
+    # Keep reading while a coach answer is in flight, so a newer delta can supersede it
+    pending = set()
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if not isinstance(data, dict) or data.get("type") != "turns":
+                continue
+
+            t = asyncio.create_task(answer(data))
+            pending.add(t)
+            t.add_done_callback(pending.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Any way out of the loop (disconnect, bad frame, server shutdown): no task may
+        # outlive the socket and write to it
+        outstanding = list(pending)
+        for t in outstanding:
+            t.cancel()
+        if call.inflight is not None and not call.inflight.done():
+            call.inflight.cancel()
+        await asyncio.gather(*outstanding, return_exceptions=True)
 
 
 # -------------------------
@@ -399,11 +711,14 @@ async def aftercall_endpoint(request: Request):
         return JSONResponse({"detail": "Not logged in"}, status_code=401)
 
     data = await request.json()
-    transcript = (data.get("transcript") or "").strip()
     level = (data.get("level") or "easy").strip().lower()
     scenario_id = (data.get("scenario_id") or "").strip()  # ✅ NEW
     user_email = _me(request)
 
+    transcript = await _resolve_transcript(data, user_email, "training")
+    if transcript is None:
+        return _need_transcript_response()
+
     if not HAS_KEY or OpenAI is None:
         maybe_id = save_attempt({
             "user_email": user_email,
@@ -411,23 +726,29 @@ async def aftercall_endpoint(request: Request):
             "level": level,
             "scenario_id": scenario_id,  # ✅ NEW
             "transcript": transcript,
+            **jobs.training_fields(score_checklist(transcript)),
         })
         attempt_id = _ensure_attempt_id(maybe_id)
+        await _finish_call(data, user_email, attempt_id)
         return JSONResponse({"ok": True, "attempt_id": attempt_id})
 
-    report = evaluate_checklist(transcript)
-
+    # Save first, evaluate in the background: the report page polls until the job is done
+    # and meanwhile shows the rule-based checklist, which the job then overwrites
     maybe_id = save_attempt({
         "user_email": user_email,
         "mode": "training",
         "level": level,
         "scenario_id": scenario_id,  # ✅ NEW
         "transcript": transcript,
-        "checklist_score": int(report.get("checklist_score", 0) or 0),
-        "checklist_json": json.dumps(report, ensure_ascii=False),
+        **jobs.training_fields(score_checklist(transcript)),
+        "eval_status": "pending",
     })
     attempt_id = _ensure_attempt_id(maybe_id)
-    return JSONResponse({"ok": True, "attempt_id": attempt_id})
+    await _finish_call(data, user_email, attempt_id)
+    # Most of the call may already be scored segment by segment: the job only scores the tail
+    call = find_session(str(data.get("call_id") or ""), user_email) if data.get("call_id") else None
+    await jobs.submit(attempt_id, "training", progressive.snapshot(call, transcript))
+    return JSONResponse({"ok": True, "attempt_id": attempt_id, "status": "pending"})
 
 
 # -------------------------
@@ -444,28 +765,43 @@ async def grade_endpoint(request: Request):
         return guard
 
     data = await request.json()
-    transcript = (data.get("transcript") or "").strip()
     level = (data.get("level") or request.query_params.get("level") or "easy").strip().lower()
     user_email = _me(request)
 
-    result = grade_exam(transcript)
-    checklist = evaluate_checklist(transcript)
+    transcript = await _resolve_transcript(data, user_email, "exam")
+    if transcript is None:
+        return _need_transcript_response()
 
+    # Grade + checklist run in a background job (concurrently, under GRADE_DEADLINE_SEC)
     maybe_id = save_attempt({
         "user_email": user_email,
         "mode": "exam",
         "level": level,
         "transcript": transcript,
-        "score": int(result.get("score", 0) or 0),
-        "passed": 1 if result.get("pass") else 0,
-        "summary": result.get("summary", ""),
-        "strengths": json.dumps(result.get("strengths", []), ensure_ascii=False),
-        "improvements": json.dumps(result.get("improvements", []), ensure_ascii=False),
-        "checklist_score": int(checklist.get("checklist_score", 0) or 0),
-        "checklist_json": json.dumps(checklist, ensure_ascii=False),
+        **jobs.training_fields(score_checklist(transcript)),  # provisional checklist only
+        "eval_status": "pending",
     })
     attempt_id = _ensure_attempt_id(maybe_id)
-    return JSONResponse({"ok": True, "attempt_id": attempt_id})
+    await _finish_call(data, user_email, attempt_id)
+    await jobs.submit(attempt_id, "exam")
+    return JSONResponse({"ok": True, "attempt_id": attempt_id, "status": "pending"})
+
+
+@app.get("/api/attempt/{attempt_id}/status")
+def attempt_status(request: Request, attempt_id: int):
+    if not _me(request):
+        return JSONResponse({"detail": "Not logged in"}, status_code=401)
+    a = get_attempt(attempt_id)
+    if not a:
+        return JSONResponse({"detail": "Not found"}, status_code=404)
+    if not _can_view_attempt(request, a):
+        return JSONResponse({"detail": "Forbidden"}, status_code=403)
+    # Attempts saved before background evaluation have no status: they are complete
+    out = {"attempt_id": attempt_id, "status": a.get("eval_status") or "done"}
+    partial = jobs.partial_result(attempt_id)
+    if partial:
+        out["partial"] = partial
+    return JSONResponse(out)
 
 
 # -------------------------
@@ -496,3 +832,40 @@ def admin_attempt(request: Request, attempt_id: int):
     if not a:
         return JSONResponse({"detail": "Not found"}, status_code=404)
     return JSONResponse(a)
+
+
+@app.get("/admin/api/coach/stats")
+def admin_coach_stats(request: Request):
+    guard = require_admin(request)
+    if guard:
+        return guard
+    return JSONResponse({
+        "tiers": COACH_TIER_STATS,
+        "tip_cache": COACH_TIP_CACHE.stats(),
+        "sessions": SESSIONS.stats(),
+        "eval_cache": {**EVAL_CACHE_STATS, "stored": eval_cache_stats()},
+    })
+
+
+@app.get("/admin/api/openai/limiter")
+def admin_openai_limiter(request: Request):
+    guard = require_admin(request)
+    if guard:
+        return guard
+    return JSONResponse({**OPENAI_LIMITER.stats(), "realtime_http": openai_realtime.http_stats()})
+
+
+@app.get("/admin/api/realtime/setup")
+def admin_realtime_setup(request: Request):
+    guard = require_admin(request)
+    if guard:
+        return guard
+    return JSONResponse(setup_stats())
+
+
+@app.get("/admin/api/calls/log")
+def admin_call_log(request: Request):
+    guard = require_admin(request)
+    if guard:
+        return guard
+    return JSONResponse(call_log.stats())
@@ -0,0 +1,105 @@
+# benchmarks/bench_json_extract.py
+"""
+JSON extraction from large, noisy LLM output.
+
+extractor = evaluation._extract_first_json_object on the complete text
+            (fence strip + json.loads attempt + Python char walk)
+stream    = jsonstream.JsonObjectStream fed the same text in 16-char chunks
+polling   = the extractor re-run after every chunk, i.e. what early fields
+            would cost without an incremental parser
+
+Also reports how far into the stream "score" becomes available.
+
+Run from the repo root:
+    python -m benchmarks.bench_json_extract
+"""
+import json
+import random
+import timeit
+
+from evaluation import _extract_first_json_object
+from jsonstream import JsonObjectStream
+
+CHUNK = 16
+
+
+def _noisy_output(n_items: int, fenced: bool = True, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    words = ["agent", "customer", "clarify", "restate", "{braces}", "\"quoted\"", "timeframe", "empathy", "\\path"]
+    obj = {
+        "score": 82,
+        "pass": True,
+        "summary": " ".join(rnd.choice(words) for _ in range(60)),
+        "strengths": [" ".join(rnd.choice(words) for _ in range(12)) for _ in range(n_items)],
+        "improvements": [
+            {"item": f"step {i}", "note": " ".join(rnd.choice(words) for _ in range(15)), "evidence": {"line": i}}
+            for i in range(n_items)
+        ],
+    }
+    prose = "Sure! Here is the evaluation you asked for (see notes below):\n"
+    body = json.dumps(obj, indent=2)
+    if fenced:
+        return prose + "```json\n" + body + "\n```\nLet me know if you need anything else."
+    # No fence: json.loads fails on the prose and the extractor walks every character in Python
+    return prose + body + "\nNotes: scores are {approximate}."
+
+
+def _chunks(text: str):
+    return [text[i:i + CHUNK] for i in range(0, len(text), CHUNK)]
+
+
+def extractor(text: str):
+    return _extract_first_json_object(text)
+
+
+def stream(chunks):
+    p = JsonObjectStream()
+    for c in chunks:
+        p.feed(c)
+    return p.result()
+
+
+def polling(chunks):
+    buf = ""
+    for c in chunks:
+        buf += c
+        _extract_first_json_object(buf)
+
+
+def first_field_at(chunks, key: str) -> int:
+    p = JsonObjectStream()
+    for i, c in enumerate(chunks):
+        if any(k == key for k, _ in p.feed(c)):
+            return i + 1
+    return len(chunks)
+
+
+def _us(fn, arg, number: int) -> float:
+    return timeit.timeit(lambda: fn(arg), number=number) / number * 1e6
+
+
+def _row(n_items: int, fenced: bool):
+    text = _noisy_output(n_items, fenced)
+    chunks = _chunks(text)
+    assert stream(chunks) == extractor(text)
+    number = max(3, 2000 // n_items)
+    ext = _us(extractor, text, number)
+    stm = _us(stream, chunks, number)
+    print(f"{len(text) / 1024:7.1f} KB, {len(chunks):5d} chunks:"
+          f"  extractor {ext:9.1f} us   stream {stm:9.1f} us")
+    if n_items <= 100:
+        pol = _us(polling, chunks, max(1, number // 10))
+        print(f"{'':31s}polling   {pol:9.1f} us")
+    at = first_field_at(chunks, "score")
+    print(f"{'':31s}'score' ready after chunk {at}/{len(chunks)} ({at / len(chunks):.1%} of the output)")
+
+
+def main():
+    for fenced in (True, False):
+        print("fenced JSON" if fenced else "bare JSON between prose")
+        for n_items in (10, 100, 1000):
+            _row(n_items, fenced)
+
+
+if __name__ == "__main__":
+    main()
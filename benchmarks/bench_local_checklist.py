@@ -0,0 +1,102 @@
+# benchmarks/bench_local_checklist.py
+"""
+Rule-based checklist (local_checklist.score_checklist) vs the stored LLM checklists.
+
+For every finished attempt whose checklist came from the model (not a local estimate,
+not a parse failure) the transcript is re-scored locally and compared:
+  exact   = same status (done / partial / missing)
+  binary  = same "done or not"
+  score   = mean absolute error and Pearson r of checklist_score, both against the score
+            the model reported and against checklist_score() of the model's own items
+            (the reported number often disagrees with its items)
+The LLM's own spread on transcripts graded more than once is printed alongside: it is
+the floor any offline scorer can be measured against.
+Plus the local scorer's cost per transcript.
+
+Run from the repo root (APP_DB_PATH picks the database):
+    python -m benchmarks.bench_local_checklist
+"""
+import json
+import statistics
+import timeit
+from collections import defaultdict
+
+from local_checklist import ITEMS, canonical_item_id, checklist_score, score_checklist
+from storage import list_checklist_attempts
+
+
+def _llm_rows():
+    for a in list_checklist_attempts(limit=5000):
+        try:
+            rep = json.loads(a["checklist_json"] or "{}")
+        except ValueError:
+            continue
+        if not isinstance(rep, dict) or rep.get("source") == "local" or not rep.get("items"):
+            continue
+        yield a, rep
+
+
+def _pearson(xs, ys) -> float:
+    if len(xs) < 2 or statistics.pstdev(xs) == 0 or statistics.pstdev(ys) == 0:
+        return float("nan")
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / len(xs)
+    return cov / (statistics.pstdev(xs) * statistics.pstdev(ys))
+
+
+def main():
+    exact = defaultdict(int)
+    binary = defaultdict(int)
+    seen = defaultdict(int)
+    llm_scores, item_scores, local_scores = [], [], []
+    transcripts = []
+
+    for a, rep in _llm_rows():
+        ours = score_checklist(a["transcript"])
+        local = {it["id"]: it["status"] for it in ours["items"]}
+        transcripts.append(a["transcript"])
+        llm_scores.append(int(rep.get("checklist_score", 0) or 0))
+        item_scores.append(checklist_score(rep["items"]))
+        local_scores.append(ours["checklist_score"])
+        for it in rep["items"]:
+            item_id = canonical_item_id(it)
+            if not item_id:
+                continue
+            st = str(it.get("status") or "missing").lower()
+            seen[item_id] += 1
+            exact[item_id] += local[item_id] == st
+            binary[item_id] += (local[item_id] == "done") == (st == "done")
+
+    if not transcripts:
+        print("no LLM-graded attempts with a checklist in this database")
+        return
+
+    print(f"{len(transcripts)} LLM-graded attempts\n")
+    print(f"{'item':16s} {'n':>4s} {'exact':>7s} {'binary':>7s}")
+    for item_id, _ in ITEMS:
+        n = seen[item_id]
+        if n:
+            print(f"{item_id:16s} {n:4d} {exact[item_id] / n:7.0%} {binary[item_id] / n:7.0%}")
+    n = sum(seen.values())
+    print(f"{'all':16s} {n:4d} {sum(exact.values()) / n:7.0%} {sum(binary.values()) / n:7.0%}\n")
+
+    for label, ref in (("vs LLM score", llm_scores), ("vs LLM items", item_scores)):
+        mae = statistics.fmean(abs(x - y) for x, y in zip(ref, local_scores))
+        print(f"{label:16s} MAE {mae:.1f} points   Pearson r {_pearson(ref, local_scores):.2f}")
+    print(f"LLM score/items  Pearson r {_pearson(llm_scores, item_scores):.2f}")
+
+    by_text = defaultdict(list)
+    for t, x in zip(transcripts, llm_scores):
+        by_text[t].append(x)
+    repeats = [xs for xs in by_text.values() if len(xs) > 1]
+    if repeats:
+        self_mae = statistics.fmean(abs(x - statistics.fmean(xs)) for xs in repeats for x in xs)
+        print(f"LLM vs itself    MAE {self_mae:.1f} points from the mean, {len(repeats)} transcripts graded 2+ times")
+
+    number = 20
+    sec = timeit.timeit(lambda: [score_checklist(t) for t in transcripts], number=number)
+    print(f"local scorer     {sec / number / len(transcripts) * 1e6:.0f} us per transcript")
+
+
+if __name__ == "__main__":
+    main()
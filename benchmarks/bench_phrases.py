@@ -0,0 +1,76 @@
+# benchmarks/bench_phrases.py
+"""
+Per-utterance cost of filler/hedge/checklist-cue detection.
+
+legacy = the pre-matcher code: 7 str.count + stutter regex (fillers),
+         7 substring scans (hedges), ~11 re.search calls (checklist cues)
+matcher = phrases.MATCHER.scan (one pass, word boundaries)
+
+Run from the repo root:
+    python -m benchmarks.bench_phrases
+"""
+import re
+import timeit
+
+from phrases import MATCHER
+
+UTTERANCES = [
+    "AGENT: Hi, my name is Sam from the support team, how can I help you today?",
+    "AGENT: Um, so I I think the next step is, like, basically we'll reset your router within 24 hours.",
+    "AGENT: I'm sorry to hear that. Could you confirm the last four digits and your email?",
+    "AGENT: Just to confirm, so you're seeing a double charge on this month's bill, right?",
+    "AGENT: To summarize, we refunded it. Is there anything else? You'll get a short survey. Have a nice day!",
+    "AGENT: It's likely, uh, probably a sync issue, I guess, kind of on our side.",
+]
+
+# -------------------------
+# Legacy implementations (copied from evaluation.py before the matcher)
+# -------------------------
+_FILLERS = ["um", "uh", "erm", "like", "you know", "actually", "basically"]
+_UNCONFIDENT = ["maybe", "i think", "probably", "not sure", "i guess", "kind of", "sort of"]
+_LEGACY_CUES = [
+    r"\b(my name is|this is)\b",
+    r"\b(team|support|from|company)\b",
+    r"\bhow can i help\b",
+    r"\b(name|last\s*(4|four)|id|phone|phone number|email)\b",
+    r"\b(i understand|i'm sorry|sorry to hear|that sounds|i can imagine|i appreciate)\b",
+    r"\b(just to confirm|to confirm|to make sure i understand|if i understand|so you('re| are))\b",
+    r"\b(next step|what i('ll| will) do|within|today|tomorrow|minutes|hours|by (the end|eod))\b",
+    r"\b(to summarize|just to summarize|summary|recap)\b",
+    r"\b(survey|feedback|rate|rating)\b",
+    r"\b(anything else|goodbye|bye|thank you for calling|have a (good|nice) day)\b",
+    r"\b(can you|could you|what|when|where|which|how)\b",
+]
+
+
+def legacy(text: str):
+    t = text.lower()
+    fillers = sum(t.count(f) for f in _FILLERS) + len(re.findall(r"\b(\w+)\s+\1\b", t))
+    hedged = any(p in t for p in _UNCONFIDENT)
+    cues = [bool(re.search(p, t)) for p in _LEGACY_CUES]
+    return fillers, hedged, cues
+
+
+def matcher(text: str):
+    return MATCHER.scan(text)
+
+
+def _per_call_us(fn, number: int) -> float:
+    def run():
+        for u in UTTERANCES:
+            fn(u)
+    return timeit.timeit(run, number=number) / (number * len(UTTERANCES)) * 1e6
+
+
+def main(number: int = 5000):
+    old = _per_call_us(legacy, number)
+    new = _per_call_us(matcher, number)
+    print(f"legacy  : {old:7.2f} us/utterance")
+    print(f"matcher : {new:7.2f} us/utterance  ({old / new:.1f}x faster)")
+
+    # Accuracy difference the matcher fixes: substring hits inside other words
+    print("legacy fillers in 'likely':", legacy("likely")[0], "| matcher:", matcher("likely").get("filler", 0))
+
+
+if __name__ == "__main__":
+    main()
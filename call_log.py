@@ -0,0 +1,218 @@
+# call_log.py
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import CALL_LOG_FLUSH_SEC, CALL_LOG_BATCH, COACH_SESSION_MAX, COACH_SESSION_TTL_SEC
+from storage import (
+    append_call_turns,
+    get_call,
+    get_call_turns,
+    link_call_attempt,
+    list_unfinished_calls,
+    save_calls,
+)
+from ttl_cache import TTLCache
+
+MAX_TURN_CHARS = 2000
+ROLES = ("AGENT", "CUSTOMER")
+# A call with no attempt and no new turn for this long is offered for recovery (tab closed / crashed)
+RECOVER_IDLE_SEC = 120.0
+
+STATS: Dict[str, Any] = {
+    "turns": 0,          # new turns accepted
+    "duplicates": 0,     # re-sent turns skipped (retries, overlapping tails)
+    "gaps": 0,           # batches starting past the log end (browser resyncs from next_seq)
+    "flushes": 0,
+    "rows_written": 0,
+    "max_batch": 0,
+    "errors": 0,
+    "last_flush_ms": 0.0,
+}
+
+
+class _Call:
+    __slots__ = ("owner", "next_seq")
+
+    def __init__(self, owner: str, next_seq: int = 0):
+        self.owner = owner
+        self.next_seq = next_seq
+
+
+# call_id -> owner + number of turns logged so far (rows are always contiguous from seq 0)
+_CALLS = TTLCache(COACH_SESSION_MAX, COACH_SESSION_TTL_SEC, refresh_on_get=True)
+# Waiting for the next batched write
+_pending_calls: List[Dict[str, Any]] = []
+_pending: List[tuple] = []
+
+_wake: Optional[asyncio.Event] = None
+_flusher_task: Optional[asyncio.Task] = None
+# Held while a batch is written, so a reader's flush() waits for one already in progress
+_flush_lock: Optional[asyncio.Lock] = None
+
+
+async def _load(call_id: str) -> Optional[_Call]:
+    c = _CALLS.get(call_id)
+    if c is None:
+        await flush()
+        row = await asyncio.to_thread(get_call, call_id)
+        # Another request may have loaded or opened the call while we were reading
+        c = _CALLS.get(call_id)
+        if c is None and row:
+            c = _Call(row["user_email"], int(row["turns"] or 0))
+            _CALLS.put(call_id, c)
+    return c
+
+
+def _split(line: str) -> Tuple[str, str]:
+    role, sep, text = line.partition(":")
+    role = role.strip().upper()
+    if not sep or role not in ROLES:
+        return "", line
+    return role, text.strip()
+
+
+def _line(turn: Dict[str, Any]) -> str:
+    return f"{turn['role']}: {turn['text']}" if turn["role"] else turn["text"]
+
+
+# -------------------------
+# Public API (sqlite reads and writes run in a worker thread, off the event loop)
+# -------------------------
+async def owner(call_id: str) -> str:
+    """Email of the trainee whose call this is ("" = not logged yet)."""
+    c = await _load(call_id)
+    return c.owner if c else ""
+
+
+async def open_call(call_id: str, user_email: str, mode: str = "training", level: str = "", scenario_id: str = "") -> None:
+    if await _load(call_id) is not None:
+        return
+    _CALLS.put(call_id, _Call(user_email))
+    _pending_calls.append({
+        "call_id": call_id,
+        "user_email": user_email,
+        "mode": mode if mode in ("training", "exam") else "training",
+        "level": level or "easy",
+        "scenario_id": scenario_id,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+
+
+async def append(call_id: str, seq: int, lines: List[str]) -> Tuple[int, bool]:
+    """
+    Append transcript lines whose first element has sequence number `seq` to an opened call
+    (same delta protocol as coach_session). Returns (next_seq, ok); ok=False means a gap,
+    and the browser re-sends from next_seq.
+    """
+    c = await _load(call_id)
+    if c is None:
+        return 0, False
+    if seq > c.next_seq:
+        STATS["gaps"] += 1
+        return c.next_seq, False
+
+    skip = c.next_seq - max(0, seq)
+    STATS["duplicates"] += min(skip, len(lines))
+    now = time.time()
+    for ln in lines[skip:]:
+        role, text = _split(" ".join(str(ln or "").split())[:MAX_TURN_CHARS])
+        _pending.append((call_id, c.next_seq, role, text, now))
+        c.next_seq += 1
+        STATS["turns"] += 1
+
+    if _flusher_task is None:
+        await flush()  # no background writer (scripts, tests): write through
+    elif len(_pending) >= CALL_LOG_BATCH:
+        _wake.set()
+    return c.next_seq, True
+
+
+async def transcript(call_id: str) -> Tuple[str, int]:
+    """Server copy of the call as "ROLE: text" lines, and how many lines it has."""
+    await flush()
+    turns = await asyncio.to_thread(get_call_turns, call_id)
+    return "\n".join(_line(t) for t in turns if t["text"]).strip(), len(turns)
+
+
+async def finish(call_id: str, attempt_id: Optional[int]) -> None:
+    """The call was saved as an attempt: it is no longer offered for recovery."""
+    if not attempt_id or await _load(call_id) is None:
+        return
+    await flush()
+    await asyncio.to_thread(link_call_attempt, call_id, attempt_id)
+
+
+async def unfinished(user_email: str, limit: int = 5) -> List[Dict[str, Any]]:
+    await flush()
+    return await asyncio.to_thread(list_unfinished_calls, user_email, RECOVER_IDLE_SEC, limit=limit)
+
+
+def stats() -> Dict[str, Any]:
+    return {**STATS, "pending": len(_pending), "calls": _CALLS.stats()}
+
+
+# -------------------------
+# Batched writes
+# -------------------------
+def _write(calls: List[Dict[str, Any]], rows: List[tuple]) -> int:
+    save_calls(calls)
+    return append_call_turns(rows)
+
+
+async def flush() -> int:
+    """Write every pending call row and turn in one transaction each; returns turns written."""
+    if _flush_lock is None:
+        return await _flush()
+    async with _flush_lock:
+        return await _flush()
+
+
+async def _flush() -> int:
+    global _pending, _pending_calls
+    if not _pending and not _pending_calls:
+        return 0
+    calls, rows = _pending_calls, _pending
+    _pending_calls, _pending = [], []
+    t0 = time.monotonic()
+    try:
+        written = await asyncio.to_thread(_write, calls, rows)
+    except Exception as e:
+        # Keep them for the next flush (a locked database is usually transient)
+        _pending_calls, _pending = calls + _pending_calls, rows + _pending
+        STATS["errors"] += 1
+        print("[call_log] flush failed, will retry:", repr(e)[:200])
+        return 0
+
+    STATS["flushes"] += 1
+    STATS["rows_written"] += written
+    STATS["max_batch"] = max(STATS["max_batch"], len(rows))
+    STATS["last_flush_ms"] = round((time.monotonic() - t0) * 1000.0, 2)
+    return written
+
+
+async def _flusher() -> None:
+    while True:
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=CALL_LOG_FLUSH_SEC)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+        await flush()
+
+
+async def start_flusher() -> None:
+    global _wake, _flusher_task, _flush_lock
+    _wake = asyncio.Event()
+    _flush_lock = asyncio.Lock()
+    _flusher_task = asyncio.create_task(_flusher())
+
+
+async def stop_flusher() -> None:
+    global _flusher_task, _flush_lock
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        await asyncio.gather(_flusher_task, return_exceptions=True)
+        _flusher_task = None
+    await flush()
+    _flush_lock = None
@@ -0,0 +1,116 @@
+# coach_session.py
+import asyncio
+import secrets
+import time
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+from settings import COACH_SESSION_MAX, COACH_SESSION_TTL_SEC, TRANSCRIPT_MAX_LINES
+from script_state import ScriptState
+from ttl_cache import TTLCache
+
+MAX_LINE_CHARS = 2000
+# Lines of recent context handed to the live coach
+COACH_CONTEXT_LINES = 14
+
+
+class CoachSession:
+    """
+    Live-coach state for ONE call (one trainee, one WebRTC session).
+    Replaces the old process-wide cooldown so trainees never silence each other.
+    """
+
+    def __init__(self, call_id: str, user_email: str = "", level: str = "", scenario_id: str = ""):
+        self.call_id = call_id
+        self.user_email = user_email
+        self.level = level
+        self.scenario_id = scenario_id
+        self.created_at = time.time()
+
+        self.last_tip_at = 0.0
+        self.shown_tags: Set[str] = set()
+        self.shown_tips: Set[str] = set()
+        # (timestamp, trigger) for every trigger we evaluated, newest last
+        self.triggers: Deque[Tuple[float, str]] = deque(maxlen=50)
+
+        # Rolling transcript buffer rebuilt from client deltas.
+        # lines[0] has sequence number base_seq; the next expected line is next_seq.
+        self.lines: Deque[str] = deque(maxlen=TRANSCRIPT_MAX_LINES)
+        self.base_seq = 0
+        # Checklist flags, advanced one line at a time as deltas arrive
+        self.script = ScriptState()
+        # The coach task currently answering for this call; a newer delta cancels it
+        self.inflight: Optional[asyncio.Task] = None
+        # progressive.ProgressiveChecklist, created on the first delta
+        self.checklist = None
+
+    @property
+    def next_seq(self) -> int:
+        return self.base_seq + len(self.lines)
+
+    def append_lines(self, seq: int, lines: List[str]) -> bool:
+        """
+        Append lines whose first element has sequence number `seq`.
+        Overlap (a retried delta) is skipped; a gap returns False so the client resyncs from next_seq.
+        """
+        if seq > self.next_seq:
+            return False
+        for ln in lines[self.next_seq - seq:]:
+            ln = " ".join(str(ln or "").split())[:MAX_LINE_CHARS]
+            if len(self.lines) == self.lines.maxlen:
+                self.base_seq += 1
+            self.lines.append(ln)
+            self.script.feed(ln)
+        return True
+
+    def transcript(self, last_n: Optional[int] = None) -> str:
+        lines = list(self.lines)
+        if last_n is not None:
+            lines = lines[-last_n:]
+        return "\n".join(ln for ln in lines if ln).strip()
+
+    def in_cooldown(self, now: float, cooldown_sec: float) -> bool:
+        return now - self.last_tip_at < cooldown_sec
+
+    def record_trigger(self, trigger: str, now: Optional[float] = None) -> None:
+        self.triggers.append((now or time.time(), trigger))
+
+    def record_tip(self, tag: str, tip: str, now: Optional[float] = None) -> None:
+        self.last_tip_at = now or time.time()
+        self.shown_tags.add(tag)
+        self.shown_tips.add(tip)
+
+
+# Idle sessions expire after COACH_SESSION_TTL_SEC; the LRU bound keeps memory flat.
+SESSIONS = TTLCache(COACH_SESSION_MAX, COACH_SESSION_TTL_SEC, refresh_on_get=True)
+
+
+def new_call_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+def open_session(user_email: str, level: str = "", scenario_id: str = "", call_id: str = "") -> CoachSession:
+    s = CoachSession(call_id or new_call_id(), user_email=user_email, level=level, scenario_id=scenario_id)
+    SESSIONS.put(s.call_id, s)
+    return s
+
+
+def find_session(call_id: str, user_email: str) -> Optional[CoachSession]:
+    s = SESSIONS.get((call_id or "").strip()[:64])
+    if s is None or s.user_email != user_email:
+        return None
+    return s
+
+
+def get_session(call_id: str, user_email: str) -> CoachSession:
+    """
+    Look up this user's session issued by /session. Ids /session did not issue (or
+    that expired, or belong to another user) never create entries of their own, so a
+    client rotating ids cannot flood SESSIONS and evict other trainees' live calls:
+    they share the user's one fallback session, as requests without a call id do.
+    """
+    s = find_session(call_id, user_email)
+    if s is None:
+        fallback = f"user:{user_email}"
+        s = SESSIONS.get(fallback) or open_session(user_email, call_id=fallback)
+    return s
@@ -0,0 +1,141 @@
+# context.py
+import math
+from typing import List, Set
+
+from phrases import CHECKLIST_CUES, MATCHER
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+# Categories that count as checklist evidence ("question" is too common to be worth keeping)
+_EVIDENCE_CATEGORIES = [c for c in CHECKLIST_CUES if c != "question"]
+# Opening turns always kept: the checklist grades the greeting even on hour-long calls
+HEAD_TURNS = 4
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Exact with tiktoken installed, otherwise ~4 characters per token (close enough for budgets)."""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def transcript_turns(transcript: str) -> List[str]:
+    return [" ".join(ln.split()) for ln in (transcript or "").splitlines() if ln.strip()]
+
+
+class Context:
+    """A transcript cut down to whole turns, plus what it cost."""
+
+    def __init__(self, text: str, tokens: int, kept: int, total: int):
+        self.text = text
+        self.tokens = tokens
+        self.kept = kept
+        self.total = total
+
+    @property
+    def trimmed(self) -> bool:
+        return self.kept < self.total
+
+
+def build_context(
+    transcript: str,
+    budget_tokens: int,
+    head_turns: int = HEAD_TURNS,
+    evidence: bool = True,
+) -> Context:
+    """
+    Pick whole turns that fit in budget_tokens, in priority order:
+    1. the first head_turns turns (opening / identification),
+    2. the first AGENT turn showing each checklist step (when evidence=True),
+    3. the most recent turns, newest first,
+    4. any remaining evidence turns.
+    Kept turns stay in call order; each gap becomes one "[... N turns omitted ...]" line.
+    """
+    turns = transcript_turns(transcript)
+    costs = [count_tokens(t) + 1 for t in turns]  # +1 for the newline
+    total = sum(costs)
+    if total <= budget_tokens:
+        return Context("\n".join(turns), total, len(turns), len(turns))
+
+    first_evidence: List[int] = []
+    more_evidence: List[int] = []
+    if evidence:
+        seen: Set[str] = set()
+        for i, t in enumerate(turns):
+            if not t.upper().startswith("AGENT:"):
+                continue
+            cats = [c for c in MATCHER.scan(t) if c in _EVIDENCE_CATEGORIES]
+            if not cats:
+                continue
+            if any(c not in seen for c in cats):
+                first_evidence.append(i)
+                seen.update(cats)
+            else:
+                more_evidence.append(i)
+
+    keep: Set[int] = set()
+    used = 0
+    # room for the "[... N turns omitted ...]" markers: at most one per kept run of turns
+    gap_cost = 8 * (2 + len(first_evidence))
+
+    def take(i: int) -> bool:
+        nonlocal used
+        if i in keep:
+            return True
+        if used + costs[i] + gap_cost > budget_tokens:
+            return False
+        keep.add(i)
+        used += costs[i]
+        return True
+
+    for i in range(min(head_turns, len(turns))):
+        take(i)
+    for i in first_evidence:
+        take(i)
+    for i in range(len(turns) - 1, -1, -1):
+        if not take(i):
+            break
+    for i in more_evidence:
+        take(i)
+
+    out: List[str] = []
+    gap = 0
+    for i, t in enumerate(turns):
+        if i in keep:
+            if gap:
+                out.append(f"[... {gap} turns omitted ...]")
+                gap = 0
+            out.append(t)
+        else:
+            gap += 1
+    if gap:
+        out.append(f"[... {gap} turns omitted ...]")
+    text = "\n".join(out)
+    return Context(text, count_tokens(text), len(keep), len(turns))
+
+
+def recent_turns(transcript: str, budget_tokens: int) -> str:
+    """Newest whole turns that fit in budget_tokens (the last turn is always kept)."""
+    turns = transcript_turns(transcript)
+    out: List[str] = []
+    used = 0
+    for t in reversed(turns):
+        cost = count_tokens(t) + 1
+        if out and used + cost > budget_tokens:
+            break
+        out.append(t)
+        used += cost
+    return "\n".join(reversed(out))
@@ -1,36 +1,66 @@
 # evaluation.py
+import asyncio
+import hashlib
 import json
 import re
-from typing import Any, Dict, List, Optional
-
-from settings import client, COACH_MODEL, GRADER_MODEL
-from prompts import COACH_SYSTEM_PROMPT, GRADER_RUBRIC, CHECKLIST_SYSTEM_PROMPT
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from settings import (
+    aclient,
+    COACH_MODEL,
+    GRADER_MODEL,
+    LLM_TIMEOUT_SEC,
+    COACH_COOLDOWN_SEC,
+    COACH_DEADLINE_MS,
+    COACH_TIP_CACHE_MAX,
+    COACH_TIP_CACHE_TTL_SEC,
+    GRADE_DEADLINE_SEC,
+    EXAM_EVAL_MODE,
+    EVAL_CACHE_ENABLED,
+    EVAL_CACHE_MAX_ENTRIES,
+    GRADE_CONTEXT_TOKENS,
+    CHECKLIST_CONTEXT_TOKENS,
+    COACH_CONTEXT_TOKENS,
+)
+from coach_session import CoachSession
+from script_state import ScriptState
+from phrases import MATCHER, fingerprint
+from context import build_context, count_tokens, recent_turns
+from local_checklist import checklist_score, score_checklist
+from jsonstream import JsonObjectStream
+from ttl_cache import TTLCache
+from limiter import OPENAI_LIMITER, COACH, LimiterFull
+from storage import get_cached_eval, put_cached_eval
+from prompts import (
+    COACH_SYSTEM_PROMPT,
+    GRADER_RUBRIC,
+    CHECKLIST_SYSTEM_PROMPT,
+    CHECKLIST_SEGMENT_PROMPT,
+    EXAM_FUSED_PROMPT,
+    COACH_TEMPLATES,
+)
+
+
+class EvaluationError(RuntimeError):
+    """Raised by strict evaluations (background jobs) instead of returning a placeholder result."""
 
 
 # -------------------------
 # Transcript helpers
 # -------------------------
-def _tail(s: str, n: int) -> str:
-    return (s or "")[-n:]
-
-
-def _last_nonempty_line(transcript: str) -> str:
-    lines = [ln.strip() for ln in (transcript or "").splitlines() if ln.strip()]
-    return lines[-1] if lines else ""
-
-
-def _extract_recent_context(transcript: str, max_lines: int = 14) -> str:
-    lines = [ln.strip() for ln in (transcript or "").splitlines() if ln.strip()]
-    return "\n".join(lines[-max_lines:])[-2400:]
-
-
-def _agent_only(transcript: str) -> str:
-    lines = [ln.strip() for ln in (transcript or "").splitlines() if ln.strip()]
-    return "\n".join([ln for ln in lines if ln.upper().startswith("AGENT:")])
-
-
-def _has_customer(transcript: str) -> bool:
-    return "CUSTOMER:" in (transcript or "").upper()
+def _log_llm_call(model: str, system_prompt: str, user_prompt: str, elapsed: float, r: Any = None) -> None:
+    """One line per LLM call: input size (from usage when the API reports it, else counted locally)."""
+    usage = getattr(r, "usage", None)
+    tin = getattr(usage, "input_tokens", None)
+    tout = getattr(usage, "output_tokens", None)
+    if tin is None:
+        tin = count_tokens(system_prompt) + count_tokens(user_prompt)
+        src = "est"
+    else:
+        src = "api"
+    out = f" out={tout}" if tout is not None else ""
+    print(f"[evaluation] llm {model}: in={tin} ({src}, user={count_tokens(user_prompt)}){out} {elapsed:.2f}s")
 
 
 # -------------------------
@@ -72,12 +102,26 @@ def _response_to_text(r: Any) -> str:
     return ""
 
 
-def _responses_text(system_prompt: str, user_prompt: str, model: str, max_output_tokens: int) -> str:
+async def _responses_text(
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    max_output_tokens: int,
+    timeout: Optional[float] = None,
+    priority: Optional[int] = None,
+) -> str:
     """
     NOTE: We intentionally do NOT pass response_format here because some SDK builds reject it.
     Instead, we enforce robust JSON extraction + parsing.
+
+    Runs on the async client so the event loop keeps serving other trainees while we wait.
+    `timeout` (seconds) defaults to LLM_TIMEOUT_SEC and includes the wait for an
+    OPENAI_LIMITER slot (`priority` defaults to the caller's limiter.priority()). If the
+    calling task is cancelled, CancelledError propagates and the in-flight HTTP request is aborted.
+    Failures return "", except LimiterFull: the queue was full, nothing is wrong with the
+    output, so it propagates and background jobs back off and retry.
     """
-    if client is None:
+    if aclient is None:
         return ""
 
     payload = [
@@ -85,18 +129,89 @@ def _responses_text(system_prompt: str, user_prompt: str, model: str, max_output
         {"role": "user", "content": user_prompt},
     ]
 
+    timeout = LLM_TIMEOUT_SEC if timeout is None else timeout
+
+    async def call():
+        async with OPENAI_LIMITER.slot(priority):
+            return await aclient.responses.create(
+                model=model,
+                input=payload,
+                max_output_tokens=max_output_tokens,
+            )
+
+    t0 = time.monotonic()
     try:
-        r = client.responses.create(
-            model=model,
-            input=payload,
-            max_output_tokens=max_output_tokens,
-        )
+        r = await asyncio.wait_for(call(), timeout=timeout)
+        _log_llm_call(model, system_prompt, user_prompt, time.monotonic() - t0, r)
         return _response_to_text(r)
+    except asyncio.TimeoutError:
+        print(f"[evaluation] responses.create timed out after {timeout:.1f}s")
+        return ""
+    except LimiterFull:
+        raise
     except Exception as e:
         print("[evaluation] responses.create failed:", repr(e))
         return ""
 
 
+async def _responses_stream(
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    max_output_tokens: int,
+    on_text: Callable[[str], Awaitable[None]],
+    timeout: Optional[float] = None,
+    priority: Optional[int] = None,
+) -> str:
+    """
+    Streaming variant of _responses_text: awaits on_text(chunk) for every output text
+    delta as it arrives and returns the full text at the end. Same failure contract ("",
+    LimiterFull propagates).
+    """
+    if aclient is None:
+        return ""
+
+    payload = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    timeout = LLM_TIMEOUT_SEC if timeout is None else timeout
+    chunks: List[str] = []
+
+    async def consume():
+        async with OPENAI_LIMITER.slot(priority):
+            stream = await aclient.responses.create(
+                model=model,
+                input=payload,
+                max_output_tokens=max_output_tokens,
+                stream=True,
+            )
+            try:
+                async for event in stream:
+                    if getattr(event, "type", "") == "response.output_text.delta":
+                        delta = getattr(event, "delta", "") or ""
+                        if delta:
+                            chunks.append(delta)
+                            await on_text(delta)
+            finally:
+                await stream.close()
+
+    t0 = time.monotonic()
+    try:
+        await asyncio.wait_for(consume(), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"[evaluation] responses stream timed out after {timeout:.1f}s")
+        return ""
+    except LimiterFull:
+        raise
+    except Exception as e:
+        print("[evaluation] responses stream failed:", repr(e))
+        return ""
+    _log_llm_call(model, system_prompt, user_prompt, time.monotonic() - t0)
+    return "".join(chunks).strip()
+
+
 # -------------------------
 # JSON extraction (more robust for production)
 # -------------------------
@@ -187,107 +302,115 @@ def _extract_first_json_object(text: str) -> Optional[dict]:
 
 
 # -------------------------
-# Coach heuristics (reduce nonsense + make tips appear at the right time)
+# Public API
 # -------------------------
-def _script_state(transcript: str) -> dict:
-    a = _agent_only(transcript).lower()
+# Coach tip memo: same trigger + scenario + normalized last agent utterance => reuse the tip.
+# TTL counts from insertion so tips refresh even for hot keys. Stats: COACH_TIP_CACHE.stats()
+COACH_TIP_CACHE = TTLCache(COACH_TIP_CACHE_MAX, COACH_TIP_CACHE_TTL_SEC)
 
-    opening_done = bool(
-        re.search(r"\b(my name is|this is)\b", a)
-        and re.search(r"\b(team|support|from|company)\b", a)
-        and re.search(r"\bhow can i help\b", a)
-    )
-    identification_done = bool(re.search(r"\b(name|last\s*(4|four)|id|phone|phone number|email)\b", a))
-    empathy_done = bool(re.search(r"\b(i understand|i'm sorry|sorry to hear|that sounds|i can imagine|i appreciate)\b", a))
-    restate_done = bool(re.search(r"\b(just to confirm|to confirm|to make sure i understand|if i understand|so you('re| are))\b", a))
-    expectations_done = bool(re.search(r"\b(next step|what i('ll| will) do|within|today|tomorrow|minutes|hours|by (the end|eod))\b", a))
-    close_done = bool(re.search(r"\b(to summarize|just to summarize|summary|recap)\b", a))
-    feedback_done = bool(re.search(r"\b(survey|feedback|rate|rating)\b", a))
-    near_closing = bool(re.search(r"\b(anything else|goodbye|bye|thank you for calling|have a (good|nice) day)\b", a))
 
-    # clarify: ONLY after the customer spoke at least once
-    clarify_done = bool(_has_customer(transcript) and ("?" in a or re.search(r"\b(can you|could you|what|when|where|which|how)\b", a)))
+def _coach_cache_key(trigger: str, scenario_id: str, agent_text: str, step: str = "") -> tuple:
+    return (trigger, scenario_id or "", step or "", fingerprint(agent_text))
 
-    return {
-        "opening_done": opening_done,
-        "identification_done": identification_done,
-        "empathy_done": empathy_done,
-        "clarify_done": clarify_done,
-        "restate_done": restate_done,
-        "expectations_done": expectations_done,
-        "close_done": close_done,
-        "feedback_done": feedback_done,
-        "near_closing": near_closing,
-    }
 
+# How often each tier answered (tier 0 = template, tier 1 = LLM or its cache)
+COACH_TIER_STATS = {"tier0": 0, "tier1_cache": 0, "tier1_llm": 0}
 
-def _next_missing_step(state: dict, transcript: str) -> Optional[str]:
-    if not state["opening_done"]:
-        return "opening"
-    if _has_customer(transcript) and not state["empathy_done"]:
-        return "empathy"
-    if _has_customer(transcript) and not state["clarify_done"]:
-        return "clarify"
-    if _has_customer(transcript) and not state["restate_done"]:
-        return "restate"
-    if _has_customer(transcript) and not state["expectations_done"]:
-        return "expectations"
-    if state["near_closing"]:
-        if not state["close_done"]:
-            return "close"
-        if not state["feedback_done"]:
-            return "feedback"
-    return None
 
+def _step_due(step: Optional[str], state: ScriptState) -> bool:
+    """
+    A missing checklist step is worth a template tip only once the agent had a
+    chance to do it: right after an AGENT turn (or during a silence).
+    Opening gets two agent turns; the rest are judged after the customer spoke.
+    """
+    if not step or step not in COACH_TEMPLATES:
+        return False
+    if step == "opening":
+        return state.agent_turns >= 2 or (state.has_customer and state.agent_turns >= 1)
+    return state.agent_turns >= 1
 
-# -------------------------
-# Public API
-# -------------------------
-# evaluation.py
-import re
-import time
-from typing import Dict, Any
 
-_LAST_TIP_AT = 0.0
+def _last_agent_line(transcript: str) -> str:
+    for ln in reversed((transcript or "").splitlines()):
+        if ln.strip().upper().startswith("AGENT:"):
+            return ln.strip()[6:].strip()
+    return ""
 
-_FILLERS = ["um", "uh", "erm", "like", "you know", "actually", "basically"]
-_UNCONFIDENT = ["maybe", "i think", "probably", "not sure", "i guess", "kind of", "sort of"]
 
+def _deliver_tip(
+    session: CoachSession,
+    tag: str,
+    tip: str,
+    urgency: str,
+    now: float,
+    tier: int = 1,
+    cached: bool = False,
+) -> Dict[str, Any]:
+    if tip in session.shown_tips:
+        return {
+            "should_intervene": False,
+            "tip": "",
+            "reason_tag": "repeat",
+            "urgency": "low",
+        }
 
-def _count_fillers(text: str) -> int:
-    t = (text or "").lower()
-    count = 0
-    for f in _FILLERS:
-        count += t.count(f)
-    # stutter like "I I", "we we"
-    count += len(re.findall(r"\b(\w+)\s+\1\b", t))
-    return count
+    session.record_tip(tag, tip, now)
+    if tier == 0:
+        COACH_TIER_STATS["tier0"] += 1
+    else:
+        COACH_TIER_STATS["tier1_cache" if cached else "tier1_llm"] += 1
+    out = {
+        "should_intervene": True,
+        "tip": tip,
+        "reason_tag": tag,
+        "urgency": urgency,
+        "tier": tier,
+    }
+    if cached:
+        out["cached"] = True
+    return out
 
 
-def _has_unconfident(text: str) -> bool:
-    t = (text or "").lower()
-    return any(p in t for p in _UNCONFIDENT)
+async def coach_tips(
+    transcript: str,
+    meta: Dict[str, Any] | None = None,
+    session: Optional[CoachSession] = None,
+    on_tip_delta: Optional[Callable[[str, str], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """
+    `session` carries the per-call state (cooldown, shown tags/tips, trigger history).
+    Without one, a throwaway session is used (no cooldown across calls).
 
+    Tiered:
+    - tier 0: the checklist state says a step is missing and due -> COACH_TEMPLATES line, no network.
+    - tier 1: a delivery trigger (silence/fluency/confidence) with no unused template -> LLM (memoized).
+
+    The LLM step is bounded by COACH_DEADLINE_MS (meta["deadline_ms"] overrides);
+    past it we answer should_intervene=false, reason_tag="deadline".
+
+    With on_tip_delta(reason_tag, tip_so_far), the LLM output is streamed and the
+    "tip" field is forwarded as soon as its first tokens arrive; the return value
+    is still the final, validated answer.
 
-def coach_tips(transcript: str, meta: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    """
     Returns:
     {
       should_intervene: bool,
       tip: str,
       reason_tag: str,
-      urgency: low|medium|high
+      urgency: low|medium|high,
+      tier: 0|1 (only when should_intervene)
     }
     """
-    global _LAST_TIP_AT
     meta = meta or {}
+    session = session or CoachSession("adhoc")
+    started = time.monotonic()
+    deadline_ms = int(meta.get("deadline_ms") or COACH_DEADLINE_MS)
 
     # ------------------
     # Cooldown (anti-spam)
     # ------------------
     now = time.time()
-    COOLDOWN_SEC = 12
-    if now - _LAST_TIP_AT < COOLDOWN_SEC:
+    if session.in_cooldown(now, COACH_COOLDOWN_SEC):
         return {
             "should_intervene": False,
             "tip": "",
@@ -297,10 +420,11 @@ def coach_tips(transcript: str, meta: Dict[str, Any] | None = None) -> Dict[str,
 
     silence_ms = int(meta.get("silence_ms") or 0)
     agent_last = (meta.get("agent_last_utterance") or "").strip()
-    recent_text = agent_last or transcript[-300:]
+    recent_text = agent_last or recent_turns(transcript, 80)
 
-    fillers = _count_fillers(recent_text)
-    unconfident = _has_unconfident(recent_text)
+    hits = MATCHER.scan(recent_text)
+    fillers = hits.get("filler", 0) + hits.get("stutter", 0)
+    unconfident = hits.get("hedge", 0) > 0
 
     trigger = None
     urgency = "low"
@@ -321,6 +445,17 @@ def coach_tips(transcript: str, meta: Dict[str, Any] | None = None) -> Dict[str,
         trigger = "confidence"
         urgency = "medium"
 
+    # ------------------
+    # Tier 0: checklist template
+    # ------------------
+    # Live calls advance session.script per delta; legacy full-transcript posts rebuild it.
+    state = session.script if session.next_seq else ScriptState.from_transcript(transcript)
+    step = state.next_missing_step()
+    due_step = step if _step_due(step, state) else None
+    if due_step and due_step not in session.shown_tags and (trigger or state.last_role == "AGENT"):
+        session.record_trigger(trigger or due_step, now)
+        return _deliver_tip(session, due_step, COACH_TEMPLATES[due_step], "high" if trigger else "medium", now, tier=0)
+
     if not trigger:
         return {
             "should_intervene": False,
@@ -329,14 +464,32 @@ def coach_tips(transcript: str, meta: Dict[str, Any] | None = None) -> Dict[str,
             "urgency": "low",
         }
 
+    session.record_trigger(trigger, now)
+
+    # The browser never shows the same tag twice, so don't pay for a tip it would drop.
+    if trigger in session.shown_tags:
+        return {
+            "should_intervene": False,
+            "tip": "",
+            "reason_tag": "repeat",
+            "urgency": "low",
+        }
+
     # ------------------
-    # Ask LLM for ONE short tip
+    # Tier 1: ambiguous (delivery problem) or the step's template was already used -> LLM
     # ------------------
+    cache_key = _coach_cache_key(trigger, session.scenario_id, agent_last or _last_agent_line(transcript), due_step or "")
+    cached_tip = COACH_TIP_CACHE.get(cache_key)
+    if cached_tip:
+        return _deliver_tip(session, trigger, cached_tip, urgency, now, cached=True)
+
+    step_hint = f"\nMissing checklist step (template already shown): {due_step}\n" if due_step else ""
+
     try:
         user_msg = f"""
 Return STRICT JSON only.
 
-Trigger: {trigger}
+Trigger: {trigger}{step_hint}
 Write ONE short coaching tip (max 16 words).
 
 Rules:
@@ -345,18 +498,31 @@ Rules:
 - Confidence → stronger phrasing
 
 Recent context:
-{transcript[-400:]}
+{recent_turns(transcript, COACH_CONTEXT_TOKENS)}
 
 Agent last utterance:
 {agent_last}
 """
 
-        raw = _responses_text(
-            COACH_SYSTEM_PROMPT,
-            user_msg,
-            COACH_MODEL,
-            max_output_tokens=120,
-        )
+        # Whatever is left of the latency budget; wait_for cancels the LLM call when it runs out
+        budget = deadline_ms / 1000.0 - (time.monotonic() - started)
+        if budget <= 0:
+            raise asyncio.TimeoutError
+        if on_tip_delta is None:
+            llm_call = _responses_text(COACH_SYSTEM_PROMPT, user_msg, COACH_MODEL, max_output_tokens=120, priority=COACH)
+        else:
+            parser = JsonObjectStream()
+            shown = {"tip": ""}
+
+            async def forward(chunk: str):
+                parser.feed(chunk)
+                tip_so_far = parser.partial("tip")
+                if tip_so_far != shown["tip"]:
+                    shown["tip"] = tip_so_far
+                    await on_tip_delta(trigger, " ".join(tip_so_far.split()[:16]))
+
+            llm_call = _responses_stream(COACH_SYSTEM_PROMPT, user_msg, COACH_MODEL, 120, on_text=forward, priority=COACH)
+        raw = await asyncio.wait_for(llm_call, timeout=budget)
 
         data = _extract_first_json_object(raw)
         tip = (data or {}).get("tip", "").strip()
@@ -372,14 +538,23 @@ Agent last utterance:
         # clamp length
         tip = " ".join(tip.split()[:16])
 
-        _LAST_TIP_AT = now
+        COACH_TIP_CACHE.put(cache_key, tip)
+        return _deliver_tip(session, trigger, tip, urgency, now)
+
+    except asyncio.TimeoutError:
         return {
-            "should_intervene": True,
-            "tip": tip,
-            "reason_tag": trigger,
-            "urgency": urgency,
+            "should_intervene": False,
+            "tip": "",
+            "reason_tag": "deadline",
+            "urgency": "low",
+        }
+    except LimiterFull:
+        return {
+            "should_intervene": False,
+            "tip": "",
+            "reason_tag": "busy",
+            "urgency": "low",
         }
-
     except Exception:
         return {
             "should_intervene": False,
@@ -389,8 +564,120 @@ Agent last utterance:
         }
 
 
-def grade_exam(transcript: str) -> Dict[str, Any]:
-    if client is None:
+# -------------------------
+# Evaluation result cache (post-call grading only)
+# -------------------------
+# Bump to invalidate every stored result when the _clean_* output shape changes.
+_EVAL_CACHE_VERSION = 1
+
+EVAL_CACHE_STATS = {"hits": 0, "misses": 0, "shared": 0}
+
+# key -> [task, waiters]: identical evaluations running at the same time share one LLM call
+_EVAL_INFLIGHT: Dict[str, list] = {}
+
+
+def _eval_cache_key(kind: str, system_prompt: str, user_prompt: str, model: str, **params) -> str:
+    # The full prompt text is hashed in, so editing a prompt or switching models is a cache miss.
+    blob = json.dumps(
+        {
+            "v": _EVAL_CACHE_VERSION,
+            "kind": kind,
+            "system": system_prompt,
+            "input": user_prompt,
+            "model": model,
+            "params": params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+async def _eval_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    # sqlite is blocking: run it on a worker thread so grading never stalls the event loop
+    if not EVAL_CACHE_ENABLED:
+        return None
+    try:
+        hit = await asyncio.to_thread(get_cached_eval, key)
+    except Exception as e:
+        print("[evaluation] eval cache read failed:", repr(e))
+        return None
+    EVAL_CACHE_STATS["hits" if hit is not None else "misses"] += 1
+    return hit
+
+
+async def _eval_cache_put(key: str, kind: str, result: Dict[str, Any]) -> None:
+    if not EVAL_CACHE_ENABLED:
+        return
+    try:
+        await asyncio.to_thread(put_cached_eval, key, kind, result, EVAL_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        print("[evaluation] eval cache write failed:", repr(e))
+
+
+def rubric_version() -> str:
+    """Short hash of everything that shapes a post-call score: prompts, grader model, output shape."""
+    blob = "\x00".join([
+        GRADER_RUBRIC, CHECKLIST_SYSTEM_PROMPT, CHECKLIST_SEGMENT_PROMPT, EXAM_FUSED_PROMPT,
+        GRADER_MODEL, str(_EVAL_CACHE_VERSION),
+    ])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+async def _responses_text_shared(key: str, system_prompt: str, user_prompt: str, model: str, max_output_tokens: int) -> str:
+    """
+    _responses_text, but concurrent callers with the same cache key (double-clicked "Finish",
+    two workers on duplicate jobs) await one request. The call is cancelled only when
+    every waiter has gone away.
+    """
+    def forget(task: asyncio.Task) -> None:
+        if _EVAL_INFLIGHT.get(key, (None,))[0] is task:
+            del _EVAL_INFLIGHT[key]
+
+    entry = _EVAL_INFLIGHT.get(key)
+    if entry is None:
+        task = asyncio.create_task(_responses_text(system_prompt, user_prompt, model, max_output_tokens))
+        entry = _EVAL_INFLIGHT[key] = [task, 0]
+        task.add_done_callback(forget)
+    else:
+        EVAL_CACHE_STATS["shared"] += 1
+    task = entry[0]
+    entry[1] += 1
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if entry[1] == 1:
+            forget(task)
+            task.cancel()
+        raise
+    finally:
+        entry[1] -= 1
+
+
+async def _stream_fields(
+    system_prompt: str,
+    user_prompt: str,
+    model: str,
+    max_output_tokens: int,
+    on_field: Callable[[str, Any], Awaitable[None]],
+) -> str:
+    """Streamed call that hands every completed top-level JSON field to on_field(key, value) as it lands."""
+    parser = JsonObjectStream()
+
+    async def forward(chunk: str):
+        for k, v in parser.feed(chunk):
+            await on_field(k, v)
+
+    return await _responses_stream(system_prompt, user_prompt, model, max_output_tokens, on_text=forward)
+
+
+async def grade_exam(
+    transcript: str,
+    strict: bool = False,
+    on_field: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """on_field(key, value), if given, sees "score"/"pass"/... as soon as each is generated."""
+    if aclient is None:
         return {
             "score": 0,
             "pass": False,
@@ -399,12 +686,22 @@ def grade_exam(transcript: str) -> Dict[str, Any]:
             "improvements": ["Set OPENAI_API_KEY and restart the server."],
         }
 
-    payload = (_tail(transcript, 4500).strip() or "(empty transcript)")
-    txt = _responses_text(GRADER_RUBRIC, payload, GRADER_MODEL, max_output_tokens=360)
+    payload = build_context(transcript, GRADE_CONTEXT_TOKENS).text or "(empty transcript)"
+    key = _eval_cache_key("grade", GRADER_RUBRIC, payload, GRADER_MODEL, max_output_tokens=360)
+    cached = await _eval_cache_get(key)
+    if cached is not None:
+        return cached
+
+    if on_field is not None:
+        txt = await _stream_fields(GRADER_RUBRIC, payload, GRADER_MODEL, 360, on_field)
+    else:
+        txt = await _responses_text_shared(key, GRADER_RUBRIC, payload, GRADER_MODEL, max_output_tokens=360)
     data = _extract_first_json_object(txt)
 
     if not data:
         print("[evaluation] grader raw (non-json):", (txt or "")[:800])
+        if strict:
+            raise EvaluationError("Could not parse grader output.")
         return {
             "score": 0,
             "pass": False,
@@ -413,6 +710,13 @@ def grade_exam(transcript: str) -> Dict[str, Any]:
             "improvements": ["Try again."],
         }
 
+    result = _clean_grade(data)
+    await _eval_cache_put(key, "grade", result)
+    return result
+
+
+def _clean_grade(data: dict) -> Dict[str, Any]:
+    """Validate raw grader JSON into the shape stored on exam attempts."""
     score = max(0, min(100, int(data.get("score", 0) or 0)))
     passed = bool(data.get("pass", score >= 70))
     strengths = [str(x).strip() for x in (data.get("strengths") or []) if str(x).strip()][:5]
@@ -427,17 +731,17 @@ def grade_exam(transcript: str) -> Dict[str, Any]:
     }
 
 
-def evaluate_checklist(transcript: str, customer_type: str = "", emotion_level: Optional[int] = None) -> Dict[str, Any]:
-    if client is None:
-        return {
-            "checklist_score": 0,
-            "items": [],
-            "highlights": [],
-            "improvements": ["Set OPENAI_API_KEY and restart the server."],
-            "next_time_say": [],
-        }
+async def evaluate_checklist(
+    transcript: str,
+    customer_type: str = "",
+    emotion_level: Optional[int] = None,
+    strict: bool = False,
+) -> Dict[str, Any]:
+    if aclient is None:
+        # No key: the rule-based checklist is still a usable report
+        return score_checklist(transcript)
 
-    payload = (_tail(transcript, 6500).strip() or "(empty transcript)")
+    payload = build_context(transcript, CHECKLIST_CONTEXT_TOKENS).text or "(empty transcript)"
 
     meta = []
     if customer_type:
@@ -446,21 +750,30 @@ def evaluate_checklist(transcript: str, customer_type: str = "", emotion_level:
         meta.append(f"emotion_level={emotion_level}")
     meta_txt = ("\nMeta: " + ", ".join(meta)) if meta else ""
 
-    txt = _responses_text(CHECKLIST_SYSTEM_PROMPT, payload + meta_txt, GRADER_MODEL, max_output_tokens=900)
+    key = _eval_cache_key("checklist", CHECKLIST_SYSTEM_PROMPT, payload + meta_txt, GRADER_MODEL, max_output_tokens=900)
+    cached = await _eval_cache_get(key)
+    if cached is not None:
+        return cached
+
+    txt = await _responses_text_shared(key, CHECKLIST_SYSTEM_PROMPT, payload + meta_txt, GRADER_MODEL, max_output_tokens=900)
     data = _extract_first_json_object(txt)
 
     if not data:
         # This is the exact case you see on deploy:
         # model returns fenced JSON or adds preface text -> parser fails.
         print("[evaluation] checklist raw (non-json):", (txt or "")[:1200])
-        return {
-            "checklist_score": 0,
-            "items": [],
-            "highlights": [],
-            "improvements": ["Could not parse checklist output2222."],
-            "next_time_say": [],
-        }
+        if strict:
+            raise EvaluationError("Could not parse checklist output.")
+        # Not the rule-based estimate: stored as the final report it would pass for a real grade
+        return _checklist_failed("Could not parse checklist output.")
 
+    result = _clean_checklist(data)
+    await _eval_cache_put(key, "checklist", result)
+    return result
+
+
+def _clean_checklist(data: dict) -> Dict[str, Any]:
+    """Validate raw checklist JSON into the shape stored in checklist_json."""
     score = max(0, min(100, int(data.get("checklist_score", 0) or 0)))
 
     items = data.get("items") or []
@@ -491,3 +804,190 @@ def evaluate_checklist(transcript: str, customer_type: str = "", emotion_level:
         "improvements": improvements,
         "next_time_say": next_time_say,
     }
+
+
+def _grade_failed(reason: str) -> Dict[str, Any]:
+    return {
+        "score": 0,
+        "pass": False,
+        "summary": reason,
+        "strengths": [],
+        "improvements": ["Try again."],
+    }
+
+
+def _checklist_failed(reason: str) -> Dict[str, Any]:
+    return {
+        "checklist_score": 0,
+        "items": [],
+        "highlights": [],
+        "improvements": [reason],
+        "next_time_say": [],
+    }
+
+
+# -------------------------
+# Progressive checklist (segments scored during the call, merged at hang-up)
+# -------------------------
+_STATUS_RANK = {"missing": 0, "partial": 1, "done": 2}
+
+
+async def evaluate_checklist_segment(context_lines: List[str], segment_lines: List[str]) -> Optional[Dict[str, Any]]:
+    """Score one slice of a live call. Returns None on any failure so the caller can retry later."""
+    if aclient is None or not segment_lines:
+        return None
+    payload = "Earlier context:\n" + ("\n".join(context_lines) or "(start of call)")
+    payload += "\n\nSegment:\n" + "\n".join(segment_lines)
+    key = _eval_cache_key("checklist_segment", CHECKLIST_SEGMENT_PROMPT, payload, GRADER_MODEL, max_output_tokens=900)
+    cached = await _eval_cache_get(key)
+    if cached is not None:
+        return cached
+
+    txt = await _responses_text_shared(key, CHECKLIST_SEGMENT_PROMPT, payload, GRADER_MODEL, max_output_tokens=900)
+    data = _extract_first_json_object(txt)
+    if not data or not data.get("items"):
+        print("[evaluation] checklist segment raw (non-json):", (txt or "")[:600])
+        return None
+    result = _clean_checklist(data)
+    await _eval_cache_put(key, "checklist_segment", result)
+    return result
+
+
+def merge_checklists(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-segment checklists (oldest first) into one report of the evaluate_checklist shape.
+    Each item keeps its best status across segments (done > partial > missing) with that
+    segment's evidence; feedback lists prefer the latest segment. The score is recomputed from
+    the merged items (done = 1, partial = 0.5).
+    """
+    items: Dict[str, Dict[str, Any]] = {}
+    for part in parts:
+        for it in part.get("items") or []:
+            cur = items.get(it["id"])
+            if cur is None or _STATUS_RANK.get(it["status"], 0) > _STATUS_RANK.get(cur["status"], 0):
+                items[it["id"]] = dict(it)
+
+    def latest_first(field: str, n: int) -> List[str]:
+        out: List[str] = []
+        for part in reversed(parts):
+            for x in part.get(field) or []:
+                if x not in out:
+                    out.append(x)
+        return out[:n]
+
+    merged = list(items.values())
+    return {
+        "checklist_score": checklist_score(merged),
+        "items": merged,
+        "highlights": latest_first("highlights", 4),
+        "improvements": latest_first("improvements", 6),
+        "next_time_say": latest_first("next_time_say", 2),
+    }
+
+
+async def evaluate_exam_fused(
+    transcript: str,
+    strict: bool = False,
+    on_field: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+):
+    """
+    ONE LLM call that returns grade + checklist together (EXAM_FUSED_PROMPT), validated into
+    the exact shapes grade_exam and evaluate_checklist produce. Returns (grade, checklist).
+    """
+    if aclient is None:
+        return await grade_exam(transcript), await evaluate_checklist(transcript)
+
+    payload = build_context(transcript, CHECKLIST_CONTEXT_TOKENS).text or "(empty transcript)"
+    key = _eval_cache_key("exam_fused", EXAM_FUSED_PROMPT, payload, GRADER_MODEL, max_output_tokens=1200)
+    cached = await _eval_cache_get(key)
+    if cached is not None:
+        return cached["grade"], cached["checklist"]
+
+    if on_field is not None:
+        txt = await _stream_fields(EXAM_FUSED_PROMPT, payload, GRADER_MODEL, 1200, on_field)
+    else:
+        txt = await _responses_text_shared(key, EXAM_FUSED_PROMPT, payload, GRADER_MODEL, max_output_tokens=1200)
+    data = _extract_first_json_object(txt)
+
+    if not data:
+        print("[evaluation] fused exam raw (non-json):", (txt or "")[:1200])
+        if strict:
+            raise EvaluationError("Could not parse fused exam output.")
+        return _grade_failed("Could not parse grader output."), _checklist_failed("Could not parse checklist output.")
+
+    checklist = data.get("checklist")
+    if not isinstance(checklist, dict) and "items" in data:
+        checklist = data  # model flattened the checklist into the top level
+    if not isinstance(checklist, dict):
+        if strict:
+            raise EvaluationError("Fused exam output has no checklist.")
+        return _clean_grade(data), _checklist_failed("Could not parse checklist output.")
+    grade, checklist = _clean_grade(data), _clean_checklist(checklist)
+    await _eval_cache_put(key, "exam_fused", {"grade": grade, "checklist": checklist})
+    return grade, checklist
+
+
+async def grade_exam_and_checklist(
+    transcript: str,
+    deadline_sec: Optional[float] = None,
+    mode: Optional[str] = None,
+    strict: bool = False,
+    on_field: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+):
+    """
+    Full exam evaluation under one shared deadline. Returns (grade, checklist).
+
+    mode (default EXAM_EVAL_MODE):
+    - "split": grade_exam and evaluate_checklist run concurrently; total latency ~ max of the two.
+      A failure or timeout in one never discards the other: the missing half comes back as a
+      zero-score placeholder with the reason.
+    - "fused": evaluate_exam_fused, one call for both (half the input tokens).
+
+    strict=True raises EvaluationError instead of returning placeholders (background jobs retry).
+    on_field streams the grade's top-level fields (score, pass, ...) as they are generated.
+    """
+    deadline_sec = GRADE_DEADLINE_SEC if deadline_sec is None else deadline_sec
+    mode = (mode or EXAM_EVAL_MODE).strip().lower()
+    started = time.monotonic()
+
+    if mode == "fused":
+        try:
+            out = await asyncio.wait_for(evaluate_exam_fused(transcript, strict=strict, on_field=on_field), timeout=deadline_sec)
+        except asyncio.TimeoutError:
+            print(f"[evaluation] fused exam evaluation missed the {deadline_sec:g}s deadline")
+            if strict:
+                raise EvaluationError("Exam evaluation timed out.")
+            out = _grade_failed("Grading timed out."), _checklist_failed("Checklist evaluation timed out.")
+        print(f"[evaluation] exam eval mode=fused took {time.monotonic() - started:.2f}s")
+        return out
+
+    grade_task = asyncio.create_task(grade_exam(transcript, strict=strict, on_field=on_field))
+    checklist_task = asyncio.create_task(evaluate_checklist(transcript, strict=strict))
+    tasks = (grade_task, checklist_task)
+
+    try:
+        await asyncio.wait(tasks, timeout=deadline_sec)
+    finally:
+        late = [t for t in tasks if not t.done()]
+        for t in late:
+            t.cancel()
+        # let the cancellations land (aborts the in-flight HTTP requests)
+        await asyncio.gather(*late, return_exceptions=True)
+
+    def outcome(task: asyncio.Task, name: str, failed):
+        if task.cancelled():
+            print(f"[evaluation] {name} missed the {deadline_sec:g}s deadline")
+            if strict:
+                raise EvaluationError(f"{name.capitalize()} timed out.")
+            return failed(f"{name.capitalize()} timed out.")
+        if isinstance(task.exception(), LimiterFull):
+            raise task.exception()  # no capacity: the job retries, never a placeholder
+        if task.exception() is not None:
+            print(f"[evaluation] {name} failed:", repr(task.exception()))
+            if strict:
+                raise EvaluationError(f"{name.capitalize()} failed: {task.exception()}")
+            return failed(f"{name.capitalize()} failed.")
+        return task.result()
+
+    print(f"[evaluation] exam eval mode=split took {time.monotonic() - started:.2f}s")
+    return outcome(grade_task, "grading", _grade_failed), outcome(checklist_task, "checklist evaluation", _checklist_failed)
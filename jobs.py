@@ -0,0 +1,201 @@
+# jobs.py
+import asyncio
+import json
+import os
+import secrets
+import socket
+from typing import Any, Dict, List, Optional
+
+from settings import EVAL_WORKERS, EVAL_JOB_MAX_TRIES, EVAL_RETRY_BASE_SEC, EVAL_JOB_LEASE_SEC
+import progressive
+from evaluation import evaluate_checklist, grade_exam_and_checklist, rubric_version
+from limiter import LimiterFull
+from storage import (
+    claim_next_job,
+    enqueue_job,
+    finish_job,
+    get_attempt,
+    next_job_due_in,
+    release_jobs,
+    renew_job_lease,
+    requeue_expired_jobs,
+    retry_job,
+    update_attempt,
+)
+
+# Idle workers re-check the table at least this often (covers jobs enqueued by another process)
+IDLE_POLL_SEC = 15.0
+# Pause after a failed queue read/write (e.g. a locked database) before trying again
+QUEUE_ERROR_SLEEP_SEC = 2.0
+# Owner tag for jobs.claimed_by: unique per process, so several uvicorn workers / a rolling
+# restart never take over each other's running jobs
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+
+_wake: Optional[asyncio.Event] = None
+_workers: List[asyncio.Task] = []
+# attempt_id -> grade fields streamed so far (score/pass land before the long lists finish)
+_partial: Dict[int, Dict[str, Any]] = {}
+_PARTIAL_FIELDS = ("score", "pass", "summary")
+
+
+# -------------------------
+# Attempt fields (same columns the endpoints used to write inline)
+# -------------------------
+def training_fields(report: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "checklist_score": int(report.get("checklist_score", 0) or 0),
+        "checklist_json": json.dumps(report, ensure_ascii=False),
+    }
+
+
+def exam_fields(result: Dict[str, Any], checklist: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "score": int(result.get("score", 0) or 0),
+        "passed": 1 if result.get("pass") else 0,
+        "summary": result.get("summary", ""),
+        "strengths": json.dumps(result.get("strengths", []), ensure_ascii=False),
+        "improvements": json.dumps(result.get("improvements", []), ensure_ascii=False),
+        "checklist_score": int(checklist.get("checklist_score", 0) or 0),
+        "checklist_json": json.dumps(checklist, ensure_ascii=False),
+    }
+
+
+def _backoff_sec(tries: int) -> float:
+    return min(60.0, EVAL_RETRY_BASE_SEC * 2 ** max(0, tries - 1))
+
+
+# -------------------------
+# Worker pool
+# -------------------------
+async def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate the job's attempt and return the attempt fields to write."""
+    a = await asyncio.to_thread(get_attempt, job["attempt_id"])
+    if not a:
+        raise LookupError(f"attempt {job['attempt_id']} not found")
+
+    # Retries only help if a bad parse / timeout raises; the last try keeps placeholders instead
+    strict = job["tries"] < EVAL_JOB_MAX_TRIES
+    transcript = a.get("transcript") or ""
+    if job["kind"] == "exam":
+        async def on_field(key: str, value: Any):
+            if key in _PARTIAL_FIELDS:
+                _partial.setdefault(a["id"], {})[key] = value
+
+        try:
+            result, checklist = await grade_exam_and_checklist(transcript, strict=strict, on_field=on_field)
+        finally:
+            _partial.pop(a["id"], None)
+        fields = exam_fields(result, checklist)
+    else:
+        # Segments scored during the call (progressive.snapshot): only the tail + merge is left
+        report = await progressive.finish(json.loads(job["payload"])) if job.get("payload") else None
+        if report is None:
+            report = await evaluate_checklist(
+                transcript,
+                customer_type=a.get("customer_type") or "",
+                emotion_level=a.get("emotion_level"),
+                strict=strict,
+            )
+        fields = training_fields(report)
+    fields["eval_status"] = "done"
+    fields["rubric_version"] = rubric_version()
+    return fields
+
+
+async def _heartbeat(job_id: int, run: asyncio.Task) -> None:
+    """Renew the job's lease while it runs; if another worker took it over, stop ours."""
+    while True:
+        await asyncio.sleep(EVAL_JOB_LEASE_SEC / 3)
+        if not await asyncio.to_thread(renew_job_lease, job_id, WORKER_ID, EVAL_JOB_LEASE_SEC):
+            print(f"[jobs] lost the lease on job {job_id}, dropping our run")
+            run.cancel()
+            return
+
+
+async def _worker(n: int) -> None:
+    while True:
+        try:
+            await _work_once(n)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Usually "database is locked" while call_log / the eval cache write: keep the pool
+            # at full size. A job claimed just before the error is retaken once its lease runs out.
+            print(f"[jobs] worker {n}: job queue error, retrying in {QUEUE_ERROR_SLEEP_SEC:g}s:", repr(e)[:200])
+            await asyncio.sleep(QUEUE_ERROR_SLEEP_SEC)
+
+
+async def _work_once(n: int) -> None:
+    """Claim and run one job, or wait for one to become due."""
+    _wake.clear()
+    job = await asyncio.to_thread(claim_next_job, WORKER_ID, EVAL_JOB_LEASE_SEC)
+    if job is None:
+        due = await asyncio.to_thread(next_job_due_in)
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=IDLE_POLL_SEC if due is None else min(IDLE_POLL_SEC, due))
+        except asyncio.TimeoutError:
+            pass
+        return
+
+    await asyncio.to_thread(update_attempt, job["attempt_id"], {"eval_status": "running"})
+    run = asyncio.create_task(_run_job(job))
+    beat = asyncio.create_task(_heartbeat(job["id"], run))
+    try:
+        fields = await run
+        # Write the result only while the job is still ours (the renewed lease covers the write)
+        if await asyncio.to_thread(renew_job_lease, job["id"], WORKER_ID, EVAL_JOB_LEASE_SEC):
+            await asyncio.to_thread(update_attempt, job["attempt_id"], fields)
+            await asyncio.to_thread(finish_job, job["id"], WORKER_ID)
+            print(f"[jobs] worker {n}: {job['kind']} job {job['id']} done (try {job['tries']})")
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            # Shutdown mid-job: stop_workers() hands the job back (release_jobs)
+            raise
+        # _heartbeat cancelled the run: another worker owns the job now
+    except Exception as e:
+        err = repr(e)[:500]
+        # A full OpenAI queue says nothing about this attempt: keep backing off past the try limit
+        if isinstance(e, LookupError) or (job["tries"] >= EVAL_JOB_MAX_TRIES and not isinstance(e, LimiterFull)):
+            print(f"[jobs] worker {n}: job {job['id']} failed for good:", err)
+            if await asyncio.to_thread(finish_job, job["id"], WORKER_ID, "failed", err):
+                await asyncio.to_thread(update_attempt, job["attempt_id"], {"eval_status": "failed"})
+        else:
+            delay = _backoff_sec(job["tries"])
+            print(f"[jobs] worker {n}: job {job['id']} try {job['tries']} failed, retry in {delay:g}s:", err)
+            if await asyncio.to_thread(retry_job, job["id"], WORKER_ID, delay, err):
+                await asyncio.to_thread(update_attempt, job["attempt_id"], {"eval_status": "pending"})
+    finally:
+        beat.cancel()
+
+
+def partial_result(attempt_id: int) -> Dict[str, Any]:
+    return dict(_partial.get(attempt_id) or {})
+
+
+async def submit(attempt_id: int, kind: str, payload: Optional[Dict[str, Any]] = None) -> int:
+    """Queue an evaluation for an already-saved attempt and wake an idle worker."""
+    job_id = await asyncio.to_thread(enqueue_job, attempt_id, kind, payload)
+    if _wake is not None:
+        _wake.set()
+    return job_id
+
+
+async def start_workers() -> None:
+    global _wake
+    _wake = asyncio.Event()
+    # Only jobs whose lease ran out: a job another live process is running keeps going there
+    resumed = await asyncio.to_thread(requeue_expired_jobs)
+    if resumed:
+        print(f"[jobs] resuming {resumed} evaluation job(s) whose worker stopped")
+    for n in range(max(1, EVAL_WORKERS)):
+        _workers.append(asyncio.create_task(_worker(n)))
+
+
+async def stop_workers() -> None:
+    for t in _workers:
+        t.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    released = await asyncio.to_thread(release_jobs, WORKER_ID)
+    if released:
+        print(f"[jobs] handed back {released} running job(s) on shutdown")
@@ -0,0 +1,249 @@
+# jsonstream.py
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_WS = re.compile(r"\s*")
+# Inside a string only quotes and backslashes matter; inside nested values also brackets
+_STR_SPECIAL = re.compile(r'["\\]')
+_NEST_SPECIAL = re.compile(r'[{}\[\]"]')
+_SCALAR_END = re.compile(r"[,}\s]")
+_PARTIAL_ESCAPE = re.compile(r"\\u[0-9a-fA-F]{0,3}$")
+
+
+class JsonObjectStream:
+    """
+    Incremental parser for the first JSON object in streamed LLM output.
+
+    feed(chunk) returns the top-level (key, value) pairs completed by that chunk, so a
+    grader's "score" and "pass" are usable while "improvements" is still being generated.
+    Prose and ```json fences before the object are skipped; anything after it is ignored.
+    Each character is examined once across all feed() calls (regex jumps between the
+    characters that matter), so the total cost is linear in the output length.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._i = 0                 # next unread index in _buf
+        self._state = "seek"        # seek | key | colon | value | after | done
+        self._key: Optional[str] = None
+        self._val_start = -1
+        self._depth = 0             # bracket depth inside the current value
+        self._in_str = False        # inside a string within the current value
+        self.fields: Dict[str, Any] = {}
+        self.errors = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self._state == "done" or not chunk:
+            return []
+        # Drop what is already parsed, then append with the buffer's only reference held
+        # locally so CPython can grow the string in place instead of copying it per chunk
+        buf, self._buf = self._buf, ""
+        if self._state != "value" and self._i:
+            buf, self._i = buf[self._i:], 0
+        buf += chunk
+        self._buf = buf
+        del buf
+        out: List[Tuple[str, Any]] = []
+        while self._step(out):
+            pass
+        return out
+
+    def result(self) -> Optional[dict]:
+        """Fields parsed so far (None if no object has started yet)."""
+        return dict(self.fields) if self._state != "seek" else None
+
+    def partial(self, key: str) -> str:
+        """Decoded text of string field `key`, complete or still streaming ("" if not reached)."""
+        v = self.fields.get(key)
+        if isinstance(v, str):
+            return v
+        if self._state != "value" or self._key != key or self._val_start < 0:
+            return ""
+        if self._buf[self._val_start:self._val_start + 1] != '"':
+            return ""
+        raw = self._buf[self._val_start + 1:self._i]
+        raw = _PARTIAL_ESCAPE.sub("", raw)
+        if (len(raw) - len(raw.rstrip("\\"))) % 2:
+            raw = raw[:-1]
+        try:
+            return json.loads('"' + raw + '"')
+        except ValueError:
+            return ""
+
+    # -------------------------
+    # State machine; each step returns True if it made progress
+    # -------------------------
+    def _skip_ws(self) -> bool:
+        self._i = _WS.match(self._buf, self._i).end()
+        return self._i < len(self._buf)
+
+    def _reset(self) -> None:
+        # Not an object after all ("{see below}" in prose): look for the next "{"
+        self.fields.clear()
+        self._state = "seek"
+
+    def _step(self, out: List[Tuple[str, Any]]) -> bool:
+        buf = self._buf
+        st = self._state
+
+        if st == "seek":
+            k = buf.find("{", self._i)
+            if k < 0:
+                self._buf, self._i = "", 0
+                return False
+            self._buf, self._i = buf[k + 1:], 0
+            self._state = "key"
+            return True
+
+        if not self._skip_ws():
+            return False
+        ch = buf[self._i]
+
+        if st == "key":
+            if ch == "}":
+                self._i += 1
+                self._state = "done"
+                return False
+            if ch == ",":
+                self._i += 1
+                return True
+            if ch != '"':
+                self._reset()
+                return True
+            end = self._string_end(self._i + 1)
+            if end < 0:
+                return False
+            try:
+                self._key = json.loads(buf[self._i:end])
+            except ValueError:
+                self._reset()
+                return True
+            self._i = end
+            self._state = "colon"
+            return True
+
+        if st == "colon":
+            if ch != ":":
+                self._reset()
+                return True
+            self._i += 1
+            self._state = "value"
+            self._val_start = -1
+            return True
+
+        if st == "value":
+            if self._val_start < 0:
+                self._val_start = self._i
+                self._depth = 0
+                self._in_str = False
+            end = self._value_end()
+            if end < 0:
+                return False
+            try:
+                value = json.loads(buf[self._val_start:end])
+                self.fields[self._key] = value
+                out.append((self._key, value))
+            except ValueError:
+                self.errors += 1
+            self._i = end
+            self._val_start = -1
+            self._state = "after"
+            return True
+
+        if st == "after":
+            self._i += 1
+            if ch == ",":
+                self._state = "key"
+                return True
+            self._state = "done"  # "}" or garbage: the object is over either way
+            return False
+
+        return False
+
+    def _string_end(self, i: int) -> int:
+        """Index just past the closing quote of a string whose body starts at i (-1 = incomplete)."""
+        buf = self._buf
+        while True:
+            m = _STR_SPECIAL.search(buf, i)
+            if m is None:
+                return -1
+            j = m.start()
+            if buf[j] == '"':
+                return j + 1
+            if j + 1 >= len(buf):
+                return -1
+            i = j + 2
+
+    def _value_end(self) -> int:
+        """Advance through the current value; index just past it, or -1 (self._i = resume point)."""
+        buf = self._buf
+        start = self._val_start
+        first = buf[start]
+
+        if first == '"':
+            i = max(self._i, start + 1)
+            while True:
+                m = _STR_SPECIAL.search(buf, i)
+                if m is None:
+                    self._i = len(buf)
+                    return -1
+                j = m.start()
+                if buf[j] == '"':
+                    return j + 1
+                if j + 1 >= len(buf):
+                    self._i = j  # escape split across chunks
+                    return -1
+                i = j + 2
+
+        if first in "{[":
+            i = self._i
+            while True:
+                if self._in_str:
+                    m = _STR_SPECIAL.search(buf, i)
+                    if m is None:
+                        self._i = len(buf)
+                        return -1
+                    j = m.start()
+                    if buf[j] == "\\":
+                        if j + 1 >= len(buf):
+                            self._i = j
+                            return -1
+                        i = j + 2
+                        continue
+                    self._in_str = False
+                    i = j + 1
+                    continue
+                m = _NEST_SPECIAL.search(buf, i)
+                if m is None:
+                    self._i = len(buf)
+                    return -1
+                j = m.start()
+                c = buf[j]
+                i = j + 1
+                if c == '"':
+                    self._in_str = True
+                elif c in "{[":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        return i
+
+        # number / true / false / null: complete once a delimiter follows
+        m = _SCALAR_END.search(buf, max(self._i, start))
+        if m is None:
+            self._i = len(buf)
+            return -1
+        return m.start()
+
+
+def parse_first_object(text: str) -> Optional[dict]:
+    """Whole-text convenience wrapper: the first JSON object's fields, or None."""
+    p = JsonObjectStream()
+    p.feed(text or "")
+    return p.result() if p.done else None
@@ -0,0 +1,232 @@
+# limiter.py
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from settings import (
+    OPENAI_MAX_CONCURRENT,
+    OPENAI_RPM,
+    OPENAI_BURST,
+    OPENAI_QUEUE_MAX,
+    OPENAI_RESERVED_SLOTS,
+)
+
+# Priority classes, most urgent first
+COACH = 0        # live coach tips: useless after a couple of seconds
+SESSION = 1      # realtime call setup (SDP exchange): the trainee is waiting on "Connecting…"
+GRADING = 2      # post-call evaluation (background jobs, progressive checklist)
+REGRADE = 3      # bulk re-grade of stored attempts
+PRIORITY_NAMES = {COACH: "coach", SESSION: "session", GRADING: "grading", REGRADE: "regrade"}
+
+# Priority for calls that do not pass one explicitly (set by regrade.py for its whole run)
+_current_priority: ContextVar[int] = ContextVar("openai_priority", default=GRADING)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+@contextmanager
+def priority(p: int):
+    """OpenAI calls made inside this block (and tasks it creates) default to priority p."""
+    token = _current_priority.set(p)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class LimiterFull(RuntimeError):
+    """The wait queue is full and this request was the least urgent one in it."""
+
+    def __init__(self, priority: int):
+        super().__init__(f"OpenAI request queue full ({PRIORITY_NAMES.get(priority, priority)} request rejected)")
+        self.priority = priority
+
+
+class PriorityLimiter:
+    """
+    Concurrency cap + token bucket shared by every OpenAI request in the process.
+
+    Waiters are served strictly by priority, then arrival order. Background classes
+    (GRADING, REGRADE) may only use max_concurrent - reserved slots, so a burst of exam
+    submissions never takes the last slots a live coach tip needs. When max_queue requests
+    are already waiting, the least urgent one (the newcomer, or a queued lower-priority
+    request it displaces) fails with LimiterFull.
+    """
+
+    def __init__(self, max_concurrent: int, per_minute: float, burst: int, max_queue: int, reserved: int = 0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.rate = per_minute / 60.0 if per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self.max_queue = max(0, max_queue)
+        self.reserved = max(0, min(reserved, self.max_concurrent - 1))
+        self.tokens = float(self.burst)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._refilled_at = time.monotonic()
+        self._heap: List[list] = []            # [priority, seq, future, enqueued_at]
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats: Dict[int, Dict[str, Any]] = {
+            p: {"requests": 0, "granted": 0, "rejected": 0, "cancelled": 0, "waiting": 0,
+                "max_waiting": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            for p in PRIORITY_NAMES
+        }
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    @asynccontextmanager
+    async def slot(self, priority: Optional[int] = None):
+        p = current_priority() if priority is None else priority
+        await self.acquire(p)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: int) -> None:
+        st = self._stats[priority]
+        st["requests"] += 1
+        t0 = time.monotonic()
+        if not self._waiting() and self._can_start(priority):
+            self._start(priority, 0.0)
+            return
+
+        if self._waiting() >= self.max_queue:
+            self._evict_or_reject(priority)
+
+        fut = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), fut, t0]
+        heapq.heappush(self._heap, entry)
+        st["waiting"] += 1
+        st["max_waiting"] = max(st["max_waiting"], st["waiting"])
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                self.release()  # granted just as the caller gave up
+            elif not fut.done():
+                fut.cancel()
+            if entry[2] is not None:
+                entry[2] = None
+                st["waiting"] -= 1
+                st["cancelled"] += 1
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        out: Dict[str, Any] = {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_concurrent": self.max_concurrent,
+            "reserved": self.reserved,
+            "per_minute": round(self.rate * 60.0, 1),
+            "tokens": round(self.tokens, 2),
+            "queued": self._waiting(),
+            "max_queue": self.max_queue,
+        }
+        for p, st in self._stats.items():
+            granted = st["granted"]
+            out[PRIORITY_NAMES[p]] = {
+                **{k: v for k, v in st.items() if k != "wait_ms_total"},
+                "wait_ms_max": round(st["wait_ms_max"], 1),
+                "wait_ms_avg": round(st["wait_ms_total"] / granted, 1) if granted else 0.0,
+            }
+        return out
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _waiting(self) -> int:
+        return sum(st["waiting"] for st in self._stats.values())
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(float(self.burst), self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _can_start(self, priority: int) -> bool:
+        cap = self.max_concurrent if priority <= SESSION else self.max_concurrent - self.reserved
+        if self.in_flight >= cap:
+            return False
+        if not self.rate:
+            return True
+        self._refill()
+        return self.tokens >= 1.0
+
+    def _start(self, priority: int, waited_ms: float) -> None:
+        if self.rate:
+            self.tokens -= 1.0
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        st = self._stats[priority]
+        st["granted"] += 1
+        st["wait_ms_total"] += waited_ms
+        st["wait_ms_max"] = max(st["wait_ms_max"], waited_ms)
+
+    def _dispatch(self) -> None:
+        heap = self._heap
+        while heap:
+            priority, _, fut, enqueued_at = heap[0]
+            if fut is None or fut.done():
+                heapq.heappop(heap)
+                continue
+            if not self._can_start(priority):
+                # Caps only tighten for less urgent classes, so nobody behind the head can start
+                # either; if it is the bucket that is empty, come back when a token is due
+                if self.rate and self.tokens < 1.0 and self.in_flight < self.max_concurrent:
+                    self._wake_in((1.0 - self.tokens) / self.rate)
+                return
+            entry = heapq.heappop(heap)
+            entry[2] = None
+            self._stats[priority]["waiting"] -= 1
+            self._start(priority, (time.monotonic() - enqueued_at) * 1000.0)
+            fut.set_result(None)
+
+    def _wake_in(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._timer is not None and self._timer_loop is loop:
+            return
+
+        def wake():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = loop.call_later(max(0.001, delay), wake)
+        self._timer_loop = loop
+
+    def _evict_or_reject(self, priority: int) -> None:
+        live = [e for e in self._heap if e[2] is not None and not e[2].done()]
+        worst = max(live, key=lambda e: (e[0], e[1]), default=None)
+        if worst is None or worst[0] <= priority:
+            self._stats[priority]["rejected"] += 1
+            raise LimiterFull(priority)
+        # Displace the least urgent, most recent waiter
+        fut, worst[2] = worst[2], None
+        st = self._stats[worst[0]]
+        st["waiting"] -= 1
+        st["rejected"] += 1
+        fut.set_exception(LimiterFull(worst[0]))
+
+
+# One limiter for every OpenAI request this process makes (Responses API + realtime SDP)
+OPENAI_LIMITER = PriorityLimiter(
+    max_concurrent=OPENAI_MAX_CONCURRENT,
+    per_minute=OPENAI_RPM,
+    burst=OPENAI_BURST,
+    max_queue=OPENAI_QUEUE_MAX,
+    reserved=OPENAI_RESERVED_SLOTS,
+)
@@ -0,0 +1,226 @@
+# local_checklist.py
+import re
+from typing import Any, Dict, List, Optional
+
+from context import transcript_turns
+from phrases import MATCHER, PhraseMatcher
+from prompts import COACH_TEMPLATES
+
+# Same ids / titles the checklist LLM returns
+ITEMS = [
+    ("opening", "Opening"),
+    ("identification", "Identification"),
+    ("listening", "Listening"),
+    ("empathy", "Empathy"),
+    ("clarify", "Clarify"),
+    ("restate", "Restate"),
+    ("tone", "Professional tone"),
+    ("expectations", "Expectations"),
+    ("close", "Close"),
+    ("feedback", "Feedback"),
+]
+
+_ADVICE = {
+    "opening": "Open with your name, your team and an offer to help.",
+    "identification": "Verify the customer (name, phone, email or last 4 digits) early.",
+    "listening": "Show you listened: acknowledge, ask, then restate the issue.",
+    "empathy": "Acknowledge how the customer feels before solving.",
+    "clarify": "Ask at least one clarifying question after the customer explains.",
+    "restate": "Restate the issue in your own words and confirm it.",
+    "tone": "Cut fillers and hedges; use short, confident sentences.",
+    "expectations": "Say what happens next and by when.",
+    "close": "Summarize the outcome and ask if anything else is needed.",
+    "feedback": "Mention the short feedback survey before ending the call.",
+}
+
+
+# Extra cues only the offline scorer needs (the live coach keeps phrases.CHECKLIST_CUES)
+_LOCAL = PhraseMatcher({
+    "greeting": ["hi", "hello", "good morning", "good afternoon", "good evening", "welcome"],
+    "offer_help": ["how can i help", "how i can help", "help you", "assist you"],
+    "acknowledge": ["okay", "ok", "thank you", "thanks", "sorry", "i see", "got it", "alright"],
+    "own_name": ["my name"],
+    # which customer detail an identification turn asks for
+    "id:name": ["name"],
+    "id:phone": ["phone"],
+    "id:email": ["email"],
+    "id:last4": ["last 4", "last four", "last4", "lastfour"],
+    "id:account": ["id", "account number"],
+})
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _norm_key(s: str) -> str:
+    return re.sub(r"[^a-z]", "", (s or "").lower())
+
+
+_IDS_BY_KEY = {_norm_key(k): item_id for item_id, title in ITEMS for k in (item_id, title)}
+
+
+def canonical_item_id(item: Dict[str, Any]) -> str:
+    """
+    Map an LLM checklist item to one of ITEMS by id, then title ("" if it is none of them).
+    Older grades used ids like "professional_tone" or "expectations & timeframe".
+    """
+    for k in ("id", "title"):
+        v = _norm_key(str(item.get(k) or ""))
+        if not v:
+            continue
+        if v in _IDS_BY_KEY:
+            return _IDS_BY_KEY[v]
+        for key, item_id in _IDS_BY_KEY.items():
+            if v.startswith(key):
+                return item_id
+    return ""
+
+
+def checklist_score(items: List[Dict[str, Any]]) -> int:
+    """0-100 from item statuses: done = 1, partial = 0.5, missing = 0."""
+    if not items:
+        return 0
+    points = sum(1.0 if it["status"] == "done" else 0.5 if it["status"] == "partial" else 0.0 for it in items)
+    return int(round(100 * points / len(items)))
+
+
+def _evidence(turn: str, cats: tuple = ()) -> str:
+    """The sentence of `turn` showing one of `cats` (else its start), role prefix dropped, max 12 words."""
+    text = turn.split(":", 1)[1] if ":" in turn else turn
+    if cats:
+        for sent in _SENTENCE_RE.split(text.strip()):
+            hits = MATCHER.scan(sent)
+            hits.update(_LOCAL.scan(sent))
+            if any(c in hits for c in cats):
+                text = sent
+                break
+    return " ".join(text.split()[:12])
+
+
+def score_checklist(transcript: str) -> Dict[str, Any]:
+    """
+    Deterministic checklist from phrase cues (phrases.MATCHER), no LLM.
+    Same shape as evaluation.evaluate_checklist plus "source": "local"; every done/partial
+    item quotes the agent sentence it was found in ("evidence") and that turn's index ("line").
+    """
+    turns = transcript_turns(transcript)
+    # Transcripts without CUSTOMER lines (agent-only capture) count every turn as "after the customer"
+    customer_seen = not any(t.upper().startswith("CUSTOMER:") for t in turns)
+    first: Dict[str, int] = {}
+    id_turns: List[int] = []
+    id_kinds = set()
+    agent_turns = 0
+    agent_words = 0
+    fragments = 0
+    disfluencies = 0
+    worst: Optional[int] = None
+    worst_count = 0
+    first_fragment: Optional[int] = None
+
+    for i, turn in enumerate(turns):
+        up = turn.upper()
+        if up.startswith("CUSTOMER:"):
+            customer_seen = True
+            continue
+        if not up.startswith("AGENT:"):
+            continue
+        agent_turns += 1
+        hits = MATCHER.scan(turn)
+        local = _LOCAL.scan(turn)
+        # "my name is Sam" is the opening; identification is asking for *their* details
+        asks_id = "identification" in hits and "your" in turn.lower().split() and "own_name" not in local
+        if asks_id:
+            id_turns.append(i)
+            id_kinds.update(c for c in local if c.startswith("id:"))
+        for cat in list(hits) + list(local):
+            # clarify = a question about the issue: after the customer spoke, not "how can I help?" or an ID check
+            if cat == "question" and (not customer_seen or asks_id or "offer_help" in local):
+                continue
+            first.setdefault(cat, i)
+        words = turn.split()[1:]
+        agent_words += len(words)
+        if len(words) < 3 or turn.endswith("..."):
+            fragments += 1
+            if first_fragment is None:
+                first_fragment = i
+        bad = hits.get("filler", 0) + hits.get("stutter", 0) + hits.get("hedge", 0)
+        disfluencies += bad
+        if bad > worst_count:
+            worst, worst_count = i, bad
+
+    def item(item_id: str, title: str, status: str, line: Optional[int], note: str = "", cats: tuple = ()) -> Dict[str, Any]:
+        out = {
+            "id": item_id,
+            "title": title,
+            "status": status,
+            "evidence": _evidence(turns[line], cats) if line is not None and status != "missing" else "",
+            "note": note or (f"Found in turn {line + 1}." if status != "missing" and line is not None else _ADVICE[item_id]),
+        }
+        if line is not None and status != "missing":
+            out["line"] = line
+        return out
+
+    def found(*cats: str) -> Optional[int]:
+        seen = [first[c] for c in cats if c in first]
+        return min(seen) if seen else None
+
+    items: List[Dict[str, Any]] = []
+    for item_id, title in ITEMS:
+        if item_id == "opening":
+            parts = [found("opening_intro", "greeting"), found("opening_org"), found("opening_help", "offer_help")]
+            seen = [p for p in parts if p is not None]
+            status = "done" if len(seen) >= 2 else "partial" if seen else "missing"
+            items.append(item(item_id, title, status, min(seen) if seen else None))  # whole greeting as evidence
+        elif item_id == "identification":
+            status = "done" if len(id_kinds) >= 2 else "partial" if id_turns else "missing"
+            note = "" if status != "partial" else "Asked for one detail only. " + _ADVICE[item_id]
+            items.append(item(item_id, title, status, id_turns[0] if id_turns else None, note, ("identification",)))
+        elif item_id == "listening":
+            seen = [p for p in (found("empathy"), found("question"), found("restate")) if p is not None]
+            ack = found("acknowledge")
+            status = "done" if len(seen) >= 2 else "partial" if seen or ack is not None else "missing"
+            line = max(seen) if seen else ack
+            items.append(item(item_id, title, status, line, "", ("empathy", "question", "restate", "acknowledge")))
+        elif item_id == "clarify":
+            line = found("question")
+            items.append(item(item_id, title, "done" if line is not None else "missing", line, "", ("question",)))
+        elif item_id == "tone":
+            if not agent_turns:
+                items.append(item(item_id, title, "missing", None))
+                continue
+            rate = disfluencies / agent_turns
+            choppy = fragments * 3 >= agent_turns or agent_words / agent_turns < 5
+            status = "missing" if rate >= 1.0 else "partial" if rate >= 0.34 or choppy else "done"
+            if status == "done":
+                note = ""
+            elif rate >= 0.34:
+                note = f"{disfluencies} fillers/hedges in {agent_turns} turns. " + _ADVICE["tone"]
+            else:
+                note = "Short or unfinished sentences. " + _ADVICE["tone"]
+            line = worst
+            if line is None and status != "done":
+                line = first_fragment
+            if line is None:
+                line = next(i for i, t in enumerate(turns) if t.upper().startswith("AGENT:"))
+            items.append(item(item_id, title, status, line, note, ("filler", "stutter", "hedge")))
+        elif item_id == "close":
+            line = found("close")
+            if line is not None:
+                items.append(item(item_id, title, "done", line, "", ("close",)))
+            else:
+                near = found("near_closing")
+                items.append(item(item_id, title, "partial" if near is not None else "missing", near,
+                                  "" if near is None else "Wrapped up without summarizing. " + _ADVICE["close"], ("near_closing",)))
+        else:
+            line = found(item_id)
+            items.append(item(item_id, title, "done" if line is not None else "missing", line, "", (item_id,)))
+
+    done = [it for it in items if it["status"] == "done"]
+    todo = [it for it in items if it["status"] != "done"]
+    return {
+        "checklist_score": checklist_score(items),
+        "items": items,
+        "highlights": [f"{it['title']}: \"{it['evidence']}\"" for it in done if it["evidence"]][:4],
+        "improvements": [_ADVICE[it["id"]] for it in todo][:6],
+        "next_time_say": [COACH_TEMPLATES[it["id"]] for it in todo if it["id"] in COACH_TEMPLATES][:2],
+        "source": "local",
+    }
@@ -1,35 +1,129 @@
 # openai_realtime.py
 import json
-import requests
+import time
+from collections import deque
+from typing import Any, Dict, Optional
 
-from settings import env_str, REALTIME_MODEL, ASR_MODEL, ASR_LANGUAGE, VOICE
+import httpx
 
+from settings import (
+    env_str,
+    REALTIME_MODEL,
+    ASR_MODEL,
+    ASR_LANGUAGE,
+    VOICE,
+    REALTIME_CONNECT_TIMEOUT_SEC,
+    REALTIME_READ_TIMEOUT_SEC,
+    REALTIME_KEEPALIVE_SEC,
+    REALTIME_MAX_CONNECTIONS,
+    REALTIME_BASE_URL,
+    REALTIME_TOKEN_TTL_SEC,
+)
 
-def webrtc_answer_sdp(offer_sdp: str, instructions: str) -> str:
-    """
-    Sends a browser SDP offer to OpenAI Realtime and returns the SDP answer.
-    Uses multipart form-data fields: sdp + session
-    """
+REALTIME_CALLS_URL = f"{REALTIME_BASE_URL}/realtime/calls"
+REALTIME_CLIENT_SECRETS_URL = f"{REALTIME_BASE_URL}/realtime/client_secrets"
+
+# Connection reuse for the SDP exchange (admin stats)
+HTTP_STATS: Dict[str, Any] = {
+    "requests": 0,
+    "new_connections": 0,
+    "reused_connections": 0,
+    "errors": 0,
+    "last_ms": 0.0,
+    "last_connect_ms": 0.0,
+}
+
+_http: Optional[httpx.AsyncClient] = None
+
+
+def _client() -> httpx.AsyncClient:
+    """Process-wide pooled client: call starts reuse a warm TLS connection to api.openai.com."""
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                connect=REALTIME_CONNECT_TIMEOUT_SEC,
+                read=REALTIME_READ_TIMEOUT_SEC,
+                write=REALTIME_CONNECT_TIMEOUT_SEC,
+                pool=REALTIME_CONNECT_TIMEOUT_SEC,
+            ),
+            limits=httpx.Limits(
+                max_connections=REALTIME_MAX_CONNECTIONS,
+                max_keepalive_connections=REALTIME_MAX_CONNECTIONS,
+                keepalive_expiry=REALTIME_KEEPALIVE_SEC,
+            ),
+        )
+    return _http
+
+
+async def aclose() -> None:
+    """Close pooled connections (server shutdown)."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+
+def http_stats() -> Dict[str, Any]:
+    n = HTTP_STATS["new_connections"] + HTTP_STATS["reused_connections"]
+    return {**HTTP_STATS, "reuse_rate": round(HTTP_STATS["reused_connections"] / n, 3) if n else 0.0}
+
+
+# -------------------------
+# Call setup timings reported by the browser (mic / offer / ice / token / sdp / connect)
+# -------------------------
+SETUP_METRICS = ("mic_ms", "offer_ms", "ice_ms", "token_ms", "sdp_ms", "connect_ms", "total_ms", "candidates")
+_SETUP_WINDOW = 500
+_setup_samples: Dict[str, deque] = {p: deque(maxlen=_SETUP_WINDOW) for p in SETUP_METRICS}
+_setup_counts: Dict[str, Dict[str, int]] = {"mode": {}, "ice_reason": {}}
+
+
+def record_setup_timings(t: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep one browser report (unknown keys dropped, values clamped); returns what was kept."""
+    kept: Dict[str, Any] = {}
+    for p in SETUP_METRICS:
+        v = t.get(p)
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            kept[p] = max(0, min(120_000, int(v)))
+            _setup_samples[p].append(kept[p])
+    for k in _setup_counts:
+        v = str(t.get(k) or "")[:16]
+        if v:
+            kept[k] = v
+            _setup_counts[k][v] = _setup_counts[k].get(v, 0) + 1
+    return kept
+
+
+def setup_stats() -> Dict[str, Any]:
+    """p50 / p95 per metric over the last _SETUP_WINDOW calls."""
+    out: Dict[str, Any] = {k: dict(v) for k, v in _setup_counts.items()}
+    for p, xs in _setup_samples.items():
+        if not xs:
+            continue
+        ordered = sorted(xs)
+        out[p] = {
+            "n": len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        }
+    return out
+
+
+def _api_key() -> str:
     api_key = env_str("OPENAI_API_KEY", "").strip()
     if not api_key:
         raise RuntimeError("Missing OPENAI_API_KEY. Put it in .env and restart.")
+    return api_key
 
-    if not offer_sdp:
-        raise RuntimeError("Empty SDP offer")
-    if not offer_sdp.startswith("v=0"):
-        raise RuntimeError(f"Bad SDP offer. First 80 chars: {offer_sdp[:80]!r}")
-    if not offer_sdp.endswith("\n"):
-        offer_sdp += "\n"
-
-    url = "https://api.openai.com/v1/realtime/calls"
-    headers = {"Authorization": f"Bearer {api_key}"}
 
+def session_config(instructions: str) -> Dict[str, Any]:
+    """Realtime session for a training / exam call (same for the proxied and the direct SDP exchange)."""
     audio_input = {"transcription": {"model": ASR_MODEL}}
     # If ASR_LANGUAGE is set, pass it; otherwise omit to allow auto-detect
     if ASR_LANGUAGE:
         audio_input["transcription"]["language"] = ASR_LANGUAGE
 
-    session = {
+    return {
         "type": "realtime",
         "model": REALTIME_MODEL,
         "instructions": instructions,
@@ -39,13 +133,79 @@ def webrtc_answer_sdp(offer_sdp: str, instructions: str) -> str:
         },
     }
 
-    files = {
-        "sdp": (None, offer_sdp, "application/sdp"),
-        "session": (None, json.dumps(session), "application/json"),
-    }
 
-    resp = requests.post(url, headers=headers, files=files, timeout=60)
+async def _post(url: str, **kwargs) -> httpx.Response:
+    """POST on the pooled client, recording connection reuse and latency in HTTP_STATS."""
+    # httpcore trace events tell a fresh TCP/TLS connection from a pooled one
+    connect = {"new": False, "t0": 0.0, "ms": 0.0}
+
+    async def trace(name: str, info: Dict[str, Any]) -> None:
+        if name == "connection.connect_tcp.started":
+            connect["new"], connect["t0"] = True, time.monotonic()
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            connect["ms"] = (time.monotonic() - connect["t0"]) * 1000.0
+
+    HTTP_STATS["requests"] += 1
+    t0 = time.monotonic()
+    try:
+        resp = await _client().post(url, extensions={"trace": trace}, **kwargs)
+    except httpx.TimeoutException as e:
+        HTTP_STATS["errors"] += 1
+        raise RuntimeError(f"OpenAI realtime timed out ({type(e).__name__})") from e
+    except httpx.HTTPError as e:
+        HTTP_STATS["errors"] += 1
+        raise RuntimeError(f"OpenAI realtime request failed: {e!r}") from e
+
+    HTTP_STATS["new_connections" if connect["new"] else "reused_connections"] += 1
+    HTTP_STATS["last_ms"] = round((time.monotonic() - t0) * 1000.0, 1)
+    HTTP_STATS["last_connect_ms"] = round(connect["ms"], 1)
+    how = f"new connection, {connect['ms']:.0f}ms handshake" if connect["new"] else "reused connection"
+    print(f"[realtime] {url.rsplit('/', 1)[-1]} in {HTTP_STATS['last_ms']:.0f}ms ({how})")
+
     if resp.status_code not in (200, 201):
+        HTTP_STATS["errors"] += 1
         raise RuntimeError(f"OpenAI realtime error {resp.status_code}: {resp.text}")
+    return resp
+
 
+async def create_client_secret(instructions: str) -> Dict[str, Any]:
+    """
+    Mints a short-lived client secret bound to this call's session config, so the browser
+    can exchange SDP with OpenAI itself. Returns {"value", "expires_at"}.
+    """
+    body = {
+        "expires_after": {"anchor": "created_at", "seconds": REALTIME_TOKEN_TTL_SEC},
+        "session": session_config(instructions),
+    }
+    resp = await _post(REALTIME_CLIENT_SECRETS_URL, headers={"Authorization": f"Bearer {_api_key()}"}, json=body)
+    try:
+        data = resp.json()
+    except ValueError:
+        raise RuntimeError(f"OpenAI client secret: non-JSON response {resp.text[:200]!r}")
+    # Current API returns {"value", "expires_at"}; older builds nested it under "client_secret"
+    secret = data.get("client_secret") if isinstance(data.get("client_secret"), dict) else data
+    if not secret.get("value"):
+        raise RuntimeError("OpenAI client secret: response has no value")
+    return {"value": secret["value"], "expires_at": secret.get("expires_at")}
+
+
+async def webrtc_answer_sdp(offer_sdp: str, instructions: str) -> str:
+    """
+    Sends a browser SDP offer to OpenAI Realtime and returns the SDP answer.
+    Uses multipart form-data fields: sdp + session
+    """
+    api_key = _api_key()
+
+    if not offer_sdp:
+        raise RuntimeError("Empty SDP offer")
+    if not offer_sdp.startswith("v=0"):
+        raise RuntimeError(f"Bad SDP offer. First 80 chars: {offer_sdp[:80]!r}")
+    if not offer_sdp.endswith("\n"):
+        offer_sdp += "\n"
+
+    files = {
+        "sdp": (None, offer_sdp, "application/sdp"),
+        "session": (None, json.dumps(session_config(instructions)), "application/json"),
+    }
+    resp = await _post(REALTIME_CALLS_URL, headers={"Authorization": f"Bearer {api_key}"}, files=files)
     return resp.text
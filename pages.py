@@ -301,6 +301,8 @@ DASHBOARD_HTML = """
         <button class="btn primary" onclick="window.location.href='/exam'">Start</button>
       </div>
 
+      __UNFINISHED_CARD__
+
       <div class="card">
         <div class="sectionTitle">💡 How to use this</div>
         <div class="muted">
@@ -429,8 +431,14 @@ WEBRTC_JS = r"""
 
   let pc = null;
   let micStream = null;
+  let callId = "";
   let transcriptLines = [];
   let transcriptChanged = false;
+  // Number of transcript lines the server already holds for this call (delta protocol):
+  // syncedSeq for the live coach, loggedSeq for the server-side turn log
+  let syncedSeq = 0;
+  let loggedSeq = 0;
+  let callMode = "training";
 
   // For customer deltas
   let custDelta = "";
@@ -451,6 +459,8 @@ WEBRTC_JS = r"""
     if(!t) return;
     transcriptLines.push(`${role}: ${t}`);
     transcriptChanged = true;
+    forwardTurns();
+    if(coachWs) pushTurns();
 
     const box = document.getElementById("transcriptBox");
     if(box){
@@ -463,19 +473,98 @@ WEBRTC_JS = r"""
     return transcriptLines.join("\n").trim();
   }
 
-  async function waitIceComplete(pc){
-    if(pc.iceGatheringState === "complete") return;
-    await new Promise((resolve) => {
-      const check = () => {
-        if(pc.iceGatheringState === "complete"){
-          pc.removeEventListener("icegatheringstatechange", check);
-          resolve();
-        }
+  // Every finished turn goes to the server's turn log as it happens, so the call survives a
+  // closed tab and the post-call submit only carries the tail. One request in flight at a
+  // time; a failed send is retried with the next turn.
+  let logBusy = false;
+
+  function forwardTurns(){
+    if(!callId || logBusy || loggedSeq >= transcriptLines.length) return;
+    logBusy = true;
+    fetch("/call/turns", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      credentials: "same-origin",
+      keepalive: true,
+      body: JSON.stringify({ call_id: callId, mode: callMode, seq: loggedSeq, lines: transcriptLines.slice(loggedSeq) })
+    })
+      .then((r) => r.ok ? r.json() : null)
+      .then((data) => (data && typeof data.next_seq === "number") ? data.next_seq : null)
+      .catch(() => null)
+      .then((next) => {
+        logBusy = false;
+        if(next === null) return;
+        loggedSeq = Math.min(next, transcriptLines.length);
+        forwardTurns();  // turns that finished while this batch was in flight, or a resync
+      });
+  }
+
+  // ICE gathering, bounded: the offer goes out as soon as it carries a usable candidate.
+  // Resolves with the reason: "complete", "srflx"/"relay" (first server-reflexive / relayed
+  // candidate), "settled" (host candidates only and none new for ICE_SETTLE_MS) or "deadline".
+  const ICE_GATHER_TIMEOUT_MS = __RT_ICE_TIMEOUT_MS__;
+  const ICE_SETTLE_MS = 150;
+
+  function waitIceReady(pc, deadlineMs){
+    if(pc.iceGatheringState === "complete") return Promise.resolve("complete");
+    return new Promise((resolve) => {
+      let settleTimer = null;
+      let deadlineTimer = null;
+      const done = (reason) => {
+        clearTimeout(settleTimer);
+        clearTimeout(deadlineTimer);
+        pc.removeEventListener("icegatheringstatechange", onState);
+        pc.removeEventListener("icecandidate", onCandidate);
+        resolve(reason);
+      };
+      const onState = () => { if(pc.iceGatheringState === "complete") done("complete"); };
+      const onCandidate = (e) => {
+        if(!e.candidate) return done("complete");
+        const type = e.candidate.type || ((e.candidate.candidate || "").match(/ typ (\w+)/) || [])[1];
+        if(type === "srflx" || type === "relay") return done(type);
+        clearTimeout(settleTimer);
+        settleTimer = setTimeout(() => done("settled"), ICE_SETTLE_MS);
       };
-      pc.addEventListener("icegatheringstatechange", check);
+      pc.addEventListener("icegatheringstatechange", onState);
+      pc.addEventListener("icecandidate", onCandidate);
+      deadlineTimer = setTimeout(() => done("deadline"), deadlineMs);
     });
   }
 
+  // Per-phase call setup timings (ms), reported to the server once the call is connected
+  function reportSetupTimings(t){
+    if(!callId) return;
+    fetch("/session/timings", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      credentials: "same-origin",
+      keepalive: true,
+      body: JSON.stringify({ call_id: callId, ...t })
+    }).catch(() => {});
+  }
+
+  function waitConnected(pc, dc){
+    if(dc.readyState === "open") return Promise.resolve();
+    return new Promise((resolve) => {
+      dc.addEventListener("open", () => resolve(), { once: true });
+      pc.addEventListener("connectionstatechange", () => {
+        if(pc.connectionState === "failed" || pc.connectionState === "closed") resolve();
+      });
+    });
+  }
+
+  // Short-lived client secret for the direct SDP exchange; null = fall back to /session
+  async function fetchToken(url){
+    try{
+      const r = await fetch(url, { method: "POST", credentials: "same-origin" });
+      if(!r.ok) return null;
+      const j = await r.json();
+      return (j && j.client_secret && j.calls_url) ? j : null;
+    }catch(e){
+      return null;
+    }
+  }
+
   function setupDataChannel(dc, opts){
     const onRealtimeEvent = opts?.onRealtimeEvent;
 
@@ -517,24 +606,30 @@ WEBRTC_JS = r"""
     };
   }
 
-  async function startCall(opts){
-    const level = opts.level;
-    const sessionUrl = opts.sessionUrl;
-    const onRealtimeEvent = opts.onRealtimeEvent;
-
-    if(pc) return;
+  function newTimings(mode){
+    const timings = { mode };
+    let mark = performance.now();
+    const lap = (name) => { const now = performance.now(); timings[name] = Math.round(now - mark); mark = now; };
+    return { timings, lap };
+  }
 
-    setDot("connecting");
+  function callParams(level){
+    const scenario_id = getScenarioId();
+    return `?level=${encodeURIComponent(level)}`
+      + (scenario_id ? `&scenario_id=${encodeURIComponent(scenario_id)}` : "");
+  }
 
+  // Mic + peer connection + offer with gathered ICE: everything before the SDP exchange
+  async function preparePeer(opts, timings, lap){
+    const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    lap("mic_ms");
+    const peer = new RTCPeerConnection();
     try{
-      micStream = await navigator.mediaDevices.getUserMedia({ audio: true });
-      pc = new RTCPeerConnection();
-
       // Local track
-      micStream.getTracks().forEach(t => pc.addTrack(t, micStream));
+      stream.getTracks().forEach(t => peer.addTrack(t, stream));
 
       // Remote audio
-      pc.ontrack = (e) => {
+      peer.ontrack = (e) => {
         const audio = document.getElementById("remoteAudio");
         if(audio && e.streams && e.streams[0]){
           audio.srcObject = e.streams[0];
@@ -543,27 +638,119 @@ WEBRTC_JS = r"""
       };
 
       // Data channel
-      const dc = pc.createDataChannel("oai-events");
-      setupDataChannel(dc, { onRealtimeEvent });
+      const channel = peer.createDataChannel("oai-events");
+      setupDataChannel(channel, { onRealtimeEvent: opts.onRealtimeEvent });
+
+      const offer = await peer.createOffer({ offerToReceiveAudio: true });
+      await peer.setLocalDescription(offer);
+      lap("offer_ms");
+      timings.ice_reason = await waitIceReady(peer, ICE_GATHER_TIMEOUT_MS);
+      timings.candidates = (peer.localDescription.sdp.match(/^a=candidate:/gm) || []).length;
+      lap("ice_ms");
+      return { pc: peer, micStream: stream, dc: channel };
+    }catch(e){
+      peer.close();
+      stream.getTracks().forEach(t => t.stop());
+      throw e;
+    }
+  }
 
-      const offer = await pc.createOffer({ offerToReceiveAudio: true });
-      await pc.setLocalDescription(offer);
-      await waitIceComplete(pc);
+  // Warm-up: do the slow part while the trainee reads the page, so "Start call" is one round trip.
+  // The mic is opened (permission prompt) but its track stays disabled until the call starts.
+  let warm = null;
+  const WARM_MAX_AGE_MS = 5 * 60 * 1000;
+
+  function warmUp(opts){
+    if(pc || warm || !navigator.mediaDevices) return;
+    const { timings, lap } = newTimings((opts.tokenUrl ? "direct" : "proxy") + "+warm");
+    const w = { timings, at: performance.now() };
+    w.ready = preparePeer(opts, timings, lap).then((peer) => {
+      peer.micStream.getTracks().forEach(t => t.enabled = false);
+      return peer;
+    }).catch((e) => {
+      console.warn("warm-up failed, Start call will set up from scratch", e);
+      return null;
+    });
+    // No client secret here: it would expire (and open a call record) before most trainees click
+    warm = w;
+  }
 
-      const scenario_id = getScenarioId();
-      const url = sessionUrl
-        + `?level=${encodeURIComponent(level)}`
-        + (scenario_id ? `&scenario_id=${encodeURIComponent(scenario_id)}` : "");
+  function discardWarm(){
+    const w = warm;
+    warm = null;
+    if(!w) return;
+    w.ready.then((peer) => {
+      if(!peer) return;
+      peer.pc.close();
+      peer.micStream.getTracks().forEach(t => t.stop());
+    });
+  }
 
-      const resp = await fetch(url, {
-        method: "POST",
-        headers: { "Content-Type": "application/sdp" },
-        body: pc.localDescription.sdp
-      });
-      const answerSdp = await resp.text();
-      if(!resp.ok) throw new Error(answerSdp || "Session failed");
+  window.addEventListener("pagehide", discardWarm);
+
+  async function startCall(opts){
+    const level = opts.level;
+    const sessionUrl = opts.sessionUrl;
+
+    if(pc) return;
+
+    setDot("connecting");
+    const t0 = performance.now();
+    const params = callParams(level);
+    let timings, lap, dc, tokenPromise = null;
+
+    try{
+      // A warm-up older than WARM_MAX_AGE_MS is rebuilt: its candidates may no longer be valid
+      let w = warm;
+      if(w && performance.now() - w.at > WARM_MAX_AGE_MS){ discardWarm(); w = null; }
+      warm = null;
+      const peer = w ? await w.ready : null;
+      if(peer){
+        // Warm-up phases happened before the click; the clock for the rest starts now
+        ({ timings, lap } = newTimings(w.timings.mode));
+        for(const k of ["mic_ms", "offer_ms", "ice_ms", "ice_reason", "candidates"]) timings["warm_" + k] = w.timings[k];
+        ({ pc, micStream, dc } = peer);
+        micStream.getTracks().forEach(t => t.enabled = true);
+        tokenPromise = opts.tokenUrl ? fetchToken(opts.tokenUrl + params) : null;
+      }else{
+        ({ timings, lap } = newTimings(opts.tokenUrl ? "direct" : "proxy"));
+        // Direct mode: fetch the client secret while ICE gathers
+        tokenPromise = opts.tokenUrl ? fetchToken(opts.tokenUrl + params) : null;
+        ({ pc, micStream, dc } = await preparePeer(opts, timings, lap));
+      }
+
+      const token = tokenPromise ? await tokenPromise : null;
+      if(tokenPromise) lap("token_ms");
+      let answerSdp = "";
+      if(token){
+        // Browser <-> provider; our server only minted the secret
+        const resp = await fetch(token.calls_url, {
+          method: "POST",
+          headers: { "Content-Type": "application/sdp", "Authorization": `Bearer ${token.client_secret}` },
+          body: pc.localDescription.sdp
+        });
+        answerSdp = await resp.text();
+        if(!resp.ok) throw new Error(answerSdp || "Realtime call failed");
+        callId = token.call_id || "";
+      }else{
+        const resp = await fetch(sessionUrl + params, {
+          method: "POST",
+          headers: { "Content-Type": "application/sdp" },
+          body: pc.localDescription.sdp
+        });
+        answerSdp = await resp.text();
+        if(!resp.ok) throw new Error(answerSdp || "Session failed");
+        callId = resp.headers.get("X-Call-Id") || "";
+      }
+      lap("sdp_ms");
+      syncedSeq = 0;
+      loggedSeq = 0;
+      callMode = opts.mode || "training";
+      forwardTurns();
+      openCoachSocket();
 
       await pc.setRemoteDescription({ type: "answer", sdp: answerSdp });
+      const connected = waitConnected(pc, dc);
 
       setDot("live");
       document.getElementById("startBtn").disabled = true;
@@ -571,6 +758,12 @@ WEBRTC_JS = r"""
       const finishBtn = document.getElementById("finishBtn");
       if(finishBtn) finishBtn.disabled = true;
 
+      connected.then(() => {
+        lap("connect_ms");
+        timings.total_ms = Math.round(performance.now() - t0);
+        reportSetupTimings(timings);
+      });
+
     }catch(e){
       console.error(e);
       setDot("error");
@@ -580,6 +773,7 @@ WEBRTC_JS = r"""
   }
 
   function stopCall(){
+    closeCoachSocket();
     try{
       if(pc){ pc.close(); pc = null; }
       if(micStream){
@@ -599,7 +793,10 @@ WEBRTC_JS = r"""
   let shownTips = new Set();
   let coachBusy = false;
 
-  function showToast(titleTag, tip){
+  let toastTimer = null;
+
+  // sticky = keep it up (a streamed tip still arriving); otherwise auto-hide after 3.2s
+  function showToast(titleTag, tip, sticky){
     const toast = document.getElementById("toast");
     const tag = document.getElementById("toastTag");
     const tipEl = document.getElementById("toastTip");
@@ -608,12 +805,103 @@ WEBRTC_JS = r"""
     tag.textContent = titleTag || "tip";
     tipEl.textContent = tip || "";
     toast.classList.add("show");
-    setTimeout(()=> toast.classList.remove("show"), 3200);
+    if(toastTimer) clearTimeout(toastTimer);
+    toastTimer = sticky ? null : setTimeout(()=> toast.classList.remove("show"), 3200);
+  }
+
+  function hideToast(){
+    const toast = document.getElementById("toast");
+    if(toastTimer) clearTimeout(toastTimer);
+    toastTimer = null;
+    if(toast) toast.classList.remove("show");
+  }
+
+  // Streamed tip: draw tokens as they arrive; the final "tip" message settles (or "tip_abort" hides) it
+  let tipDraftTag = "";
+
+  function handleTipDelta(msg){
+    const tag = (msg.reason_tag || "other").trim();
+    const text = (msg.text || "").trim();
+    if(!text || shownTags.has(tag)) return;
+    tipDraftTag = tag;
+    showToast(tag, text, true);
+  }
+
+  function handleTip(data){
+    const should = !!data.should_intervene;
+    const tip = (data.tip || "").trim();
+    const tag = (data.reason_tag || "other").trim();
+    const hadDraft = tipDraftTag === tag;
+    tipDraftTag = "";
+    if(!should || !tip){
+      if(hadDraft) hideToast();
+      return;
+    }
+
+    if(shownTags.has(tag) || shownTips.has(tip)){
+      if(hadDraft) hideToast();
+      return;
+    }
+
+    shownTags.add(tag);
+    shownTips.add(tip);
+
+    showToast(tag, tip);
+  }
+
+  // Push channel: turns go up as they happen, tips come down only when there is one.
+  // While the socket is connecting/open, HTTP polling stays idle; if it closes, polling takes over.
+  let coachWs = null;
+
+  function openCoachSocket(){
+    if(!document.getElementById("coachEnabled") || !callId || !window.WebSocket) return;
+
+    const proto = location.protocol === "https:" ? "wss" : "ws";
+    const ws = new WebSocket(`${proto}://${location.host}/coach/ws?call_id=${encodeURIComponent(callId)}`);
+    ws.onmessage = (evt) => {
+      let msg = null;
+      try { msg = JSON.parse(evt.data); } catch { return; }
+      if(!msg || !msg.type) return;
+
+      if(msg.type === "ready" || msg.type === "resync"){
+        syncedSeq = Math.min(msg.next_seq || 0, transcriptLines.length);
+        pushTurns();
+        return;
+      }
+      if(msg.type === "tip_delta"){ handleTipDelta(msg); return; }
+      if(msg.type === "tip_abort"){
+        if(tipDraftTag){ tipDraftTag = ""; hideToast(); }
+        return;
+      }
+      if(msg.type === "tip") handleTip(msg);
+    };
+    ws.onclose = () => {
+      if(coachWs === ws){
+        coachWs = null;
+        transcriptChanged = true;
+      }
+    };
+    coachWs = ws;
+  }
+
+  function closeCoachSocket(){
+    const ws = coachWs;
+    coachWs = null;
+    if(ws){ try{ ws.close(); }catch{} }
+  }
+
+  function pushTurns(){
+    if(!coachWs || coachWs.readyState !== WebSocket.OPEN) return;
+    transcriptChanged = false;
+    if(syncedSeq >= transcriptLines.length) return;
+    coachWs.send(JSON.stringify({ type: "turns", seq: syncedSeq, lines: transcriptLines.slice(syncedSeq) }));
+    syncedSeq = transcriptLines.length;
   }
 
   async function maybeCoach(){
     const coachEnabled = !!document.getElementById("coachEnabled");
     if(!coachEnabled) return;
+    if(coachWs){ pushTurns(); return; }
     if(coachBusy) return;
     if(!transcriptChanged) return;
 
@@ -621,29 +909,26 @@ WEBRTC_JS = r"""
     transcriptChanged = false;
 
     try{
-      const t = fullTranscript();
-      if(!t) return;
+      // Send only the lines the server hasn't seen yet (full transcript only without a call id)
+      const body = callId
+        ? { call_id: callId, seq: syncedSeq, lines: transcriptLines.slice(syncedSeq) }
+        : { transcript: fullTranscript() };
+      if(!callId && !body.transcript) return;
 
       const r = await fetch("/coach", {
         method:"POST",
         headers: {"Content-Type":"application/json"},
-        body: JSON.stringify({ transcript: t })
+        body: JSON.stringify(body)
       });
       const data = await r.json();
       if(!r.ok) return;
 
-      const should = !!data.should_intervene;
-      const tip = (data.tip || "").trim();
-      const tag = (data.reason_tag || "other").trim();
-      if(!should || !tip) return;
-
-      if(shownTags.has(tag)) return;
-      if(shownTips.has(tip)) return;
-
-      shownTags.add(tag);
-      shownTips.add(tip);
+      if(typeof data.next_seq === "number"){
+        syncedSeq = Math.min(data.next_seq, transcriptLines.length);
+        if(data.resync || syncedSeq < transcriptLines.length) transcriptChanged = true;
+      }
 
-      showToast(tag, tip);
+      handleTip(data);
 
     }catch(e){
       // ignore
@@ -654,7 +939,27 @@ WEBRTC_JS = r"""
 
   setInterval(maybeCoach, 1200);
 
-  window._rt = { startCall, stopCall, fullTranscript, getLevel, getScenarioId };
+  // Post-call submit: upload only the tail the turn log lacks; re-send everything if the server copy is incomplete.
+  async function submitTranscript(url, extra){
+    const post = (payload) => fetch(url, {
+      method:"POST",
+      headers: {"Content-Type":"application/json"},
+      body: JSON.stringify(Object.assign({}, extra || {}, payload))
+    });
+
+    let r = callId
+      ? await post({ call_id: callId, seq: loggedSeq, lines: transcriptLines.slice(loggedSeq), total: transcriptLines.length })
+      : await post({ transcript: fullTranscript() });
+    let data = await r.json();
+    if(r.status === 409 && data?.need_transcript){
+      r = await post({ call_id: callId, transcript: fullTranscript() });
+      data = await r.json();
+    }
+    if(!r.ok) throw new Error(data?.detail || "request failed");
+    return data;
+  }
+
+  window._rt = { startCall, warmUp, stopCall, fullTranscript, submitTranscript, getLevel, getScenarioId, getCallId: () => callId };
 </script>
 """
 
@@ -741,12 +1046,17 @@ TRAINING_LIVE_HTML = """
   document.getElementById("levelPill").textContent = "level: " + level;
   document.getElementById("scenarioPill").textContent = "scenario: " + (scenario_id || "default");
 
+  const callOpts = {
+    level,
+    sessionUrl: "/session",
+    tokenUrl: __RT_TOKEN_URL__,
+    onRealtimeEvent: (t) => { /* optional */ }
+  };
+  // Mic, peer connection and ICE are set up on page load; "Start call" only exchanges SDP
+  if(__RT_WARMUP__) window._rt.warmUp(callOpts);
+
   document.getElementById("startBtn").onclick = async () => {
-    await window._rt.startCall({
-      level,
-      sessionUrl: "/session",
-      onRealtimeEvent: (t) => { /* optional */ }
-    });
+    await window._rt.startCall(callOpts);
   };
 
   document.getElementById("endBtn").onclick = () => window._rt.stopCall();
@@ -758,13 +1068,7 @@ TRAINING_LIVE_HTML = """
       return;
     }
     try{
-      const r = await fetch("/aftercall", {
-        method:"POST",
-        headers: {"Content-Type":"application/json"},
-        body: JSON.stringify({ transcript: t, level, scenario_id })
-      });
-      const data = await r.json();
-      if(!r.ok) throw new Error(data?.detail || "aftercall failed");
+      const data = await window._rt.submitTranscript("/aftercall", { level, scenario_id });
       window.location.href = `/training/report/${data.attempt_id}`;
     }catch(e){
       alert(e.message || e);
@@ -855,6 +1159,8 @@ EXAM_LIVE_HTML = """
     await window._rt.startCall({
       level,
       sessionUrl: "/session",
+      tokenUrl: __RT_TOKEN_URL__,
+      mode: "exam",
       onRealtimeEvent: (t) => { /* no coach */ }
     });
   };
@@ -869,13 +1175,7 @@ EXAM_LIVE_HTML = """
       return;
     }
     try{
-      const r = await fetch("/grade", {
-        method:"POST",
-        headers: {"Content-Type":"application/json"},
-        body: JSON.stringify({ transcript: t, level })
-      });
-      const data = await r.json();
-      if(!r.ok) throw new Error(data?.detail || "grade failed");
+      const data = await window._rt.submitTranscript("/grade", { level });
       window.location.href = `/exam/report/${data.attempt_id}`;
     }catch(e){
       alert(e.message || e);
@@ -1077,6 +1377,72 @@ def _parse_json_any(x):
                 return {}
     return {}
 
+def _eval_in_progress(a: dict) -> bool:
+    return (a.get("eval_status") or "") in ("pending", "running")
+
+def _eval_progress_card(a: dict) -> str:
+    """Placeholder shown while the background evaluation job runs; polls and reloads when it settles."""
+    attempt_id = int(a.get("id") or 0)
+    estimate = _provisional_checklist(a)
+    return f"""
+    <div class="card" id="evalProgress">
+      <div class="sectionTitle">⏳ Evaluating…</div>
+      <div class="muted" id="evalProgressMsg">Your call is saved. The report fills in automatically when grading finishes — you can leave this page and come back.</div>
+      {estimate}
+    </div>
+<script>
+(function() {{
+  const url = "/api/attempt/{attempt_id}/status";
+  let delay = 1500;
+  async function poll() {{
+    try {{
+      const r = await fetch(url, {{ credentials: "same-origin" }});
+      if (r.ok) {{
+        const j = await r.json();
+        if (j.status === "done" || j.status === "failed") {{ window.location.reload(); return; }}
+        if (j.status === "running") {{
+          const p = j.partial || {{}};
+          document.getElementById("evalProgressMsg").textContent = (typeof p.score === "number")
+            ? ("Score so far: " + p.score + (p.pass === true ? " (pass)" : p.pass === false ? " (fail)" : "") + " — finishing the details…")
+            : "Grading your call…";
+        }}
+      }}
+    }} catch (e) {{}}
+    delay = Math.min(delay * 1.5, 10000);
+    setTimeout(poll, delay);
+  }}
+  setTimeout(poll, delay);
+}})();
+</script>
+"""
+
+def _provisional_checklist(a: dict) -> str:
+    """Rule-based checklist saved with a pending attempt (local_checklist), shown until the real one lands."""
+    rep = _parse_json_any(a.get("checklist_json","") or "")
+    items = rep.get("items") or [] if isinstance(rep, dict) else []
+    if not items:
+        return ""
+    pills = []
+    for it in items:
+        st = (it.get("status") or "").lower()
+        badge = "pill ok" if st=="done" else ("pill lock" if st=="partial" else "pill")
+        pills.append(f'<div class="{badge}">{_esc(it.get("title",""))}</div>')
+    return f"""
+      <div style="height:10px;"></div>
+      <div class="muted">Provisional estimate: checklist ~{int(a.get("checklist_score", 0) or 0)}% from phrase matching only. The graded score can differ noticeably.</div>
+      <div class="row" style="gap:6px;margin-top:6px;flex-wrap:wrap;">{"".join(pills)}</div>
+"""
+
+def _local_estimate_note(rep: dict) -> str:
+    if not isinstance(rep, dict) or rep.get("source") != "local":
+        return ""
+    return "<div class='muted' style='margin-bottom:10px;'>Rough estimate: phrase matching only, no AI grading. Treat the score as approximate; a graded call can land well above or below it.</div>"
+
+def _eval_failed_note(a: dict) -> str:
+    if (a.get("eval_status") or "") != "failed":
+        return ""
+    return "<div class='muted' style='margin-bottom:10px;'>Automatic evaluation failed after several attempts.</div>"
+
 def build_training_report_html(a: dict) -> str:
     lvl = _esc(a.get("level",""))
     score = int(a.get("checklist_score", 0) or 0)
@@ -1114,27 +1480,10 @@ def build_training_report_html(a: dict) -> str:
             return "<div class='muted'>—</div>"
         return "<ul>" + "".join([f"<li>{_esc(str(x))}</li>" for x in arr]) + "</ul>"
 
-    html = f"""
-<!doctype html>
-<html>
-<head>
-  <meta charset="utf-8" />
-  <title>Training report</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  {THEME_CSS}
-</head>
-<body>
-  <div class="wrap">
-    <div class="top">
-      <div class="title">📄 Training report</div>
-      <div class="row">
-        {pill()}
-        <button class="smallbtn" onclick="window.location.href='/training'">New training</button>
-        <button class="smallbtn" onclick="window.location.href='/app'">Dashboard</button>
-      </div>
-    </div>
-
+    report_body = _eval_progress_card(a) if _eval_in_progress(a) else f"""
     <div class="card">
+      {_eval_failed_note(a)}
+      {_local_estimate_note(rep)}
       <div class="row" style="justify-content:space-between;">
         <div class="sectionTitle">Checklist</div>
         <div class="pill">{score}%</div>
@@ -1161,6 +1510,29 @@ def build_training_report_html(a: dict) -> str:
         {render_list(next_say)}
       </div>
     </div>
+"""
+
+    html = f"""
+<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <title>Training report</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  {THEME_CSS}
+</head>
+<body>
+  <div class="wrap">
+    <div class="top">
+      <div class="title">📄 Training report</div>
+      <div class="row">
+        {pill()}
+        <button class="smallbtn" onclick="window.location.href='/training'">New training</button>
+        <button class="smallbtn" onclick="window.location.href='/app'">Dashboard</button>
+      </div>
+    </div>
+
+    {report_body}
   </div>
 </body>
 </html>
@@ -1184,27 +1556,9 @@ def build_exam_report_html(a: dict) -> str:
             return "<div class='muted'>—</div>"
         return "<ul>" + "".join([f"<li>{_esc(str(x))}</li>" for x in arr]) + "</ul>"
 
-    html = f"""
-<!doctype html>
-<html>
-<head>
-  <meta charset="utf-8" />
-  <title>Exam report</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1" />
-  {THEME_CSS}
-</head>
-<body>
-  <div class="wrap">
-    <div class="top">
-      <div class="title">📄 Exam report</div>
-      <div class="row">
-        <div class="pill">Level: {lvl}</div>
-        <button class="smallbtn" onclick="window.location.href='/exam'">New exam</button>
-        <button class="smallbtn" onclick="window.location.href='/app'">Dashboard</button>
-      </div>
-    </div>
-
+    report_body = _eval_progress_card(a) if _eval_in_progress(a) else f"""
     <div class="card">
+      {_eval_failed_note(a)}
       <div class="row" style="justify-content:space-between;">
         <div class="{badge}">{'PASS' if passed else 'FAIL'}</div>
         <div class="pill">Score: {score}</div>
@@ -1232,9 +1586,33 @@ def build_exam_report_html(a: dict) -> str:
       <div style="height:12px;"></div>
       <div class="card">
         <div class="sectionTitle">Checklist details</div>
+        {_local_estimate_note(checklist)}
         <pre>{_esc(json.dumps(checklist, ensure_ascii=False, indent=2)) if checklist else _esc(str(checklist_raw))}</pre>
       </div>
     </div>
+"""
+
+    html = f"""
+<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <title>Exam report</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  {THEME_CSS}
+</head>
+<body>
+  <div class="wrap">
+    <div class="top">
+      <div class="title">📄 Exam report</div>
+      <div class="row">
+        <div class="pill">Level: {lvl}</div>
+        <button class="smallbtn" onclick="window.location.href='/exam'">New exam</button>
+        <button class="smallbtn" onclick="window.location.href='/app'">Dashboard</button>
+      </div>
+    </div>
+
+    {report_body}
   </div>
 </body>
 </html>
@@ -1248,7 +1626,12 @@ def build_exam_report_html(a: dict) -> str:
 def build_login_html() -> str:
     return LOGIN_HTML.replace("__THEME_CSS__", THEME_CSS)
 
-def build_dashboard_html(user_email: str, show_admin: bool = False, training_enabled: bool = True) -> str:
+def build_dashboard_html(
+    user_email: str,
+    show_admin: bool = False,
+    training_enabled: bool = True,
+    unfinished_calls: list | None = None,
+) -> str:
     safe_user = _esc(user_email or "")
 
     admin_card = ""
@@ -1270,8 +1653,55 @@ def build_dashboard_html(user_email: str, show_admin: bool = False, training_ena
         .replace("__USER__", safe_user)
         .replace("__ADMIN_CARD__", admin_card)
         .replace("__TRAINING_BUTTON__", training_btn)
+        .replace("__UNFINISHED_CARD__", _unfinished_calls_card(unfinished_calls or []))
     )
 
+
+def _unfinished_calls_card(calls: list) -> str:
+    """Calls that ended without a report (tab closed mid-call): the server turn log kept them."""
+    if not calls:
+        return ""
+    rows = []
+    for i, c in enumerate(calls):
+        what = "Exam" if c.get("mode") == "exam" else "Training"
+        when = str(c.get("started_at") or "").replace("T", " ")[:16]
+        rows.append(f"""
+          <div class="row" style="justify-content:space-between;">
+            <div class="muted">{what} · {_esc(c.get("level") or "")} · {int(c.get("turns") or 0)} turns · {_esc(when)}</div>
+            <button class="smallbtn" onclick="recoverCall(this, {i})">Get report</button>
+          </div>""")
+    calls_json = json.dumps(
+        [{k: c.get(k) for k in ("call_id", "mode", "level", "scenario_id")} for c in calls]
+    ).replace("</", "<\\/")
+    return f"""
+      <div class="card">
+        <div class="sectionTitle">⏸ Unfinished calls</div>
+        <div class="muted">These calls ended before they were submitted. Every turn up to then was saved.</div>
+        <div style="height:10px;"></div>
+        {"".join(rows)}
+      </div>
+      <script>
+        const UNFINISHED_CALLS = {calls_json};
+        async function recoverCall(btn, i){{
+          const c = UNFINISHED_CALLS[i];
+          const exam = c.mode === "exam";
+          btn.disabled = true;
+          try{{
+            const r = await fetch(exam ? "/grade" : "/aftercall", {{
+              method: "POST",
+              headers: {{ "Content-Type": "application/json" }},
+              body: JSON.stringify({{ call_id: c.call_id, recover: true, level: c.level, scenario_id: c.scenario_id || "" }})
+            }});
+            const data = await r.json();
+            if(!r.ok) throw new Error(data?.detail || "request failed");
+            window.location.href = (exam ? "/exam/report/" : "/training/report/") + data.attempt_id;
+          }}catch(e){{
+            btn.disabled = false;
+            alert(e.message || e);
+          }}
+        }}
+      </script>"""
+
 def build_training_picker_html(scenarios_by_level: dict | None = None) -> str:
     if scenarios_by_level is None:
         scenarios_by_level = {"easy": [], "medium": [], "hard": []}
@@ -1281,16 +1711,21 @@ def build_training_picker_html(scenarios_by_level: dict | None = None) -> str:
         .replace("__SCENARIOS_JSON__", json.dumps(scenarios_by_level))
     )
 
-def build_training_live_html() -> str:
+def build_training_live_html(token_url: str = "", ice_timeout_ms: int = 1000, warmup: bool = True) -> str:
     return (TRAINING_LIVE_HTML
             .replace("__THEME_CSS__", THEME_CSS)
-            .replace("__WEBRTC_JS__", WEBRTC_JS))
+            .replace("__WEBRTC_JS__", WEBRTC_JS)
+            .replace("__RT_TOKEN_URL__", json.dumps(token_url))
+            .replace("__RT_ICE_TIMEOUT_MS__", str(int(ice_timeout_ms)))
+            .replace("__RT_WARMUP__", json.dumps(bool(warmup))))
 
-def build_exam_html() -> str:
+def build_exam_html(token_url: str = "", ice_timeout_ms: int = 1000) -> str:
     return (
         EXAM_LIVE_HTML
         .replace("__THEME_CSS__", THEME_CSS)
         .replace("__WEBRTC_JS__", WEBRTC_JS)
+        .replace("__RT_TOKEN_URL__", json.dumps(token_url))
+        .replace("__RT_ICE_TIMEOUT_MS__", str(int(ice_timeout_ms)))
     )
 
 def build_admin_html(user_email: str) -> str:
@@ -0,0 +1,102 @@
+# phrases.py
+import hashlib
+import re
+from typing import Dict, Iterable, List
+
+# Lowercased word tokens plus "?" as its own token. Apostrophes split words the way the old
+# \b regexes did: "what's" -> "what", "s", so "what" / "name is" style cues still match.
+_TOKEN_RE = re.compile(r"\w+|\?")
+
+# -------------------------
+# Phrase tables (matched on word boundaries, case-insensitive)
+# -------------------------
+FILLERS = ["um", "uh", "erm", "like", "you know", "actually", "basically"]
+HEDGES = ["maybe", "i think", "probably", "not sure", "i guess", "kind of", "sort of"]
+
+# Checklist cues (script_state.ScriptState)
+CHECKLIST_CUES: Dict[str, List[str]] = {
+    "opening_intro": ["my name is", "this is"],
+    "opening_org": ["team", "support", "from", "company"],
+    "opening_help": ["how can i help"],
+    "identification": ["name", "last 4", "last four", "last4", "lastfour", "id", "phone", "phone number", "email"],
+    "empathy": ["i understand", "i'm sorry", "sorry to hear", "that sounds", "i can imagine", "i appreciate"],
+    "restate": ["just to confirm", "to confirm", "to make sure i understand", "if i understand", "so you're", "so you are"],
+    "expectations": [
+        "next step", "what i'll do", "what i will do", "within", "today", "tomorrow",
+        "minutes", "hours", "by the end", "by eod",
+    ],
+    "close": ["to summarize", "just to summarize", "summary", "recap"],
+    "feedback": ["survey", "feedback", "rate", "rating"],
+    "near_closing": ["anything else", "goodbye", "bye", "thank you for calling", "have a good day", "have a nice day"],
+    "question": ["?", "can you", "could you", "what", "when", "where", "which", "how"],
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower().replace("’", "'"))
+
+
+_SINGLE_WORD_FILLERS = {f for f in FILLERS if " " not in f}
+
+
+def fingerprint(text: str) -> str:
+    """
+    Stable short hash of an utterance after normalization:
+    lowercase word tokens, single-word fillers and immediate repeats dropped.
+    "Um, I I think   so." and "i think so" share a fingerprint.
+    """
+    out: List[str] = []
+    for tok in tokenize(text):
+        if tok in _SINGLE_WORD_FILLERS or (out and out[-1] == tok):
+            continue
+        out.append(tok)
+    return hashlib.sha1(" ".join(out).encode("utf-8")).hexdigest()[:16]
+
+
+class PhraseMatcher:
+    """
+    Token trie over every phrase of every category, built once.
+    scan() walks the text's tokens in one pass and returns {category: hits}.
+    Overlapping phrases all count ("how can i help" is both opening_help and question),
+    and immediate word repeats ("I I", "we we") are reported as "stutter".
+    """
+
+    def __init__(self, phrases_by_category: Dict[str, Iterable[str]]):
+        self._root: dict = {}
+        for cat, phrases in phrases_by_category.items():
+            for phrase in phrases:
+                node = self._root
+                for tok in tokenize(phrase):
+                    node = node.setdefault(tok, {})
+                # None key = "a phrase ends here"; value is the tuple of its categories
+                node[None] = tuple(sorted(set(node.get(None, ())) | {cat}))
+
+    def scan(self, text: str) -> Dict[str, int]:
+        toks = tokenize(text)
+        n = len(toks)
+        root_get = self._root.get
+        counts: Dict[str, int] = {}
+        prev = None
+        for i, tok in enumerate(toks):
+            # stutter: non-overlapping runs, same as the old r"\b(\w+)\s+\1\b"
+            if tok == prev and tok != "?":
+                counts["stutter"] = counts.get("stutter", 0) + 1
+                prev = None
+            else:
+                prev = tok
+
+            node = root_get(tok)
+            j = i
+            while node is not None:
+                cats = node.get(None)
+                if cats:
+                    for c in cats:
+                        counts[c] = counts.get(c, 0) + 1
+                j += 1
+                if j >= n:
+                    break
+                node = node.get(toks[j])
+        return counts
+
+
+MATCHER = PhraseMatcher({"filler": FILLERS, "hedge": HEDGES, **CHECKLIST_CUES})
@@ -0,0 +1,116 @@
+# progressive.py
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from settings import CHECKLIST_SEGMENT_TURNS, CHECKLIST_FINISH_DEADLINE_SEC
+from coach_session import CoachSession
+from evaluation import evaluate_checklist_segment, merge_checklists
+
+# Lines before a segment handed to the model as read-only context
+SEGMENT_CONTEXT_LINES = 4
+
+
+class ProgressiveChecklist:
+    """
+    Background checklist scoring for one live training call.
+    Every CHECKLIST_SEGMENT_TURNS agent turns the lines since the last scored segment are
+    evaluated; at hang-up only the tail is left, then merge_checklists() builds the report.
+    Segments are contiguous: a failed segment is simply folded into the next one.
+    """
+
+    def __init__(self):
+        self.parts: List[Dict[str, Any]] = []
+        self.covered_to = 0              # transcript seq up to which parts are scored
+        self.covered_turns = 0           # agent turns inside covered_to
+        self.task: Optional[asyncio.Task] = None
+        self.broken = False              # transcript buffer rolled past uncovered lines
+
+    def _slice(self, session: CoachSession, start: int, end: int) -> List[str]:
+        lines = list(session.lines)
+        lo, hi = start - session.base_seq, end - session.base_seq
+        return [ln for ln in lines[max(0, lo):max(0, hi)] if ln]
+
+    async def _score(self, session: CoachSession, start: int, end: int, turns: int) -> Optional[Dict[str, Any]]:
+        context = self._slice(session, max(0, start - SEGMENT_CONTEXT_LINES), start)
+        segment = self._slice(session, start, end)
+        t0 = time.monotonic()
+        try:
+            part = await evaluate_checklist_segment(context, segment)
+        except Exception as e:
+            print(f"[progressive] {session.call_id}: segment {start}-{end} failed:", repr(e))
+            return None
+        if part is not None and self.covered_to == start:
+            self.parts.append(part)
+            self.covered_to, self.covered_turns = end, turns
+            print(f"[progressive] {session.call_id}: lines {start}-{end} scored in {time.monotonic() - t0:.2f}s")
+        return part
+
+    def observe(self, session: CoachSession) -> None:
+        """Called after new transcript lines arrive; starts a segment evaluation when one is due."""
+        if self.broken or CHECKLIST_SEGMENT_TURNS <= 0:
+            return
+        if session.base_seq > self.covered_to:
+            self.broken = True
+            return
+        if self.task is not None and not self.task.done():
+            return
+        turns = session.script.agent_turns
+        if turns - self.covered_turns < CHECKLIST_SEGMENT_TURNS:
+            return
+        self.task = asyncio.create_task(self._score(session, self.covered_to, session.next_seq, turns))
+
+    def snapshot(self, session: CoachSession, transcript: str) -> Optional[Dict[str, Any]]:
+        """
+        What is left to do at hang-up, as a JSON-able job payload: the segments scored so far
+        plus the unscored tail (and its context). None when progressive scoring cannot be
+        trusted (nothing scored yet, buffer overflow, transcript mismatch): the job then runs
+        the full evaluate_checklist(). A segment still in flight is dropped; the tail covers it.
+        """
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        if self.broken or not self.parts:
+            return None
+        if session.base_seq != 0 or session.transcript() != transcript:
+            return None
+        return {
+            "parts": list(self.parts),
+            "context": self._slice(session, max(0, self.covered_to - SEGMENT_CONTEXT_LINES), self.covered_to),
+            "segment": self._slice(session, self.covered_to, session.next_seq),
+        }
+
+
+def observe(session: CoachSession) -> None:
+    if session.checklist is None:
+        session.checklist = ProgressiveChecklist()
+    session.checklist.observe(session)
+
+
+def snapshot(session: Optional[CoachSession], transcript: str) -> Optional[Dict[str, Any]]:
+    if session is None or session.checklist is None:
+        return None
+    return session.checklist.snapshot(session, transcript)
+
+
+async def finish(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Final report from a snapshot() payload (runs in the evaluation job): score the tail and
+    merge. None on failure or past CHECKLIST_FINISH_DEADLINE_SEC, so the job falls back to
+    the full evaluate_checklist().
+    """
+    parts = list(payload.get("parts") or [])
+    if not parts:
+        return None
+    if payload.get("segment"):
+        try:
+            tail = await asyncio.wait_for(
+                evaluate_checklist_segment(payload.get("context") or [], payload["segment"]),
+                timeout=CHECKLIST_FINISH_DEADLINE_SEC,
+            )
+        except asyncio.TimeoutError:
+            print("[progressive] final segment missed the deadline")
+            return None
+        if tail is None:
+            return None
+        parts.append(tail)
+    return merge_checklists(parts)
@@ -305,6 +305,18 @@ should_intervene=false and tip="".
 """.strip()
 
 
+# Tier-0 coach: one ready-to-say line per checklist step (no LLM call).
+COACH_TEMPLATES = {
+    "opening": "Hi, my name is … from the support team. How can I help you today?",
+    "empathy": "I'm sorry to hear that. I understand how frustrating this must be.",
+    "clarify": "Could you tell me when this started and what you see exactly?",
+    "restate": "Just to make sure I understand: the issue is … Is that right?",
+    "expectations": "Next step: I'll … and you'll hear back from us within 24 hours.",
+    "close": "To summarize, we … Is there anything else I can help you with?",
+    "feedback": "You may get a short survey after this call. Your feedback really helps.",
+}
+
+
 # -------------------------
 # GRADER / CHECKLIST (keep yours)
 # -------------------------
@@ -375,3 +387,82 @@ Output format:
   "next_time_say": ["", ""]
 }
 """.strip()
+
+
+# -------------------------
+# CHECKLIST (segment): scored in the background while the training call is running
+# -------------------------
+CHECKLIST_SEGMENT_PROMPT = """
+You are evaluating ONE SEGMENT of an ongoing phone customer service simulation.
+
+IMPORTANT:
+- Judge ONLY communication and call-structure skills.
+- Do NOT judge technical correctness.
+- Use transcript labels exactly: "AGENT:" and "CUSTOMER:".
+- Base every judgment on AGENT lines.
+- Lines under "Earlier context" were already evaluated. Use them only to understand the segment.
+- Judge ONLY the lines under "Segment". Mark an item "done" or "partial" only if the
+  segment itself shows it; otherwise "missing" (later segments may still cover it).
+- Always return all 10 items.
+
+CHECKLIST ITEMS:
+1) Opening
+2) Identification
+3) Listening
+4) Empathy
+5) Clarify
+6) Restate
+7) Professional tone
+8) Expectations & timeframe
+9) Close
+10) Feedback
+
+Return STRICT JSON ONLY.
+No explanations. No markdown. No extra text.
+
+Output format:
+{
+  "checklist_score": 0,
+  "items": [
+    {
+      "id": "opening",
+      "title": "Opening",
+      "status": "done|partial|missing",
+      "evidence": "",
+      "note": ""
+    }
+  ],
+  "highlights": [""],
+  "improvements": [""],
+  "next_time_say": [""]
+}
+""".strip()
+
+# -------------------------
+# EXAM (fused): grade + checklist in ONE call (EXAM_EVAL_MODE=fused)
+# -------------------------
+# Built from GRADER_RUBRIC and CHECKLIST_SYSTEM_PROMPT, so a rubric edit reaches fused and split mode alike.
+EXAM_FUSED_PROMPT = "\n\n".join([
+    """
+You are evaluating a trainee AGENT in a phone customer service exam.
+Produce BOTH the overall grade and the checklist in ONE JSON object.
+Follow PART 1 for the grade and PART 2 for the checklist.
+""".strip(),
+    "=== PART 1: GRADE ===\n" + GRADER_RUBRIC,
+    "=== PART 2: CHECKLIST ===\n" + CHECKLIST_SYSTEM_PROMPT,
+    """
+=== COMBINED OUTPUT ===
+Return ONE object, not two: the PART 1 keys at the top level and the PART 2 object under
+"checklist". STRICT JSON ONLY. No explanations. No markdown. No extra text.
+
+Output format:
+{
+  "score": 0,
+  "pass": false,
+  "summary": "",
+  "strengths": ["", ""],
+  "improvements": ["", "", ""],
+  "checklist": {"checklist_score": 0, "items": [...], "highlights": [...], "improvements": [...], "next_time_say": [...]}
+}
+""".strip(),
+])
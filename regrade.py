@@ -0,0 +1,204 @@
+# regrade.py
+"""
+Re-score stored attempts with the current prompts / grader model.
+
+    python regrade.py                       # every training + exam attempt
+    python regrade.py --mode exam --concurrency 8 --rpm 300
+    python regrade.py --apply               # also overwrite the scores shown on attempts
+
+Results go to the `regrades` table keyed by (attempt_id, rubric_version), so old and new
+scores can be compared side by side. Progress is checkpointed in `regrade_runs`; re-running
+the same command resumes after the last fully handled attempt id.
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, Optional, Set
+
+import evaluation
+from evaluation import evaluate_checklist, grade_exam_and_checklist, rubric_version
+from jobs import exam_fields, training_fields
+from limiter import REGRADE, priority
+from storage import (
+    attempts_to_regrade,
+    get_regrade_checkpoint,
+    save_regrade,
+    save_regrade_checkpoint,
+    update_attempt,
+)
+
+
+class RateLimiter:
+    """Global requests-per-minute cap shared by every worker (token bucket, burst of 1)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Progress:
+    """Low-water mark over ids handed to workers: the checkpoint never skips an unfinished attempt."""
+
+    def __init__(self, run_id: str, last_id: int, done: int = 0, failed: int = 0, every: int = 20):
+        self.run_id = run_id
+        self.last_id = last_id
+        self.done = done
+        self.failed = failed
+        self.every = every
+        self._inflight: Set[int] = set()
+        self._last_queued = last_id
+        self._since_save = 0
+
+    def queued(self, attempt_id: int) -> None:
+        self._inflight.add(attempt_id)
+        self._last_queued = attempt_id
+
+    def finished(self, attempt_id: int, ok: bool) -> None:
+        self._inflight.discard(attempt_id)
+        if ok:
+            self.done += 1
+        else:
+            self.failed += 1
+        self._since_save += 1
+        if self._since_save >= self.every:
+            self.save()
+
+    def save(self) -> None:
+        self.last_id = (min(self._inflight) - 1) if self._inflight else self._last_queued
+        save_regrade_checkpoint(self.run_id, self.last_id, self.done, self.failed)
+        self._since_save = 0
+
+
+async def _regrade_one(a: Dict[str, Any], version: str, apply: bool) -> None:
+    transcript = a.get("transcript") or ""
+    if a["mode"] == "exam":
+        result, checklist = await grade_exam_and_checklist(transcript, strict=True)
+        fields = exam_fields(result, checklist)
+    else:
+        report = await evaluate_checklist(
+            transcript,
+            customer_type=a.get("customer_type") or "",
+            emotion_level=a.get("emotion_level"),
+            strict=True,
+        )
+        fields = training_fields(report)
+    save_regrade(a["id"], version, a["mode"], fields)
+    if apply:
+        update_attempt(a["id"], {**fields, "rubric_version": version})
+
+
+async def run(
+    mode: str = "",
+    concurrency: int = 4,
+    rpm: float = 120.0,
+    batch_size: int = 200,
+    limit: Optional[int] = None,
+    run_id: str = "",
+    restart: bool = False,
+    apply: bool = False,
+) -> Progress:
+    version = rubric_version()
+    run_id = run_id or f"{version}:{mode or 'all'}"
+    cp = None if restart else get_regrade_checkpoint(run_id)
+    progress = Progress(run_id, cp["last_id"] if cp else 0, cp["done"] if cp else 0, cp["failed"] if cp else 0)
+    print(f"[regrade] rubric_version={version} run={run_id} resuming after id {progress.last_id}")
+
+    limiter = RateLimiter(rpm)
+    # Bounded queue: at most ~2 pages of attempts are held in memory at any time
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(batch_size, concurrency * 2))
+    t0 = time.monotonic()
+
+    async def worker() -> None:
+        while True:
+            a = await queue.get()
+            if a is None:
+                return
+            ok = True
+            try:
+                await limiter.wait()
+                await _regrade_one(a, version, apply)
+            except Exception as e:
+                ok = False
+                print(f"[regrade] attempt {a['id']} failed:", repr(e)[:300])
+            progress.finished(a["id"], ok)
+            handled = progress.done + progress.failed
+            if handled % 100 == 0:
+                rate = handled / max(1e-6, time.monotonic() - t0)
+                print(f"[regrade] {handled} handled ({progress.failed} failed), {rate:.1f}/s, last id {progress.last_id}")
+
+    # Lowest class in the process-wide OpenAI limiter (tasks inherit the context they are created in)
+    with priority(REGRADE):
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    after_id, fed = progress.last_id, 0
+    try:
+        while limit is None or fed < limit:
+            page = attempts_to_regrade(after_id, batch_size, version, mode)
+            if not page:
+                break
+            for a in page:
+                if limit is not None and fed >= limit:
+                    break
+                progress.queued(a["id"])
+                await queue.put(a)
+                fed += 1
+            after_id = page[-1]["id"]
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+        progress.save()
+
+    print(
+        f"[regrade] finished: {progress.done} regraded, {progress.failed} failed "
+        f"in {time.monotonic() - t0:.1f}s (checkpoint id {progress.last_id})"
+    )
+    if progress.failed:
+        print("[regrade] failed attempts are retried by running again with --restart (done ones are skipped)")
+    return progress
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Re-grade stored attempts with the current rubric.")
+    p.add_argument("--mode", choices=["training", "exam"], default="", help="only this attempt mode")
+    p.add_argument("--concurrency", type=int, default=4, help="parallel evaluations")
+    p.add_argument("--rpm", type=float, default=120.0, help="max evaluations started per minute (0 = no cap)")
+    p.add_argument("--batch-size", type=int, default=200, help="attempts fetched per page")
+    p.add_argument("--limit", type=int, default=None, help="stop after this many attempts")
+    p.add_argument("--run-id", default="", help="checkpoint name (default: rubric version + mode)")
+    p.add_argument("--restart", action="store_true", help="ignore the checkpoint and scan from the first attempt")
+    p.add_argument("--apply", action="store_true", help="also overwrite the scores stored on attempts")
+    args = p.parse_args()
+
+    if evaluation.aclient is None:
+        raise SystemExit("[regrade] OPENAI_API_KEY is not set; nothing would be re-graded.")
+
+    try:
+        asyncio.run(run(
+            mode=args.mode,
+            concurrency=args.concurrency,
+            rpm=args.rpm,
+            batch_size=args.batch_size,
+            limit=args.limit,
+            run_id=args.run_id,
+            restart=args.restart,
+            apply=args.apply,
+        ))
+    except KeyboardInterrupt:
+        print("[regrade] interrupted; run the same command again to resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# script_state.py
+from typing import Dict, Optional
+
+from phrases import MATCHER
+
+
+class ScriptState:
+    """
+    Incremental checklist state: feed() one transcript line at a time.
+    Flags only ever flip from False to True, so each turn costs O(len(turn))
+    instead of re-scanning the whole call.
+    """
+
+    def __init__(self):
+        self.opening_intro = False
+        self.opening_org = False
+        self.opening_help = False
+        self.identification_done = False
+        self.empathy_done = False
+        self.restate_done = False
+        self.expectations_done = False
+        self.close_done = False
+        self.feedback_done = False
+        self.near_closing = False
+        self.agent_asked = False
+        self.has_customer = False
+        self.agent_turns = 0
+        self.last_role = ""
+
+    @classmethod
+    def from_transcript(cls, transcript: str) -> "ScriptState":
+        st = cls()
+        for ln in (transcript or "").splitlines():
+            st.feed(ln)
+        return st
+
+    def feed(self, line: str) -> None:
+        ln = (line or "").strip()
+        if not ln:
+            return
+        up = ln.upper()
+        if "CUSTOMER:" in up:
+            self.has_customer = True
+        if up.startswith("CUSTOMER:"):
+            self.last_role = "CUSTOMER"
+            return
+        if not up.startswith("AGENT:"):
+            return
+
+        self.agent_turns += 1
+        self.last_role = "AGENT"
+        # One pass over the turn finds every checklist cue
+        hits = MATCHER.scan(ln)
+
+        self.opening_intro = self.opening_intro or "opening_intro" in hits
+        self.opening_org = self.opening_org or "opening_org" in hits
+        self.opening_help = self.opening_help or "opening_help" in hits
+        self.identification_done = self.identification_done or "identification" in hits
+        self.empathy_done = self.empathy_done or "empathy" in hits
+        self.restate_done = self.restate_done or "restate" in hits
+        self.expectations_done = self.expectations_done or "expectations" in hits
+        self.close_done = self.close_done or "close" in hits
+        self.feedback_done = self.feedback_done or "feedback" in hits
+        self.near_closing = self.near_closing or "near_closing" in hits
+        self.agent_asked = self.agent_asked or "question" in hits
+
+    @property
+    def opening_done(self) -> bool:
+        return self.opening_intro and self.opening_org and self.opening_help
+
+    @property
+    def clarify_done(self) -> bool:
+        # clarify: ONLY after the customer spoke at least once
+        return self.has_customer and self.agent_asked
+
+    def as_dict(self) -> Dict[str, bool]:
+        return {
+            "opening_done": self.opening_done,
+            "identification_done": self.identification_done,
+            "empathy_done": self.empathy_done,
+            "clarify_done": self.clarify_done,
+            "restate_done": self.restate_done,
+            "expectations_done": self.expectations_done,
+            "close_done": self.close_done,
+            "feedback_done": self.feedback_done,
+            "near_closing": self.near_closing,
+            "has_customer": self.has_customer,
+        }
+
+    def next_missing_step(self) -> Optional[str]:
+        if not self.opening_done:
+            return "opening"
+        if self.has_customer:
+            if not self.empathy_done:
+                return "empathy"
+            if not self.clarify_done:
+                return "clarify"
+            if not self.restate_done:
+                return "restate"
+            if not self.expectations_done:
+                return "expectations"
+        if self.near_closing:
+            if not self.close_done:
+                return "close"
+            if not self.feedback_done:
+                return "feedback"
+        return None
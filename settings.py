@@ -18,11 +18,30 @@ def env_str(name: str, default: str = "") -> str:
     return v.strip().strip('"').strip("'").lstrip("\ufeff")
 
 
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(env_str(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(env_str(name, str(default)) or default)
+    except ValueError:
+        return default
+
+
 try:
     from openai import OpenAI
 except Exception:
     OpenAI = None
 
+try:
+    from openai import AsyncOpenAI
+except Exception:
+    AsyncOpenAI = None
+
 
 # ===== Required =====
 OPENAI_API_KEY = env_str("OPENAI_API_KEY")
@@ -45,12 +64,86 @@ REALTIME_MODEL = env_str("REALTIME_MODEL", "gpt-realtime-mini")
 ASR_MODEL = env_str("ASR_MODEL", "gpt-4o-mini-transcribe")
 ASR_LANGUAGE = env_str("ASR_LANGUAGE", "")  # "" => omit => auto-detect
 VOICE = env_str("VOICE", "marin")
+# Realtime call setup (SDP exchange) over a pooled keep-alive HTTP client
+REALTIME_CONNECT_TIMEOUT_SEC = env_float("REALTIME_CONNECT_TIMEOUT_SEC", 5.0)
+REALTIME_READ_TIMEOUT_SEC = env_float("REALTIME_READ_TIMEOUT_SEC", 30.0)
+REALTIME_KEEPALIVE_SEC = env_float("REALTIME_KEEPALIVE_SEC", 120.0)
+REALTIME_MAX_CONNECTIONS = env_int("REALTIME_MAX_CONNECTIONS", 20)
+# "proxy" = browser SDP goes through /session; "direct" = browser gets a short-lived client
+# secret from /session/token and exchanges SDP with the provider itself
+REALTIME_SDP_MODE = env_str("REALTIME_SDP_MODE", "proxy").lower()
+REALTIME_BASE_URL = env_str("REALTIME_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+REALTIME_TOKEN_TTL_SEC = max(10, min(7200, env_int("REALTIME_TOKEN_TTL_SEC", 60)))
+# Browser ICE gathering before the SDP offer is sent: stop at the first srflx/relay candidate,
+# once host candidates settle, or after this many ms, whichever comes first
+ICE_GATHER_TIMEOUT_MS = env_int("ICE_GATHER_TIMEOUT_MS", 1000)
+# Training live page opens the mic, peer connection and ICE on load ("Start call" = SDP exchange only)
+RTC_WARMUP = env_str("RTC_WARMUP", "1").lower() not in ("0", "false", "no", "off")
 
 COACH_MODEL = env_str("COACH_MODEL", "gpt-4o-mini")
 GRADER_MODEL = env_str("GRADER_MODEL", "gpt-4o-mini")
 
+# Live coach (per-call state)
+COACH_COOLDOWN_SEC = env_float("COACH_COOLDOWN_SEC", 12.0)
+# A tip later than this is worse than none: coach_tips gives up with reason_tag "deadline"
+COACH_DEADLINE_MS = env_int("COACH_DEADLINE_MS", 2500)
+COACH_SESSION_MAX = env_int("COACH_SESSION_MAX", 2000)
+COACH_SESSION_TTL_SEC = env_float("COACH_SESSION_TTL_SEC", 3600.0)
+TRANSCRIPT_MAX_LINES = env_int("TRANSCRIPT_MAX_LINES", 1000)
+COACH_TIP_CACHE_MAX = env_int("COACH_TIP_CACHE_MAX", 5000)
+COACH_TIP_CACHE_TTL_SEC = env_float("COACH_TIP_CACHE_TTL_SEC", 1800.0)
+
+# Hard ceiling for one LLM round-trip (seconds). The async client enforces it on the
+# HTTP layer; evaluation.py also wraps each call in asyncio.wait_for so it can be cancelled.
+LLM_TIMEOUT_SEC = env_float("LLM_TIMEOUT_SEC", 45.0)
+LLM_MAX_RETRIES = env_int("LLM_MAX_RETRIES", 1)
+
+# Shared deadline for the whole exam evaluation (grade + checklist run concurrently)
+GRADE_DEADLINE_SEC = env_float("GRADE_DEADLINE_SEC", 60.0)
+# "split" = grade + checklist as two concurrent calls, "fused" = one combined call
+EXAM_EVAL_MODE = env_str("EXAM_EVAL_MODE", "split").lower()
+
+# Token budgets for the transcript part of each prompt (context.build_context keeps whole turns:
+# opening, checklist evidence, then the most recent ones)
+GRADE_CONTEXT_TOKENS = env_int("GRADE_CONTEXT_TOKENS", 1200)
+CHECKLIST_CONTEXT_TOKENS = env_int("CHECKLIST_CONTEXT_TOKENS", 1700)
+COACH_CONTEXT_TOKENS = env_int("COACH_CONTEXT_TOKENS", 120)
+
+# Background evaluation jobs (jobs.py): worker count, attempts per job, first retry delay
+EVAL_WORKERS = env_int("EVAL_WORKERS", 2)
+EVAL_JOB_MAX_TRIES = env_int("EVAL_JOB_MAX_TRIES", 4)
+EVAL_RETRY_BASE_SEC = env_float("EVAL_RETRY_BASE_SEC", 5.0)
+# A running job's lease: renewed every third of it while the worker is alive; once it lapses
+# (process gone) any worker may take the job over
+EVAL_JOB_LEASE_SEC = env_float("EVAL_JOB_LEASE_SEC", 30.0)
+# Training calls are checklist-scored in segments of this many agent turns while live (0 = off);
+# at hang-up the last segment + merge must finish within the deadline or the full evaluation runs
+CHECKLIST_SEGMENT_TURNS = env_int("CHECKLIST_SEGMENT_TURNS", 6)
+CHECKLIST_FINISH_DEADLINE_SEC = env_float("CHECKLIST_FINISH_DEADLINE_SEC", 20.0)
+# Process-wide cap on OpenAI requests (limiter.py): concurrent calls, requests per minute
+# (0 = no rate cap) with burst, waiting-queue size, and slots only live coach / call setup may use
+OPENAI_MAX_CONCURRENT = env_int("OPENAI_MAX_CONCURRENT", 16)
+OPENAI_RPM = env_float("OPENAI_RPM", 500.0)
+OPENAI_BURST = env_int("OPENAI_BURST", 20)
+OPENAI_QUEUE_MAX = env_int("OPENAI_QUEUE_MAX", 100)
+OPENAI_RESERVED_SLOTS = env_int("OPENAI_RESERVED_SLOTS", 4)
+# Serve byte-identical evaluations (same transcript, prompt, model) from the SQLite eval_cache
+EVAL_CACHE_ENABLED = env_str("EVAL_CACHE", "1").lower() not in ("0", "false", "no", "off")
+# Most recently used results kept in eval_cache; older ones are pruned on write
+EVAL_CACHE_MAX_ENTRIES = env_int("EVAL_CACHE_MAX_ENTRIES", 5000)
+# Server-side turn log (call_log.py): forwarded turns are written to SQLite at least this
+# often, or as soon as this many are waiting
+CALL_LOG_FLUSH_SEC = env_float("CALL_LOG_FLUSH_SEC", 1.0)
+CALL_LOG_BATCH = env_int("CALL_LOG_BATCH", 50)
+
 client = OpenAI(api_key=OPENAI_API_KEY) if (HAS_KEY and OpenAI is not None) else None
 
+# Used by every evaluation entry point so LLM calls never block the event loop.
+aclient = (
+    AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=LLM_TIMEOUT_SEC, max_retries=LLM_MAX_RETRIES)
+    if (HAS_KEY and AsyncOpenAI is not None) else None
+)
+
 ONBOARDING = {
     "pdf_url": "/static/onboarding.pdf",
     "video_url": "https://youtu.be/fPXruR7bgsk?si=M6nCV1HOUv6etpv1",
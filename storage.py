@@ -1,5 +1,7 @@
 # storage.pyimport os
+import json
 import sqlite3
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -12,6 +14,8 @@ _EXTRA_COLUMNS = {
     "checklist_json": "TEXT",
     "customer_type": "TEXT",
     "emotion_level": "INTEGER",
+    "eval_status": "TEXT",
+    "rubric_version": "TEXT",
 }
 
 def _conn():
@@ -20,14 +24,27 @@ def _conn():
     c.row_factory = sqlite3.Row
     return c
 
-def _ensure_columns(con: sqlite3.Connection):
-    cols = {r["name"] for r in con.execute("PRAGMA table_info(attempts)").fetchall()}
-    for name, sql_type in _EXTRA_COLUMNS.items():
+# Job ownership + payload (added after the jobs table first shipped)
+_JOB_COLUMNS = {
+    "claimed_by": "TEXT",
+    "lease_until": "REAL",
+    "payload": "TEXT",
+}
+
+def _ensure_columns(con: sqlite3.Connection, table: str = "attempts", columns: Optional[Dict[str, str]] = None):
+    cols = {r["name"] for r in con.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, sql_type in (_EXTRA_COLUMNS if columns is None else columns).items():
         if name not in cols:
-            con.execute(f"ALTER TABLE attempts ADD COLUMN {name} {sql_type}")
+            con.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
     con.commit()
 
+_schema_ready = False
+
 def init_db():
+    """Create tables + run column migrations. Every helper calls this; only the first call per process does any work."""
+    global _schema_ready
+    if _schema_ready:
+        return
     with _conn() as con:
         con.execute("""
         CREATE TABLE IF NOT EXISTS attempts (
@@ -45,10 +62,89 @@ def init_db():
             checklist_score INTEGER,          -- 0-100, nullable
             checklist_json TEXT,              -- JSON string (items/evidence)
             customer_type TEXT,               -- optional
-            emotion_level INTEGER             -- optional
+            emotion_level INTEGER,            -- optional
+            eval_status TEXT,                 -- pending|running|done|failed (background evaluation)
+            rubric_version TEXT               -- evaluation.rubric_version() that produced the scores
         )
         """)
         _ensure_columns(con)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            attempt_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,              -- 'training' | 'exam'
+            status TEXT NOT NULL,            -- pending|running|done|failed
+            tries INTEGER NOT NULL DEFAULT 0,
+            next_run_at REAL NOT NULL,       -- epoch seconds (retry backoff)
+            last_error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            claimed_by TEXT,                 -- worker id (jobs.WORKER_ID) holding the job while running
+            lease_until REAL,                -- epoch seconds; renewed by the owner's heartbeat
+            payload TEXT                     -- JSON input for the job (progressive checklist parts), nullable
+        )
+        """)
+        _ensure_columns(con, "jobs", _JOB_COLUMNS)
+        con.execute("CREATE INDEX IF NOT EXISTS jobs_status_next ON jobs(status, next_run_at)")
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS eval_cache (
+            key TEXT PRIMARY KEY,            -- sha256 of (normalized input, prompt, model, params)
+            kind TEXT NOT NULL,              -- 'grade' | 'checklist' | 'exam_fused'
+            result_json TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            last_hit_at TEXT
+        )
+        """)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS regrades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            attempt_id INTEGER NOT NULL,
+            rubric_version TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            score INTEGER,
+            passed INTEGER,
+            summary TEXT,
+            strengths TEXT,
+            improvements TEXT,
+            checklist_score INTEGER,
+            checklist_json TEXT,
+            created_at TEXT NOT NULL,
+            UNIQUE(attempt_id, rubric_version)
+        )
+        """)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS calls (
+            call_id TEXT PRIMARY KEY,        -- coach_session call id issued by /session
+            user_email TEXT NOT NULL,
+            mode TEXT NOT NULL,              -- 'training' | 'exam'
+            level TEXT NOT NULL,
+            scenario_id TEXT,
+            started_at TEXT NOT NULL,
+            attempt_id INTEGER               -- set once the call was saved as an attempt
+        )
+        """)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS call_turns (
+            call_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,            -- line number in the browser transcript (append-only)
+            role TEXT NOT NULL,              -- 'AGENT' | 'CUSTOMER'
+            text TEXT NOT NULL,
+            created_at REAL NOT NULL,        -- epoch seconds
+            PRIMARY KEY(call_id, seq)
+        )
+        """)
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS regrade_runs (
+            run_id TEXT PRIMARY KEY,         -- defaults to the rubric version (see regrade.py)
+            last_id INTEGER NOT NULL,        -- every attempt id <= last_id has been handled
+            done INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        )
+        """)
+        con.commit()
+    _schema_ready = True
 
 def save_attempt(a: Dict[str, Any]) -> int:
     init_db()
@@ -58,9 +154,10 @@ def save_attempt(a: Dict[str, Any]) -> int:
             INSERT INTO attempts(
                 created_at,user_email,mode,level,transcript,
                 score,passed,summary,strengths,improvements,
-                checklist_score,checklist_json,customer_type,emotion_level
+                checklist_score,checklist_json,customer_type,emotion_level,eval_status,
+                rubric_version
             )
-            VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
         """, (
             created_at,
             a["user_email"],
@@ -76,6 +173,8 @@ def save_attempt(a: Dict[str, Any]) -> int:
             a.get("checklist_json", ""),
             a.get("customer_type", ""),
             a.get("emotion_level", None),
+            a.get("eval_status", None),
+            a.get("rubric_version", None),
         ))
         con.commit()
         return int(cur.lastrowid)
@@ -92,6 +191,20 @@ def list_attempts(limit: int = 200) -> List[Dict[str, Any]]:
         """, (limit,)).fetchall()
     return [dict(r) for r in rows]
 
+def list_checklist_attempts(limit: int = 1000) -> List[Dict[str, Any]]:
+    """Finished attempts that have a transcript and a checklist (newest first)."""
+    init_db()
+    with _conn() as con:
+        rows = con.execute("""
+            SELECT id, mode, transcript, checklist_score, checklist_json
+            FROM attempts
+            WHERE transcript != '' AND checklist_json != ''
+              AND COALESCE(eval_status, 'done') = 'done'
+            ORDER BY id DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+    return [dict(r) for r in rows]
+
 def get_attempt(attempt_id: int) -> Optional[Dict[str, Any]]:
     init_db()
     with _conn() as con:
@@ -101,3 +214,317 @@ def get_attempt(attempt_id: int) -> Optional[Dict[str, Any]]:
             WHERE id = ?
         """, (attempt_id,)).fetchone()
     return dict(row) if row else None
+
+# Columns a background evaluation may fill in on an existing attempt
+_RESULT_COLUMNS = {
+    "score", "passed", "summary", "strengths", "improvements",
+    "checklist_score", "checklist_json", "eval_status", "rubric_version",
+}
+
+def update_attempt(attempt_id: int, fields: Dict[str, Any]) -> None:
+    cols = [k for k in fields if k in _RESULT_COLUMNS]
+    if not cols:
+        return
+    init_db()
+    with _conn() as con:
+        con.execute(
+            f"UPDATE attempts SET {', '.join(f'{c} = ?' for c in cols)} WHERE id = ?",
+            [fields[c] for c in cols] + [attempt_id],
+        )
+        con.commit()
+
+# -------------------------
+# Evaluation jobs (durable queue; see jobs.py)
+# -------------------------
+def _now_iso() -> str:
+    return datetime.utcnow().isoformat(timespec="seconds") + "Z"
+
+def enqueue_job(attempt_id: int, kind: str, payload: Optional[Dict[str, Any]] = None) -> int:
+    init_db()
+    now = _now_iso()
+    with _conn() as con:
+        cur = con.execute("""
+            INSERT INTO jobs(attempt_id, kind, status, tries, next_run_at, created_at, updated_at, payload)
+            VALUES(?, ?, 'pending', 0, ?, ?, ?, ?)
+        """, (attempt_id, kind, time.time(), now, now,
+              json.dumps(payload, ensure_ascii=False) if payload is not None else None))
+        con.commit()
+        return int(cur.lastrowid)
+
+def claim_next_job(worker_id: str, lease_sec: float) -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the oldest due job for worker_id and return it (None if idle).
+    Due = pending and past next_run_at, or running under a lease nobody renewed in time
+    (its worker died). The lease lasts lease_sec unless renew_job_lease() extends it.
+    """
+    init_db()
+    now = time.time()
+    with _conn() as con:
+        con.execute("BEGIN IMMEDIATE")
+        row = con.execute("""
+            SELECT * FROM jobs
+            WHERE (status = 'pending' AND next_run_at <= ?)
+               OR (status = 'running' AND COALESCE(lease_until, 0) < ?)
+            ORDER BY next_run_at, id
+            LIMIT 1
+        """, (now, now)).fetchone()
+        if not row:
+            con.rollback()
+            return None
+        con.execute("""
+            UPDATE jobs SET status = 'running', tries = tries + 1, claimed_by = ?, lease_until = ?, updated_at = ?
+            WHERE id = ?
+        """, (worker_id, now + lease_sec, _now_iso(), row["id"]))
+        con.commit()
+    job = dict(row)
+    job["tries"] += 1
+    job["status"] = "running"
+    job["claimed_by"] = worker_id
+    return job
+
+def renew_job_lease(job_id: int, worker_id: str, lease_sec: float) -> bool:
+    """Heartbeat: extend our lease. False = the job is no longer ours (lease expired and was taken)."""
+    init_db()
+    with _conn() as con:
+        cur = con.execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running' AND claimed_by = ?",
+            (time.time() + lease_sec, job_id, worker_id),
+        )
+        con.commit()
+        return cur.rowcount > 0
+
+def finish_job(job_id: int, worker_id: str, status: str = "done", error: str = "") -> bool:
+    """Close a job this worker holds; False if another worker owns it now (nothing written)."""
+    init_db()
+    with _conn() as con:
+        cur = con.execute("""
+            UPDATE jobs SET status = ?, last_error = ?, claimed_by = NULL, lease_until = NULL, updated_at = ?
+            WHERE id = ? AND claimed_by = ?
+        """, (status, error or None, _now_iso(), job_id, worker_id))
+        con.commit()
+        return cur.rowcount > 0
+
+def retry_job(job_id: int, worker_id: str, delay_sec: float, error: str) -> bool:
+    init_db()
+    with _conn() as con:
+        cur = con.execute("""
+            UPDATE jobs SET status = 'pending', next_run_at = ?, last_error = ?, claimed_by = NULL,
+                lease_until = NULL, updated_at = ?
+            WHERE id = ? AND claimed_by = ?
+        """, (time.time() + delay_sec, error, _now_iso(), job_id, worker_id))
+        con.commit()
+        return cur.rowcount > 0
+
+def requeue_expired_jobs() -> int:
+    """
+    Jobs left 'running' by a worker that died (lease expired, or rows from before leases)
+    go back to pending. Jobs another live process is running keep their lease.
+    """
+    init_db()
+    with _conn() as con:
+        cur = con.execute("""
+            UPDATE jobs SET status = 'pending', claimed_by = NULL, lease_until = NULL, updated_at = ?
+            WHERE status = 'running' AND COALESCE(lease_until, 0) < ?
+        """, (_now_iso(), time.time()))
+        con.commit()
+        return cur.rowcount
+
+def release_jobs(worker_id: str) -> int:
+    """Clean shutdown: hand this worker's running jobs back right away instead of waiting out the lease."""
+    init_db()
+    with _conn() as con:
+        cur = con.execute("""
+            UPDATE jobs SET status = 'pending', claimed_by = NULL, lease_until = NULL, updated_at = ?
+            WHERE status = 'running' AND claimed_by = ?
+        """, (_now_iso(), worker_id))
+        con.commit()
+        return cur.rowcount
+
+def next_job_due_in() -> Optional[float]:
+    """Seconds until a pending job is due or a running job's lease runs out (None = nothing queued)."""
+    init_db()
+    with _conn() as con:
+        row = con.execute("""
+            SELECT MIN(CASE WHEN status = 'pending' THEN next_run_at ELSE COALESCE(lease_until, 0) END) AS t
+            FROM jobs WHERE status IN ('pending', 'running')
+        """).fetchone()
+    if not row or row["t"] is None:
+        return None
+    return max(0.0, row["t"] - time.time())
+
+# -------------------------
+# Evaluation result cache (content-addressed; see evaluation._eval_cache_key)
+# -------------------------
+def get_cached_eval(key: str) -> Optional[Dict[str, Any]]:
+    init_db()
+    with _conn() as con:
+        row = con.execute("SELECT result_json FROM eval_cache WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        con.execute(
+            "UPDATE eval_cache SET hits = hits + 1, last_hit_at = ? WHERE key = ?",
+            (_now_iso(), key),
+        )
+        con.commit()
+    try:
+        return json.loads(row["result_json"])
+    except Exception:
+        return None
+
+def put_cached_eval(key: str, kind: str, result: Dict[str, Any], max_entries: int = 0) -> None:
+    """Store one result; with max_entries > 0, drop all but the max_entries most recently used."""
+    init_db()
+    with _conn() as con:
+        con.execute("""
+            INSERT OR REPLACE INTO eval_cache(key, kind, result_json, hits, created_at)
+            VALUES(?, ?, ?, 0, ?)
+        """, (key, kind, json.dumps(result, ensure_ascii=False), _now_iso()))
+        if max_entries > 0:
+            con.execute("""
+                DELETE FROM eval_cache WHERE key IN (
+                    SELECT key FROM eval_cache
+                    ORDER BY COALESCE(last_hit_at, created_at) DESC, rowid DESC
+                    LIMIT -1 OFFSET ?
+                )
+            """, (max_entries,))
+        con.commit()
+
+def eval_cache_stats() -> Dict[str, Any]:
+    init_db()
+    with _conn() as con:
+        row = con.execute("SELECT COUNT(*) AS n, COALESCE(SUM(hits), 0) AS hits FROM eval_cache").fetchone()
+    return {"entries": int(row["n"]), "hits": int(row["hits"])}
+
+# -------------------------
+# Bulk re-grading (regrade.py)
+# -------------------------
+def attempts_to_regrade(after_id: int, limit: int, rubric_version: str, mode: str = "") -> List[Dict[str, Any]]:
+    """
+    Keyset page of attempts with id > after_id that have no regrade for rubric_version yet.
+    Only the columns an evaluation needs are read, so pages stay small.
+    """
+    init_db()
+    sql = """
+        SELECT a.id, a.mode, a.transcript, a.customer_type, a.emotion_level
+        FROM attempts a
+        WHERE a.id > ?
+          AND a.mode IN ('training', 'exam')
+          AND COALESCE(a.transcript, '') != ''
+          AND NOT EXISTS (
+              SELECT 1 FROM regrades r WHERE r.attempt_id = a.id AND r.rubric_version = ?
+          )
+    """
+    params: List[Any] = [after_id, rubric_version]
+    if mode:
+        sql += " AND a.mode = ?"
+        params.append(mode)
+    sql += " ORDER BY a.id LIMIT ?"
+    params.append(limit)
+    with _conn() as con:
+        rows = con.execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
+
+def save_regrade(attempt_id: int, rubric_version: str, mode: str, fields: Dict[str, Any]) -> None:
+    init_db()
+    with _conn() as con:
+        con.execute("""
+            INSERT OR REPLACE INTO regrades(
+                attempt_id, rubric_version, mode,
+                score, passed, summary, strengths, improvements,
+                checklist_score, checklist_json, created_at
+            )
+            VALUES(?,?,?,?,?,?,?,?,?,?,?)
+        """, (
+            attempt_id, rubric_version, mode,
+            fields.get("score"), fields.get("passed"), fields.get("summary"),
+            fields.get("strengths"), fields.get("improvements"),
+            fields.get("checklist_score"), fields.get("checklist_json"),
+            _now_iso(),
+        ))
+        con.commit()
+
+def get_regrade_checkpoint(run_id: str) -> Optional[Dict[str, Any]]:
+    init_db()
+    with _conn() as con:
+        row = con.execute("SELECT * FROM regrade_runs WHERE run_id = ?", (run_id,)).fetchone()
+    return dict(row) if row else None
+
+def save_regrade_checkpoint(run_id: str, last_id: int, done: int, failed: int) -> None:
+    init_db()
+    with _conn() as con:
+        con.execute("""
+            INSERT INTO regrade_runs(run_id, last_id, done, failed, updated_at)
+            VALUES(?, ?, ?, ?, ?)
+            ON CONFLICT(run_id) DO UPDATE SET
+                last_id = excluded.last_id, done = excluded.done,
+                failed = excluded.failed, updated_at = excluded.updated_at
+        """, (run_id, last_id, done, failed, _now_iso()))
+        con.commit()
+
+# -------------------------
+# Server-side turn log (call_log.py)
+# -------------------------
+def save_calls(rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    init_db()
+    with _conn() as con:
+        con.executemany("""
+            INSERT OR IGNORE INTO calls(call_id, user_email, mode, level, scenario_id, started_at)
+            VALUES(:call_id, :user_email, :mode, :level, :scenario_id, :started_at)
+        """, rows)
+        con.commit()
+
+def append_call_turns(rows: List[tuple]) -> int:
+    """rows = (call_id, seq, role, text, created_at); a (call_id, seq) already stored is kept as is."""
+    if not rows:
+        return 0
+    init_db()
+    with _conn() as con:
+        before = con.total_changes
+        con.executemany(
+            "INSERT OR IGNORE INTO call_turns(call_id, seq, role, text, created_at) VALUES(?, ?, ?, ?, ?)",
+            rows,
+        )
+        con.commit()
+        return con.total_changes - before
+
+def get_call(call_id: str) -> Optional[Dict[str, Any]]:
+    init_db()
+    with _conn() as con:
+        row = con.execute("""
+            SELECT c.*, (SELECT COUNT(*) FROM call_turns t WHERE t.call_id = c.call_id) AS turns
+            FROM calls c WHERE c.call_id = ?
+        """, (call_id,)).fetchone()
+    return dict(row) if row else None
+
+def get_call_turns(call_id: str) -> List[Dict[str, Any]]:
+    init_db()
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT seq, role, text FROM call_turns WHERE call_id = ? ORDER BY seq",
+            (call_id,),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+def link_call_attempt(call_id: str, attempt_id: int) -> None:
+    init_db()
+    with _conn() as con:
+        con.execute("UPDATE calls SET attempt_id = ? WHERE call_id = ?", (attempt_id, call_id))
+        con.commit()
+
+def list_unfinished_calls(user_email: str, idle_sec: float, limit: int = 5) -> List[Dict[str, Any]]:
+    """Calls with turns but no attempt whose last turn is older than idle_sec (tab closed mid-call)."""
+    init_db()
+    with _conn() as con:
+        rows = con.execute("""
+            SELECT c.call_id, c.mode, c.level, c.scenario_id, c.started_at,
+                   COUNT(t.seq) AS turns, MAX(t.created_at) AS last_turn_at
+            FROM calls c JOIN call_turns t ON t.call_id = c.call_id
+            WHERE c.user_email = ? AND c.attempt_id IS NULL
+            GROUP BY c.call_id
+            HAVING MAX(t.created_at) < ?
+            ORDER BY last_turn_at DESC
+            LIMIT ?
+        """, (user_email, time.time() - idle_sec, limit)).fetchall()
+    return [dict(r) for r in rows]
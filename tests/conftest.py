@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules live at the repo root; keep the test database away from app.db
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("APP_DB_PATH", str(Path(tempfile.mkdtemp()) / "app.db"))
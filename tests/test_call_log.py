@@ -0,0 +1,37 @@
+import asyncio
+
+import call_log
+
+
+def test_call_log_append_resyncs_and_dedups():
+    async def run():
+        await call_log.open_call("delta-log", "a@x.com")
+        assert await call_log.append("delta-log", 0, ["AGENT: hi", "CUSTOMER: hello"]) == (2, True)
+        assert await call_log.append("delta-log", 1, ["CUSTOMER: hello", "AGENT: how can I help?"]) == (3, True)
+        assert await call_log.append("delta-log", 7, ["AGENT: lost"]) == (3, False)
+        assert await call_log.append("nope", 0, ["AGENT: hi"]) == (0, False)
+
+        text, n = await call_log.transcript("delta-log")
+        assert n == 3
+        assert text == "AGENT: hi\nCUSTOMER: hello\nAGENT: how can I help?"
+        assert await call_log.owner("delta-log") == "a@x.com"
+
+    asyncio.run(run())
+
+
+def test_batched_writes_stay_off_the_event_loop_and_reload_from_disk():
+    async def run():
+        await call_log.start_flusher()
+        try:
+            await call_log.open_call("batched-log", "a@x.com")
+            assert await call_log.append("batched-log", 0, ["AGENT: hi"]) == (1, True)
+            assert call_log.stats()["pending"] == 1        # waiting for the flusher
+            call_log._CALLS.pop("batched-log")             # evicted: reload from sqlite
+            assert await call_log.owner("batched-log") == "a@x.com"
+            assert await call_log.append("batched-log", 1, ["CUSTOMER: yo"]) == (2, True)
+        finally:
+            await call_log.stop_flusher()
+        assert call_log.stats()["pending"] == 0
+        assert await call_log.transcript("batched-log") == ("AGENT: hi\nCUSTOMER: yo", 2)
+
+    asyncio.run(run())
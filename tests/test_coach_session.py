@@ -0,0 +1,57 @@
+import random
+
+from coach_session import SESSIONS, CoachSession, find_session, get_session, open_session
+
+
+def test_get_session_never_takes_over_another_users_call():
+    mine = open_session("a@x.com", level="easy")
+    mine.record_tip("empathy", "Say sorry.")
+    mine.append_lines(0, ["AGENT: hello"])
+
+    theirs = get_session(mine.call_id, "b@x.com")
+
+    assert theirs is not mine
+    assert theirs.user_email == "b@x.com"
+    assert SESSIONS.get(mine.call_id) is mine
+    assert mine.shown_tags == {"empathy"} and mine.next_seq == 1
+    assert get_session(mine.call_id, "b@x.com") is theirs
+    assert get_session(mine.call_id, "a@x.com") is mine
+    assert find_session(mine.call_id, "b@x.com") is None
+
+
+def test_unissued_ids_share_the_users_fallback_session():
+    size = len(SESSIONS)
+    sessions = {id(get_session(f"made-up-{i}", "c@x.com")) for i in range(50)}
+    assert len(sessions) == 1 and len(SESSIONS) <= size + 1
+    assert get_session("", "c@x.com") is get_session("made-up-0", "c@x.com")
+    assert get_session("", "c@x.com") is not get_session("", "d@x.com")
+    assert find_session("made-up-0", "c@x.com") is None
+
+
+def _call_lines(n):
+    return [f"{'AGENT' if i % 2 else 'CUSTOMER'}: line {i}" for i in range(n)]
+
+
+def test_coach_session_skips_overlap_and_rejects_gaps():
+    s = CoachSession("delta-1")
+    assert s.append_lines(0, ["AGENT: a", "CUSTOMER: b"])
+    assert s.append_lines(1, ["CUSTOMER: b", "AGENT: c"])      # retried tail
+    assert s.append_lines(0, ["AGENT: a"])                     # fully stale
+    assert not s.append_lines(5, ["AGENT: e"])                 # gap: resync from next_seq
+    assert s.next_seq == 3
+    assert s.transcript() == "AGENT: a\nCUSTOMER: b\nAGENT: c"
+
+
+def test_coach_session_rebuilds_the_call_from_random_deltas():
+    lines = _call_lines(60)
+    rng = random.Random(5)
+    for _ in range(50):
+        s = CoachSession("delta-2")
+        while s.next_seq < len(lines):
+            start = max(0, s.next_seq - rng.randint(0, 3))       # retried overlap
+            if rng.random() < 0.2:
+                start = s.next_seq + rng.randint(1, 3)           # a delta got lost
+            end = min(len(lines), start + rng.randint(1, 6))
+            # On a gap the browser resends from next_seq, which the loop does next
+            s.append_lines(start, lines[start:end])
+        assert s.transcript() == "\n".join(lines)
@@ -0,0 +1,28 @@
+import asyncio
+
+import evaluation
+import storage
+
+
+def test_put_prunes_to_the_most_recently_used_entries():
+    for i in range(5):
+        storage.put_cached_eval(f"prune-{i}", "grade", {"score": i}, max_entries=3)
+    keys = {f"prune-{i}" for i in range(5) if storage.get_cached_eval(f"prune-{i}") is not None}
+    assert keys == {"prune-2", "prune-3", "prune-4"}
+
+
+def test_async_cache_helpers_round_trip():
+    async def run():
+        key = evaluation._eval_cache_key("grade", "sys", "AGENT: hi", "m", max_output_tokens=1)
+        assert await evaluation._eval_cache_get(key) is None
+        await evaluation._eval_cache_put(key, "grade", {"score": 80})
+        return await evaluation._eval_cache_get(key)
+
+    assert asyncio.run(run()) == {"score": 80}
+
+
+def test_cache_key_depends_on_prompt_and_model():
+    k = evaluation._eval_cache_key("grade", "sys", "AGENT: hi", "m")
+    assert k == evaluation._eval_cache_key("grade", "sys", "AGENT: hi", "m")
+    assert k != evaluation._eval_cache_key("grade", "sys2", "AGENT: hi", "m")
+    assert k != evaluation._eval_cache_key("grade", "sys", "AGENT: hi", "m2")
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+import evaluation
+
+
+def _unparsable(monkeypatch):
+    async def fake_text(key, system_prompt, user_prompt, model, max_output_tokens):
+        return "Sorry, I can't grade this call."
+
+    monkeypatch.setattr(evaluation, "aclient", object())
+    monkeypatch.setattr(evaluation, "_responses_text_shared", fake_text)
+
+
+def test_unparsable_output_raises_when_strict(monkeypatch):
+    _unparsable(monkeypatch)
+    with pytest.raises(evaluation.EvaluationError):
+        asyncio.run(evaluation.evaluate_checklist("AGENT: hi, my name is Sam\nCUSTOMER: unparsable-1", strict=True))
+
+
+def test_unparsable_output_is_never_passed_off_as_the_local_estimate(monkeypatch):
+    _unparsable(monkeypatch)
+    report = asyncio.run(evaluation.evaluate_checklist("AGENT: hi, my name is Sam\nCUSTOMER: unparsable-2"))
+    assert report["checklist_score"] == 0 and report["items"] == []
+    assert report.get("source") != "local"
+    assert report["improvements"] == ["Could not parse checklist output."]
@@ -0,0 +1,79 @@
+import asyncio
+import sqlite3
+
+import jobs
+import storage
+
+
+def _job(kind="training"):
+    attempt_id = storage.save_attempt({"user_email": "a@x.com", "mode": kind, "level": "easy", "transcript": "AGENT: hi"})
+    return storage.enqueue_job(attempt_id, kind)
+
+
+def _drain():
+    while storage.claim_next_job("drain", 3600):
+        pass
+
+
+def test_live_lease_is_not_requeued_or_taken_over():
+    _drain()
+    job_id = _job()
+    job = storage.claim_next_job("proc-a", 60)
+    assert job["id"] == job_id and job["claimed_by"] == "proc-a"
+
+    # A second process starting up must leave proc-a's running job alone
+    assert storage.requeue_expired_jobs() == 0
+    assert storage.claim_next_job("proc-b", 60) is None
+    assert storage.renew_job_lease(job_id, "proc-a", 60)
+    assert storage.finish_job(job_id, "proc-a")
+
+
+def test_expired_lease_is_taken_over_and_the_old_owner_cannot_write():
+    _drain()
+    job_id = _job()
+    storage.claim_next_job("proc-a", -1)           # lease already lapsed: proc-a died
+    job = storage.claim_next_job("proc-b", 60)
+    assert job["id"] == job_id and job["tries"] == 2
+
+    assert not storage.renew_job_lease(job_id, "proc-a", 60)
+    assert not storage.finish_job(job_id, "proc-a")
+    assert not storage.retry_job(job_id, "proc-a", 1, "late")
+    assert storage.finish_job(job_id, "proc-b")
+
+
+def test_startup_requeues_only_expired_and_shutdown_releases_own_jobs():
+    _drain()
+    live, dead = _job(), _job()
+    storage.claim_next_job("live", 60)
+    storage.claim_next_job("dead", -1)
+    assert storage.requeue_expired_jobs() == 1
+    assert storage.claim_next_job("new", 60)["id"] == dead
+
+    assert storage.release_jobs("live") == 1
+    assert storage.claim_next_job("new", 60)["id"] == live
+
+
+def test_worker_survives_queue_errors(monkeypatch):
+    calls = []
+
+    def flaky_claim(worker_id, lease_sec):
+        calls.append(worker_id)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return None
+
+    monkeypatch.setattr(jobs, "claim_next_job", flaky_claim)
+    monkeypatch.setattr(jobs, "next_job_due_in", lambda: 0.01)
+    monkeypatch.setattr(jobs, "QUEUE_ERROR_SLEEP_SEC", 0.0)
+
+    async def run():
+        jobs._wake = asyncio.Event()
+        worker = asyncio.create_task(jobs._worker(0))
+        while len(calls) < 3 and not worker.done():
+            await asyncio.sleep(0.01)
+        alive = not worker.done()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        return alive
+
+    assert asyncio.run(run())
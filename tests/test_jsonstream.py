@@ -0,0 +1,62 @@
+import json
+import random
+
+from jsonstream import JsonObjectStream, parse_first_object
+
+OBJ = {
+    "score": 87,
+    "pass": True,
+    "summary": 'Clear "opening", good pace \\ tone. Café ☕ é\n2nd line',
+    "strengths": ["empathy", "next steps {in braces} and [brackets]"],
+    "checklist": {"items": [{"id": "close", "status": "done"}], "ratio": -0.5e-3},
+    "note": None,
+}
+
+
+def _chunks(text, rng):
+    out, i = [], 0
+    while i < len(text):
+        n = rng.choice((1, 1, 2, 3, 5, 8, 40))
+        out.append(text[i:i + n])
+        i += n
+    return out
+
+
+def _variants():
+    body = json.dumps(OBJ)
+    yield body
+    yield json.dumps(OBJ, indent=2)
+    yield json.dumps(OBJ, ensure_ascii=False)
+    yield "Sure! {see below}\n```json\n" + body + "\n```\nTrailing prose {\"x\": 1}"
+
+
+def test_random_chunk_splits_give_the_same_fields_in_order():
+    rng = random.Random(18)
+    for text in _variants():
+        for _ in range(200):
+            p = JsonObjectStream()
+            seen = []
+            for chunk in _chunks(text, rng):
+                seen.extend(p.feed(chunk))
+            assert p.done
+            assert dict(seen) == OBJ
+            assert [k for k, _ in seen] == list(OBJ)
+            assert p.result() == OBJ and p.errors == 0
+
+
+def test_fields_arrive_as_soon_as_they_are_complete():
+    p = JsonObjectStream()
+    assert p.feed('{"score": 9') == []
+    assert p.feed('1, "pass": tr') == [("score", 91)]
+    assert p.feed('ue, "summary": "Go') == [("pass", True)]
+    assert p.partial("summary") == "Go"
+    assert p.feed('od \\u00e') == []
+    assert p.partial("summary") == "Good "
+    assert p.feed('9"}') == [("summary", "Good é")]
+    assert p.done
+
+
+def test_parse_first_object():
+    assert parse_first_object('x {"a": [1, {"b": "}"}]} y') == {"a": [1, {"b": "}"}]}
+    assert parse_first_object('{"a": 1') is None
+    assert parse_first_object("no json here") is None
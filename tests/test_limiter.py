@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+import evaluation
+from limiter import COACH, GRADING, REGRADE, SESSION, LimiterFull, PriorityLimiter
+
+
+def _limiter(max_concurrent=1, max_queue=10, reserved=0):
+    # per_minute=0 turns the token bucket off: only the concurrency cap applies
+    return PriorityLimiter(max_concurrent, per_minute=0, burst=1, max_queue=max_queue, reserved=reserved)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        lim = _limiter()
+        order = []
+
+        async def job(p, name):
+            async with lim.slot(p):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await lim.acquire(GRADING)              # hold the only slot
+        tasks = [asyncio.create_task(job(p, name)) for p, name in (
+            (REGRADE, "regrade"), (GRADING, "grading"), (COACH, "coach-1"),
+            (SESSION, "session"), (COACH, "coach-2"),
+        )]
+        await _settle()
+        assert lim.stats()["queued"] == 5
+        lim.release()
+        await asyncio.gather(*tasks)
+        assert lim.in_flight == 0
+        return order
+
+    assert asyncio.run(run()) == ["coach-1", "coach-2", "session", "grading", "regrade"]
+
+
+def test_reserved_slots_stay_free_for_live_requests():
+    async def run():
+        lim = _limiter(max_concurrent=2, reserved=1)
+        await lim.acquire(GRADING)
+        waiting = asyncio.create_task(lim.acquire(REGRADE))
+        await _settle()
+        assert not waiting.done()               # background classes only get 1 of 2 slots
+        await asyncio.wait_for(lim.acquire(COACH), 1)
+        assert lim.in_flight == 2
+        lim.release()
+        lim.release()
+        await asyncio.wait_for(waiting, 1)
+        assert lim.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_full_queue_rejects_or_evicts_the_least_urgent():
+    async def run():
+        lim = _limiter(max_queue=2)
+        await lim.acquire(GRADING)
+        first = asyncio.create_task(lim.acquire(GRADING))
+        second = asyncio.create_task(lim.acquire(GRADING))
+        await _settle()
+
+        with pytest.raises(LimiterFull):        # nothing less urgent to displace
+            await lim.acquire(REGRADE)
+
+        coach = asyncio.create_task(lim.acquire(COACH))
+        await _settle()
+        with pytest.raises(LimiterFull) as exc:  # the newest GRADING waiter made room
+            await second
+        assert exc.value.priority == GRADING
+        assert not first.done() and not coach.done()
+
+        lim.release()
+        await asyncio.wait_for(coach, 1)
+        assert not first.done()
+        st = lim.stats()
+        assert st["grading"]["rejected"] == 1 and st["regrade"]["rejected"] == 1
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        lim = _limiter()
+        await lim.acquire(GRADING)
+        waiter = asyncio.create_task(lim.acquire(GRADING))
+        await _settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        lim.release()
+        assert lim.in_flight == 0
+        st = lim.stats()
+        assert st["queued"] == 0 and st["grading"]["cancelled"] == 1
+        await asyncio.wait_for(lim.acquire(REGRADE), 1)
+
+    asyncio.run(run())
+
+
+def test_full_queue_reaches_the_caller_instead_of_an_empty_reply(monkeypatch):
+    class Responses:
+        async def create(self, **kwargs):
+            raise LimiterFull(GRADING)
+
+    class Client:
+        responses = Responses()
+
+    monkeypatch.setattr(evaluation, "aclient", Client())
+    with pytest.raises(LimiterFull):
+        asyncio.run(evaluation._responses_text("sys", "user", "m", 10))
+    # Non-strict split grading still raises, so the job retries instead of storing placeholders
+    with pytest.raises(LimiterFull):
+        asyncio.run(evaluation.grade_exam_and_checklist("AGENT: hi\nCUSTOMER: limiter-full", mode="split"))
+    tip = asyncio.run(evaluation.coach_tips("AGENT: um um I I think maybe", {"trigger": "fluency"}))
+    assert tip["should_intervene"] is False
@@ -0,0 +1,42 @@
+from evaluation import merge_checklists
+
+
+def _item(item_id, status, evidence=""):
+    return {"id": item_id, "title": item_id.title(), "status": status, "evidence": evidence, "note": ""}
+
+
+def test_each_item_keeps_its_best_status_and_that_evidence():
+    early = {
+        "items": [_item("opening", "done", "hi, Sam here"), _item("empathy", "missing"), _item("close", "partial", "ok")],
+        "highlights": ["warm opening"],
+        "improvements": ["show empathy", "summarize"],
+        "next_time_say": ["I'm sorry to hear that."],
+    }
+    late = {
+        "items": [_item("opening", "missing"), _item("empathy", "partial", "that sounds hard"),
+                  _item("close", "partial", "later"), _item("feedback", "done", "survey")],
+        "highlights": ["calm tone", "warm opening"],
+        "improvements": ["summarize"],
+        "next_time_say": ["To summarize…"],
+    }
+    merged = merge_checklists([early, late])
+
+    by_id = {it["id"]: it for it in merged["items"]}
+    assert by_id["opening"]["status"] == "done" and by_id["opening"]["evidence"] == "hi, Sam here"
+    assert by_id["empathy"]["status"] == "partial" and by_id["empathy"]["evidence"] == "that sounds hard"
+    assert by_id["close"]["evidence"] == "ok"           # a tie keeps the earlier segment
+    assert by_id["feedback"]["status"] == "done"
+    # done 2 + partial 2 * 0.5 over 4 items
+    assert merged["checklist_score"] == 75
+    # Latest segment first, no duplicates
+    assert merged["highlights"] == ["calm tone", "warm opening"]
+    assert merged["improvements"] == ["summarize", "show empathy"]
+    assert merged["next_time_say"] == ["To summarize…", "I'm sorry to hear that."]
+
+
+def test_merge_caps_lists_and_handles_empty_parts():
+    parts = [{"improvements": [f"tip {i}" for i in range(5)]}, {"improvements": [f"tip {i}" for i in range(5, 10)]}, {}]
+    merged = merge_checklists(parts)
+    assert merged["items"] == [] and merged["checklist_score"] == 0
+    assert merged["improvements"] == ["tip 5", "tip 6", "tip 7", "tip 8", "tip 9", "tip 0"]
+    assert merge_checklists([])["highlights"] == []
@@ -0,0 +1,39 @@
+import asyncio
+
+import httpx
+import pytest
+
+import openai_realtime
+
+
+def _mint(monkeypatch, payload):
+    sent = {}
+
+    async def fake_post(url, **kwargs):
+        sent["url"], sent["json"] = url, kwargs["json"]
+        if isinstance(payload, str):
+            return httpx.Response(200, text=payload)
+        return httpx.Response(200, json=payload)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(openai_realtime, "_post", fake_post)
+    return asyncio.run(openai_realtime.create_client_secret("Be a customer.")), sent
+
+
+def test_current_response_shape(monkeypatch):
+    secret, sent = _mint(monkeypatch, {"value": "ek_1", "expires_at": 1700000060, "session": {}})
+    assert secret == {"value": "ek_1", "expires_at": 1700000060}
+    assert sent["url"] == openai_realtime.REALTIME_CLIENT_SECRETS_URL
+    assert sent["json"]["expires_after"]["seconds"] == openai_realtime.REALTIME_TOKEN_TTL_SEC
+    assert sent["json"]["session"] == openai_realtime.session_config("Be a customer.")
+
+
+def test_nested_client_secret_shape(monkeypatch):
+    secret, _ = _mint(monkeypatch, {"id": "sess_1", "client_secret": {"value": "ek_2", "expires_at": 5}})
+    assert secret == {"value": "ek_2", "expires_at": 5}
+
+
+@pytest.mark.parametrize("payload", [{"expires_at": 5}, {"client_secret": {"value": ""}}, "<html>bad gateway</html>"])
+def test_unusable_responses_raise(monkeypatch, payload):
+    with pytest.raises(RuntimeError):
+        _mint(monkeypatch, payload)
@@ -0,0 +1,76 @@
+import random
+import re
+
+from phrases import MATCHER, fingerprint, tokenize
+
+# The checklist regexes ScriptState used before phrases.PhraseMatcher (applied to the lowercased line)
+LEGACY_CUES = {
+    "opening_intro": r"\b(my name is|this is)\b",
+    "opening_org": r"\b(team|support|from|company)\b",
+    "opening_help": r"\bhow can i help\b",
+    "identification": r"\b(name|last\s*(4|four)|id|phone|phone number|email)\b",
+    "empathy": r"\b(i understand|i'm sorry|sorry to hear|that sounds|i can imagine|i appreciate)\b",
+    "restate": r"\b(just to confirm|to confirm|to make sure i understand|if i understand|so you('re| are))\b",
+    "expectations": r"\b(next step|what i('ll| will) do|within|today|tomorrow|minutes|hours|by (the end|eod))\b",
+    "close": r"\b(to summarize|just to summarize|summary|recap)\b",
+    "feedback": r"\b(survey|feedback|rate|rating)\b",
+    "near_closing": r"\b(anything else|goodbye|bye|thank you for calling|have a (good|nice) day)\b",
+    "question": r"\b(can you|could you|what|when|where|which|how)\b",
+}
+
+
+def legacy_cues(line: str) -> set:
+    a = line.lower()
+    found = {cat for cat, rx in LEGACY_CUES.items() if re.search(rx, a)}
+    if "?" in a:
+        found.add("question")
+    return found
+
+
+def matcher_cues(line: str) -> set:
+    return set(MATCHER.scan(line)) & set(LEGACY_CUES)
+
+
+CONTRACTIONS = [
+    "AGENT: What's your account email?",
+    "AGENT: How's the connection today's morning?",
+    "AGENT: Name's Sam, I'm from the support team. How can I help?",
+    "AGENT: I'm sorry, that's frustrating. What's the phone number on file?",
+    "AGENT: So you're saying the bill's wrong. Here's what I'll do within 2 hours.",
+    "AGENT: Today's fix: we'll reset it by EOD, it won't take minutes.",
+    "AGENT: Where's the router? Which one's blinking?",
+    "AGENT: Could you read me the last4? Your ID's on the card.",
+    "AGENT: Let's recap: it's fixed. Anything else? Here's a survey, you'll rate us.",
+    "AGENT: It's been a pleasure, goodbye! Have a nice day.",
+]
+
+
+def test_contractions_match_legacy_regexes():
+    for line in CONTRACTIONS:
+        assert matcher_cues(line) == legacy_cues(line), line
+
+
+def test_randomized_utterances_match_legacy_regexes():
+    words = (
+        "what's how's name's today's i'm you're we'll i'll it's that's let's here's where's "
+        "my name is this is from team support company how can i help last 4 four last4 id phone email "
+        "i understand sorry to hear that sounds can imagine appreciate just to confirm make sure if "
+        "so are next step what will do within tomorrow minutes hours by the end eod summarize summary "
+        "recap survey feedback rate rating anything else goodbye bye thank you for calling have a good "
+        "nice day could when which ? , . ! likely identity named rates"
+    ).split()
+    rng = random.Random(7)
+    for _ in range(3000):
+        line = "AGENT: " + " ".join(rng.choice(words) for _ in range(rng.randint(1, 14)))
+        assert matcher_cues(line) == legacy_cues(line), line
+
+
+def test_whole_words_only():
+    assert "filler" not in MATCHER.scan("That's likely.")
+    assert MATCHER.scan("um, I I think so")["stutter"] == 1
+    assert MATCHER.scan("um, I I think so")["hedge"] == 1
+
+
+def test_tokenize_and_fingerprint():
+    assert tokenize("What’s up?") == ["what", "s", "up", "?"]
+    assert fingerprint("Um, I I think   so.") == fingerprint("i think so")
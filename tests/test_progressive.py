@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+import progressive
+import storage
+from coach_session import CoachSession
+
+
+def _part(item_id, status):
+    return {"items": [{"id": item_id, "title": item_id, "status": status, "evidence": "", "note": ""}]}
+
+
+def test_snapshot_hands_the_unscored_tail_to_the_job():
+    s = CoachSession("prog-1")
+    s.append_lines(0, [f"AGENT: line {i}" for i in range(8)])
+    s.checklist = progressive.ProgressiveChecklist()
+    s.checklist.parts, s.checklist.covered_to = [_part("opening", "done")], 6
+
+    snap = progressive.snapshot(s, s.transcript())
+    assert snap["segment"] == ["AGENT: line 6", "AGENT: line 7"]
+    assert snap["context"] == [f"AGENT: line {i}" for i in range(2, 6)]
+    assert progressive.snapshot(s, "AGENT: something else") is None
+
+    job_id = storage.enqueue_job(1, "training", snap)
+    row = storage._conn().execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    assert json.loads(row["payload"]) == snap
+
+
+def test_finish_merges_the_tail_or_gives_up(monkeypatch):
+    async def tail_ok(context, segment):
+        return _part("close", "done")
+
+    async def tail_failed(context, segment):
+        return None
+
+    payload = {"parts": [_part("opening", "done")], "context": [], "segment": ["AGENT: bye"]}
+    monkeypatch.setattr(progressive, "evaluate_checklist_segment", tail_ok)
+    report = asyncio.run(progressive.finish(payload))
+    assert [it["id"] for it in report["items"]] == ["opening", "close"]
+    assert report["checklist_score"] == 100
+
+    monkeypatch.setattr(progressive, "evaluate_checklist_segment", tail_failed)
+    assert asyncio.run(progressive.finish(payload)) is None
+    assert asyncio.run(progressive.finish({"parts": [], "segment": ["AGENT: hi"]})) is None
@@ -0,0 +1,7 @@
+from prompts import CHECKLIST_SYSTEM_PROMPT, EXAM_FUSED_PROMPT, GRADER_RUBRIC
+
+
+def test_fused_prompt_embeds_both_rubrics_verbatim():
+    assert GRADER_RUBRIC in EXAM_FUSED_PROMPT
+    assert CHECKLIST_SYSTEM_PROMPT in EXAM_FUSED_PROMPT
+    assert EXAM_FUSED_PROMPT.index(GRADER_RUBRIC) < EXAM_FUSED_PROMPT.index(CHECKLIST_SYSTEM_PROMPT)
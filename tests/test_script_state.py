@@ -0,0 +1,82 @@
+import random
+
+from coach_session import CoachSession
+from script_state import ScriptState
+from test_phrases import legacy_cues
+
+UTTERANCES = [
+    "AGENT: Hi, my name is Sam from the support team. How can I help?",
+    "AGENT: Hello, this is Ana.",
+    "AGENT: How can I help you today?",
+    "AGENT: Could I get the last 4 of your card?",
+    "AGENT: I'm sorry to hear that.",
+    "AGENT: Just to confirm, you're being charged twice?",
+    "AGENT: What I'll do is refund it within 2 hours.",
+    "AGENT: Let me recap what we did.",
+    "AGENT: Anything else? You'll get a short survey.",
+    "AGENT: Thanks, goodbye!",
+    "AGENT: Okay.",
+    "CUSTOMER: My internet is down again.",
+    "CUSTOMER: Yes, that's right.",
+    "customer: lowercase role",
+    "Some untagged line",
+    "",
+]
+
+
+def legacy_state(transcript: str) -> dict:
+    """The whole-transcript regex scan ScriptState replaced (the old evaluation._script_state)."""
+    lines = [ln.strip() for ln in transcript.splitlines() if ln.strip()]
+    cues = set()
+    for ln in lines:
+        if ln.upper().startswith("AGENT:"):
+            cues |= legacy_cues(ln)
+    has_customer = "CUSTOMER:" in transcript.upper()
+    return {
+        "opening_done": {"opening_intro", "opening_org", "opening_help"} <= cues,
+        "identification_done": "identification" in cues,
+        "empathy_done": "empathy" in cues,
+        "clarify_done": has_customer and "question" in cues,
+        "restate_done": "restate" in cues,
+        "expectations_done": "expectations" in cues,
+        "close_done": "close" in cues,
+        "feedback_done": "feedback" in cues,
+        "near_closing": "near_closing" in cues,
+        "has_customer": has_customer,
+    }
+
+
+def test_incremental_state_matches_a_full_rescan():
+    rng = random.Random(11)
+    for _ in range(300):
+        lines = [rng.choice(UTTERANCES) for _ in range(rng.randint(1, 25))]
+        st = ScriptState()
+        for i, ln in enumerate(lines):
+            st.feed(ln)
+            prefix = "\n".join(lines[:i + 1])
+            full = ScriptState.from_transcript(prefix)
+            assert st.as_dict() == full.as_dict() == legacy_state(prefix), prefix
+            assert st.next_missing_step() == full.next_missing_step()
+
+
+def test_coach_session_state_follows_deltas():
+    rng = random.Random(3)
+    lines = [rng.choice(UTTERANCES) for _ in range(40)]
+    s = CoachSession("script-state")
+    i = 0
+    while i < len(lines):
+        n = rng.randint(1, 5)
+        s.append_lines(max(0, i - 1), lines[max(0, i - 1):i + n])   # overlapping retries
+        i += n
+    assert s.script.as_dict() == ScriptState.from_transcript("\n".join(lines)).as_dict()
+
+
+def test_next_missing_step_order():
+    st = ScriptState.from_transcript("AGENT: Hi, my name is Sam from support. How can I help?")
+    assert st.next_missing_step() is None
+    st.feed("CUSTOMER: It broke.")
+    assert st.next_missing_step() == "empathy"
+    for ln in ("AGENT: I'm sorry. What happened?", "AGENT: Just to confirm, it broke?",
+               "AGENT: Next step: a refund today.", "AGENT: Anything else?"):
+        st.feed(ln)
+    assert st.next_missing_step() == "close"
@@ -0,0 +1,56 @@
+from ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_insert_ttl_sweeps_entries_behind_a_recently_read_head():
+    clock = Clock()
+    c = TTLCache(100, 10, clock=clock)
+    c.put("a", 1)
+    clock.t = 5
+    c.put("b", 2)
+    clock.t = 6
+    assert c.get("a") == 1          # "a" is now most recently used, but still stored first
+    clock.t = 12
+    c.put("c", 3)                   # a (t=0) is past the TTL, b (t=5) is not
+    assert len(c) == 2 and "b" in c and c.stats()["expirations"] == 1
+
+
+def test_insert_ttl_hits_still_evict_least_recently_used():
+    clock = Clock()
+    c = TTLCache(2, 60, clock=clock)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1
+    c.put("c", 3)
+    assert "a" in c and "b" not in c and c.stats()["evictions"] == 1
+    clock.t = 61                    # the hit did not renew "a"'s insert-time TTL
+    assert c.get("a") is None
+
+
+def test_refresh_on_get_is_an_idle_timeout():
+    clock = Clock()
+    c = TTLCache(100, 10, refresh_on_get=True, clock=clock)
+    c.put("a", 1)
+    c.put("b", 2)
+    clock.t = 8
+    assert c.get("a") == 1
+    clock.t = 15
+    c.put("c", 3)
+    assert "a" in c and "b" not in c and len(c) == 2
+
+
+def test_size_bound():
+    clock = Clock()
+    c = TTLCache(2, 0, refresh_on_get=True, clock=clock)
+    c.put(1, 1)
+    c.put(2, 2)
+    c.get(1)
+    c.put(3, 3)
+    assert 1 in c and 2 not in c and c.stats()["evictions"] == 1
@@ -0,0 +1,118 @@
+# ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Small size-bounded LRU with time-to-live eviction.
+
+    - max_size: least recently used entries are dropped past this size.
+    - ttl_sec: entries older than this are treated as missing and removed lazily.
+    - refresh_on_get: if True the TTL is an idle timeout (every hit renews it),
+      otherwise it counts from the moment the value was stored.
+
+    Every hit makes the entry most recently used. Expiry order is kept apart from the
+    LRU order (_stamps, oldest timestamp first), so _sweep never has to scan past a
+    recently read entry that was stored long ago.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_sec: float,
+        refresh_on_get: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max(1, int(max_size))
+        self.ttl_sec = float(ttl_sec)
+        self.refresh_on_get = refresh_on_get
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()    # LRU order
+        self._stamps: "OrderedDict[Hashable, float]" = OrderedDict()  # timestamp order
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, stamp: float, now: float) -> bool:
+        return self.ttl_sec > 0 and now - stamp > self.ttl_sec
+
+    def _sweep(self, now: float) -> None:
+        # _stamps is ordered by timestamp (oldest at the front); stop at the first live one.
+        while self._stamps:
+            key, stamp = next(iter(self._stamps.items()))
+            if not self._expired(stamp, now):
+                break
+            del self._stamps[key]
+            del self._data[key]
+            self.expirations += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            stamp, value = entry
+            if self._expired(stamp, now):
+                del self._data[key]
+                del self._stamps[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            if self.refresh_on_get:
+                self._data[key] = (now, value)
+                self._stamps[key] = now
+                self._stamps.move_to_end(key)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        now = self._clock()
+        with self._lock:
+            self._data[key] = (now, value)
+            self._data.move_to_end(key)
+            self._stamps[key] = now
+            self._stamps.move_to_end(key)
+            self._sweep(now)
+            while len(self._data) > self.max_size:
+                old, _ = self._data.popitem(last=False)
+                del self._stamps[old]
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            self._stamps.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._stamps.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(entry[0], self._clock())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }